@@ -0,0 +1,39 @@
+"""Backfill user ranks for incremental maintenance
+
+Revision ID: 3f9c2d7a1e84
+Revises: 50b0c79b592a
+Create Date: 2026-10-17 09:12:44.201733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2d7a1e84'
+down_revision: Union[str, None] = '50b0c79b592a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Ranks are now adjusted incrementally on every gem change, which only
+    # stays correct if the stored ranks start out consistent.
+    op.execute(
+        """
+        UPDATE users
+        SET rank = ranked.rank
+        FROM (
+            SELECT id, RANK() OVER (ORDER BY gem_count DESC) AS rank
+            FROM users
+        ) AS ranked
+        WHERE users.id = ranked.id
+        """
+    )
+
+
+def downgrade() -> None:
+    # Stored ranks remain valid without incremental maintenance.
+    pass
@@ -0,0 +1,32 @@
+"""Add leaderboard index on users (gem_count DESC, id)
+
+Revision ID: 8a4e61c0d2b7
+Revises: 3f9c2d7a1e84
+Create Date: 2026-10-17 10:03:18.554120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a4e61c0d2b7'
+down_revision: Union[str, None] = '3f9c2d7a1e84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_users_gem_count_desc_id',
+        'users',
+        [sa.text('gem_count DESC'), 'id'],
+        unique=False,
+        postgresql_include=['username'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_gem_count_desc_id', table_name='users')
@@ -0,0 +1,46 @@
+"""Add conditional limit and stop orders
+
+Revision ID: a6c3e8f19b27
+Revises: f5b90d3e7c21
+Create Date: 2026-10-18 09:41:22.318604
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6c3e8f19b27'
+down_revision: Union[str, None] = 'f5b90d3e7c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('conditional_orders',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('asset_id', sa.Integer(), nullable=False),
+    sa.Column('side', sa.String(length=4), nullable=False),
+    sa.Column('order_type', sa.String(length=5), nullable=False),
+    sa.Column('quantity', sa.Integer(), nullable=False),
+    sa.Column('trigger_price', sa.Float(), nullable=False),
+    sa.Column('status', sa.String(length=9), nullable=False),
+    sa.Column('executed_price', sa.Float(), nullable=True),
+    sa.Column('error', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('executed_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['asset_id'], ['assets.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_conditional_orders_user_id', 'conditional_orders', ['user_id', sa.text('id DESC')], unique=False)
+    op.create_index('ix_conditional_orders_pending', 'conditional_orders', ['asset_id'], unique=False, postgresql_where=sa.text("status = 'pending'"), sqlite_where=sa.text("status = 'pending'"))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_conditional_orders_pending', table_name='conditional_orders')
+    op.drop_index('ix_conditional_orders_user_id', table_name='conditional_orders')
+    op.drop_table('conditional_orders')
@@ -0,0 +1,29 @@
+"""Add version columns to users and portfolio_assets
+
+Revision ID: b9d41f7c2e58
+Revises: a6c3e8f19b27
+Create Date: 2026-10-18 11:07:45.902137
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9d41f7c2e58'
+down_revision: Union[str, None] = 'a6c3e8f19b27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Existing rows start at version 1, as new ones do
+    op.add_column('users', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('portfolio_assets', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('portfolio_assets', 'version')
+    op.drop_column('users', 'version')
@@ -0,0 +1,37 @@
+"""Add gem_histogram table
+
+Revision ID: c7d15e9a0b43
+Revises: 8a4e61c0d2b7
+Create Date: 2026-10-17 11:40:02.918375
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d15e9a0b43'
+down_revision: Union[str, None] = '8a4e61c0d2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('gem_histogram',
+    sa.Column('gem_count', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('user_count', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('gem_count')
+    )
+    # Backfill from the current user base
+    op.execute(
+        """
+        INSERT INTO gem_histogram (gem_count, user_count)
+        SELECT gem_count, COUNT(*) FROM users GROUP BY gem_count
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('gem_histogram')
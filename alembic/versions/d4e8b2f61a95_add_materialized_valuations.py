@@ -0,0 +1,53 @@
+"""Add stored portfolio market value and user net worth
+
+Revision ID: d4e8b2f61a95
+Revises: c7d15e9a0b43
+Create Date: 2026-10-17 14:22:47.301862
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e8b2f61a95'
+down_revision: Union[str, None] = 'c7d15e9a0b43'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('portfolios', sa.Column('market_value', sa.Float(), server_default='0', nullable=False))
+    op.add_column('users', sa.Column('net_worth', sa.Float(), server_default='0', nullable=False))
+    # Backfill from the current holdings and prices
+    op.execute(
+        """
+        UPDATE portfolios SET market_value = COALESCE((
+            SELECT SUM(pa.quantity * a.price)
+            FROM portfolio_assets pa JOIN assets a ON a.id = pa.asset_id
+            WHERE pa.portfolio_id = portfolios.id
+        ), 0)
+        """
+    )
+    op.execute(
+        """
+        UPDATE users SET net_worth = balance + COALESCE((
+            SELECT market_value FROM portfolios WHERE portfolios.user_id = users.id
+        ), 0)
+        """
+    )
+    op.create_index(
+        'ix_users_net_worth_desc_id',
+        'users',
+        [sa.text('net_worth DESC'), 'id'],
+        unique=False,
+        postgresql_include=['username'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_users_net_worth_desc_id', table_name='users')
+    op.drop_column('users', 'net_worth')
+    op.drop_column('portfolios', 'market_value')
@@ -0,0 +1,26 @@
+"""Add unique constraint on portfolio_assets (portfolio_id, asset_id)
+
+Revision ID: e31a7c59f0d2
+Revises: d4e8b2f61a95
+Create Date: 2026-10-17 16:05:31.724519
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e31a7c59f0d2'
+down_revision: Union[str, None] = 'd4e8b2f61a95'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_unique_constraint('uq_portfolio_assets_portfolio_asset', 'portfolio_assets', ['portfolio_id', 'asset_id'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_portfolio_assets_portfolio_asset', 'portfolio_assets', type_='unique')
@@ -0,0 +1,79 @@
+"""Add append-only trades ledger
+
+Revision ID: f5b90d3e7c21
+Revises: e31a7c59f0d2
+Create Date: 2026-10-17 18:12:09.463057
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5b90d3e7c21'
+down_revision: Union[str, None] = 'e31a7c59f0d2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Monthly partitions created up front; the app keeps creating them ahead of time
+PARTITION_MONTHS_AHEAD = 3
+
+
+def _month_start(offset: int) -> date:
+    today = date.today()
+    year, month = divmod(today.month - 1 + offset, 12)
+    return date(today.year + year, month + 1, 1)
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        # Range-partitioned by month so old trades can be detached or dropped
+        # cheaply. A partitioned table's primary key would have to include
+        # created_at; the ledger is append-only and looked up by user, so it
+        # has none and the history index is its only index.
+        op.execute(
+            """
+            CREATE TABLE trades (
+                id BIGINT GENERATED BY DEFAULT AS IDENTITY NOT NULL,
+                user_id INTEGER NOT NULL,
+                asset_id INTEGER NOT NULL,
+                side VARCHAR(4) NOT NULL,
+                quantity INTEGER NOT NULL,
+                price DOUBLE PRECISION NOT NULL,
+                created_at TIMESTAMP WITH TIME ZONE NOT NULL
+            ) PARTITION BY RANGE (created_at)
+            """
+        )
+        op.execute('CREATE TABLE trades_default PARTITION OF trades DEFAULT')
+        for offset in range(PARTITION_MONTHS_AHEAD + 1):
+            start, end = _month_start(offset), _month_start(offset + 1)
+            op.execute(
+                f"CREATE TABLE trades_{start:%Y_%m} PARTITION OF trades "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            )
+    else:
+        op.create_table('trades',
+        sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), autoincrement=True, nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('asset_id', sa.Integer(), nullable=False),
+        sa.Column('side', sa.String(length=4), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('price', sa.Float(), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+        )
+    op.create_index(
+        'ix_trades_user_created_id',
+        'trades',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_include=['asset_id', 'side', 'quantity', 'price'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_trades_user_created_id', table_name='trades')
+    op.drop_table('trades')
@@ -0,0 +1,25 @@
+from fastapi import Request
+
+
+def version_etag(*parts) -> str:
+    """
+    Build a weak ETag from the version numbers a representation is derived from.
+    """
+    return 'W/"' + ".".join(str(part) for part in parts) + '"'
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    """
+    Whether the request's If-None-Match already names `etag`, using the weak
+    comparison RFC 9110 prescribes for If-None-Match.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque
+        for candidate in header.split(",")
+    )
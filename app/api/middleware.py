@@ -0,0 +1,75 @@
+import time
+
+from fastapi import Request
+from loguru import logger
+
+from app.core.config import DB_USAGE_HEADER_ENABLED
+from app.core.logging import sample_request
+from app.core.metrics import (
+    http_request_duration_seconds,
+    http_requests_in_flight,
+    http_requests_total,
+)
+from app.core.db_usage import RequestDbUsage, request_db_usage
+
+
+def _record(request: Request, status: int, duration: float) -> str:
+    """
+    Count and time a finished request by route template and status, and return
+    the route template.
+    """
+    route = request.scope.get("route")
+    # Unmatched paths share one label, so that scanners cannot add series
+    route_path = route.path if route is not None else "unmatched"
+    labels = (request.method, route_path, status)
+    http_requests_total.inc(labels)
+    http_request_duration_seconds.observe(duration, labels)
+    return route_path
+
+
+async def instrument_request(request: Request, call_next):
+    """
+    Account for each request's database use: the statements it ran and their
+    total time, and the connections it checked out and how long it waited for
+    and held them. Reported in Server-Timing and X-DB-Query-Count headers when
+    DB_USAGE_HEADER_ENABLED is set.
+    Every request is counted and timed in the /metrics histograms by route
+    template and status. A sample of requests is also logged at DEBUG, with
+    the route template, user ID, status, duration and connection use as
+    structured fields. A request whose handler raises is recorded as a 500.
+    """
+    started = time.perf_counter()
+    usage = RequestDbUsage()
+    token = request_db_usage.set(usage)
+    http_requests_in_flight.inc()
+    try:
+        response = await call_next(request)
+    except Exception:
+        _record(request, 500, time.perf_counter() - started)
+        raise
+    finally:
+        http_requests_in_flight.dec()
+        request_db_usage.reset(token)
+    duration = time.perf_counter() - started
+    route_path = _record(request, response.status_code, duration)
+    if DB_USAGE_HEADER_ENABLED:
+        response.headers["Server-Timing"] = (
+            f'db-query;dur={usage.query_ms:.3f};desc="{usage.queries} queries", '
+            f"db-wait;dur={usage.wait_ms:.3f}, "
+            f'db-hold;dur={usage.hold_ms:.3f};desc="{usage.checkouts} checkouts"'
+        )
+        response.headers["X-DB-Query-Count"] = str(usage.queries)
+    if sample_request():
+        logger.debug(
+            "{method} {route} {status} in {duration_ms:.1f} ms",
+            method=request.method,
+            route=route_path,
+            user_id=request.path_params.get("user_id"),
+            status=response.status_code,
+            duration_ms=duration * 1000,
+            db_queries=usage.queries,
+            db_query_ms=usage.query_ms,
+            db_checkouts=usage.checkouts,
+            db_hold_ms=usage.hold_ms,
+        )
+    return response
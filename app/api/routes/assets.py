@@ -1,8 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 
-from app.dependencies import get_asset_service
-from app.schemas.assets import AssetCreateRequest, AssetResponse, AssetUpdateRequest
+from app.core.config import ORDER_BOOK_MAX_DEPTH
+from app.dependencies import get_asset_service, get_order_book_service
+from app.schemas.assets import (
+    AssetCreateRequest,
+    AssetResponse,
+    AssetUpdateRequest,
+    BookLevelResponse,
+    DepthLevelResponse,
+    FillResponse,
+    OrderBookDepth,
+    OrderBookSnapshot,
+    OrderRequest,
+    OrderResponse,
+)
 from app.services.asset_service import AssetService
+from app.services.order_book_service import OrderBookService
 
 router = APIRouter()
 
@@ -73,3 +86,106 @@ def list_assets(asset_service: AssetService = Depends(get_asset_service)):
     """
     assets = asset_service.get_all_assets()
     return assets
+
+
+@router.get("/{asset_id}/book", response_model=OrderBookSnapshot, status_code=200)
+def get_order_book(
+    asset_id: int,
+    depth: int = Query(10, ge=1, le=ORDER_BOOK_MAX_DEPTH),
+    order_book_service: OrderBookService = Depends(get_order_book_service),
+):
+    """
+    Retrieve the best bid and ask levels of an asset's order book.
+    """
+    try:
+        snapshot = order_book_service.get_book(asset_id, depth)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return OrderBookSnapshot(
+        asset_id=asset_id,
+        best_bid=snapshot.best_bid,
+        best_ask=snapshot.best_ask,
+        last_price=snapshot.last_price,
+        bids=[BookLevelResponse(**level._asdict()) for level in snapshot.bids],
+        asks=[BookLevelResponse(**level._asdict()) for level in snapshot.asks],
+    )
+
+
+@router.get("/{asset_id}/book/depth", response_model=OrderBookDepth, status_code=200)
+def get_order_book_depth(
+    asset_id: int,
+    levels: int = Query(10, ge=1, le=ORDER_BOOK_MAX_DEPTH),
+    order_book_service: OrderBookService = Depends(get_order_book_service),
+):
+    """
+    Retrieve the cumulative quantity available at each price level of an asset's
+    order book.
+    """
+    try:
+        bids, asks = order_book_service.get_depth(asset_id, levels)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return OrderBookDepth(
+        asset_id=asset_id,
+        bids=[
+            DepthLevelResponse(price=p, quantity=q, cumulative_quantity=c)
+            for p, q, c in bids
+        ],
+        asks=[
+            DepthLevelResponse(price=p, quantity=q, cumulative_quantity=c)
+            for p, q, c in asks
+        ],
+    )
+
+
+@router.post("/{asset_id}/book/orders", response_model=OrderResponse, status_code=201)
+def place_order(
+    asset_id: int,
+    request: OrderRequest,
+    order_book_service: OrderBookService = Depends(get_order_book_service),
+):
+    """
+    Place a limit order, or a market order when no price is given, on an asset's
+    order book. Fills settle against the buyer's and seller's balances and
+    portfolios.
+    """
+    try:
+        result = order_book_service.place_order(
+            asset_id, request.user_id, request.side, request.quantity, request.price
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return OrderResponse(
+        order_id=result.order_id,
+        status=result.status,
+        remaining_quantity=result.remaining_quantity,
+        fills=[
+            FillResponse(
+                price=settled.fill.price,
+                quantity=settled.fill.quantity,
+                buyer_id=settled.fill.buyer_id,
+                seller_id=settled.fill.seller_id,
+                settled=settled.settled,
+                error=settled.error,
+            )
+            for settled in result.fills
+        ],
+        cancelled_order_ids=result.cancelled_order_ids,
+    )
+
+
+@router.delete("/{asset_id}/book/orders/{order_id}", status_code=204)
+def cancel_order(
+    asset_id: int,
+    order_id: int,
+    user_id: int = Query(..., description="The user who placed the order"),
+    order_book_service: OrderBookService = Depends(get_order_book_service),
+):
+    """
+    Cancel one of a user's resting orders. An order placed by another user is
+    reported as not found.
+    """
+    try:
+        order_book_service.cancel_order(asset_id, order_id, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+
+from app.core.pool_stats import PoolStats
+from app.dependencies import get_maintenance_scheduler, get_pool_stats
+from app.schemas.internal import DatabasePoolStats, MaintenanceStatus
+from app.services.maintenance_scheduler import MaintenanceScheduler
+
+router = APIRouter()
+
+
+@router.get("/db-pool", response_model=DatabasePoolStats)
+def get_db_pool_stats(pool_stats: PoolStats = Depends(get_pool_stats)):
+    """
+    Report this worker process's database connection pool: its configuration,
+    connections checked out now and at peak, and how long and how often
+    requests waited for a connection or timed out.
+    """
+    return pool_stats.status()
+
+
+@router.get("/maintenance", response_model=MaintenanceStatus)
+def get_maintenance_status(
+    scheduler: MaintenanceScheduler = Depends(get_maintenance_scheduler),
+):
+    """
+    Report the background maintenance jobs and the outcome of their last pass.
+    """
+    return scheduler.status()
+
+
+@router.post("/maintenance/run", response_model=MaintenanceStatus)
+def run_maintenance(
+    scheduler: MaintenanceScheduler = Depends(get_maintenance_scheduler),
+):
+    """
+    Run every maintenance job now, such as rebuilding stored valuations after
+    a bulk data fix, and report the outcome.
+    """
+    scheduler.run_once()
+    return scheduler.status()
@@ -1,35 +1,167 @@
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Annotated
 
-from app.dependencies import get_ranking_service
-from app.schemas.leaderboard import LeaderboardEntry
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+
+from app.core.config import LEADERBOARD_MAX_PAGE_SIZE, LEADERBOARD_STREAM_MAX_TOP_N
+from app.dependencies import (
+    get_leaderboard_cache,
+    get_leaderboard_stream,
+    get_rank_scheduler,
+    get_ranking_service,
+)
+from app.schemas.leaderboard import (
+    LeaderboardEntry,
+    LeaderboardPage,
+    NetWorthEntry,
+    RankSchedulerStatus,
+    UserPercentileResponse,
+    UserRankResponse,
+)
+from app.services.leaderboard_cache import LeaderboardCache
+from app.services.leaderboard_stream import LeaderboardStream
+from app.services.rank_scheduler import RankScheduler
 from app.services.ranking_service import RankingService
 
 router = APIRouter()
 
 
+def _to_entries(rows) -> list[LeaderboardEntry]:
+    """
+    Convert ranked user rows to leaderboard response entries.
+    """
+    return [
+        LeaderboardEntry(rank=row.rank, username=row.username, gem_count=row.gem_count)
+        for row in rows
+    ]
+
+
 @router.get("/", response_model=list[LeaderboardEntry])
 def get_leaderboard(
-    top_n: int = 10, ranking_service: RankingService = Depends(get_ranking_service)
+    top_n: Annotated[int, Query(ge=1, le=LEADERBOARD_MAX_PAGE_SIZE)] = 10,
+    ranking_service: RankingService = Depends(get_ranking_service),
+    cache: LeaderboardCache = Depends(get_leaderboard_cache),
 ):
     """
     Retrieve the leaderboard with the top N users based on gem count.
+    Served from a cached snapshot that is refreshed after gem changes;
+    the snapshot itself is a pure read of the ranks.
     """
     try:
-        # Assign ranks and get top users
-        ranking_service.assign_ranks()
-        top_users = ranking_service.get_top_n_users(top_n)
-
-        # Convert to response schema
-        return [
-            LeaderboardEntry(
-                rank=user.rank,
-                username=user.username,
-                gem_count=user.gem_count,
-            )
-            for user in top_users
-        ]
+        return cache.get(
+            top_n, lambda n: _to_entries(ranking_service.get_leaderboard(n))
+        )
     except Exception:
         raise HTTPException(
             status_code=500,
             detail="An error occurred while generating the leaderboard.",
         )
+
+
+@router.get("/page", response_model=LeaderboardPage)
+def get_leaderboard_page(
+    request: Request,
+    limit: Annotated[int, Query(ge=1, le=LEADERBOARD_MAX_PAGE_SIZE)] = 50,
+    cursor: str | None = None,
+    ranking_service: RankingService = Depends(get_ranking_service),
+):
+    """
+    Retrieve one page of the full leaderboard, ordered by gem count.
+    Follow `next` (or pass `next_cursor` as `cursor`) to fetch the next page.
+    """
+    try:
+        rows, next_cursor = ranking_service.get_leaderboard_page(limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_url = None
+    if next_cursor:
+        next_url = str(request.url.include_query_params(cursor=next_cursor))
+    return LeaderboardPage(
+        entries=_to_entries(rows), next_cursor=next_cursor, next=next_url
+    )
+
+
+@router.get("/net-worth", response_model=list[NetWorthEntry])
+def get_net_worth_leaderboard(
+    top_n: Annotated[int, Query(ge=1, le=LEADERBOARD_MAX_PAGE_SIZE)] = 10,
+    ranking_service: RankingService = Depends(get_ranking_service),
+):
+    """
+    Retrieve the top N users by net worth: balance plus portfolio market value.
+    """
+    return ranking_service.get_net_worth_leaderboard(top_n)
+
+
+@router.get("/stream")
+async def stream_leaderboard(
+    top_n: Annotated[int, Query(ge=1, le=LEADERBOARD_STREAM_MAX_TOP_N)] = 10,
+    stream: LeaderboardStream = Depends(get_leaderboard_stream),
+):
+    """
+    Stream the top N users as Server-Sent Events.
+    Sends a `snapshot` event with the current entries, then a `diff` event with
+    the changed entries and the usernames that dropped out whenever ranks move.
+    """
+    subscriber = await stream.subscribe(top_n)
+    return StreamingResponse(
+        stream.events(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/scheduler", response_model=RankSchedulerStatus)
+def get_rank_scheduler_status(
+    rank_scheduler: RankScheduler = Depends(get_rank_scheduler),
+):
+    """
+    Report when ranks were last recomputed in the background and how long it took.
+    """
+    return rank_scheduler.status()
+
+
+@router.get("/rank/{user_id}", response_model=UserRankResponse)
+def get_user_rank(
+    user_id: int, ranking_service: RankingService = Depends(get_ranking_service)
+):
+    """
+    Retrieve a user's current rank from the in-memory rank index.
+    Unlike `GET /users/{user_id}`, this reflects every committed gem change.
+    """
+    try:
+        gem_count, rank = ranking_service.get_user_rank(user_id)
+        return UserRankResponse(user_id=user_id, gem_count=gem_count, rank=rank)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/around/{user_id}", response_model=list[LeaderboardEntry])
+def get_leaderboard_around_user(
+    user_id: int,
+    size: Annotated[
+        int, Query(ge=1, le=50, description="Users to show above and below")
+    ] = 5,
+    ranking_service: RankingService = Depends(get_ranking_service),
+):
+    """
+    Retrieve the users ranked directly above and below a user, including the user.
+    """
+    try:
+        return _to_entries(ranking_service.get_users_around(user_id, size))
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
+@router.get("/percentile/{user_id}", response_model=UserPercentileResponse)
+def get_user_percentile(
+    user_id: int, ranking_service: RankingService = Depends(get_ranking_service)
+):
+    """
+    Retrieve the top percentage of players a user belongs to, e.g. "top 3%".
+    """
+    try:
+        standing = ranking_service.get_user_standing(user_id)
+        return UserPercentileResponse(user_id=user_id, **standing._asdict())
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
@@ -1,19 +1,33 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from loguru import logger
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.dependencies import get_portfolio_service
+from app.api.etags import is_not_modified, version_etag
+from app.core.config import TRADE_HISTORY_MAX_PAGE_SIZE
+from app.core.database import ConcurrentUpdateError
+from app.dependencies import (
+    get_conditional_order_service,
+    get_portfolio_service,
+    get_trade_executor,
+)
 from app.schemas.portfolios import (
     AddAssetRequest,
+    BatchTradeRequest,
+    BatchTradeResponse,
+    ConditionalOrderRequest,
+    ConditionalOrderResponse,
     PortfolioAssetRemoveResponse,
     PortfolioAssetResponse,
     PortfolioRequest,
     PortfolioResponse,
     PortfolioValueResponse,
+    TradeHistoryPage,
+    TradeResponse,
 )
-from app.services.portfolio_service import PortfolioService
+from app.services.conditional_order_service import ConditionalOrderService
+from app.services.portfolio_service import PortfolioService, TradeLeg
+from app.services.trade_executor import GroupCommitExecutor, UserActorExecutor
 
 router = APIRouter()
 
@@ -39,13 +53,15 @@ def create_portfolio(
 def add_asset(
     user_id: int,
     request: AddAssetRequest,
-    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+    trade_executor: (
+        PortfolioService | GroupCommitExecutor | UserActorExecutor
+    ) = Depends(get_trade_executor),
 ):
     """
     Add an asset to a user's portfolio.
     """
     try:
-        portfolio_asset = portfolio_service.add_asset_to_portfolio(
+        portfolio_asset = trade_executor.add_asset_to_portfolio(
             user_id=user_id, asset_id=request.asset_id, quantity=request.quantity
         )
 
@@ -66,7 +82,9 @@ def remove_asset(
     user_id: int,
     asset_id: int,
     quantity: Annotated[int, Query(gt=0, description="Quantity to remove")],
-    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+    trade_executor: (
+        PortfolioService | GroupCommitExecutor | UserActorExecutor
+    ) = Depends(get_trade_executor),
 ):
     """
     Remove or sell an asset from a user's portfolio.
@@ -74,10 +92,9 @@ def remove_asset(
     - If only a portion is sold, the asset will be updated.
     """
     try:
-        portfolio_asset = portfolio_service.remove_asset_from_portfolio(
+        portfolio_asset = trade_executor.remove_asset_from_portfolio(
             user_id, asset_id, quantity
         )
-        logger.info(f"Quantity: {portfolio_asset}")
         if portfolio_asset.quantity == 0:
             return PortfolioAssetRemoveResponse(
                 detail="Asset fully removed from the portfolio.",
@@ -95,6 +112,116 @@ def remove_asset(
         raise HTTPException(status_code=500, detail="Internal server error.")
 
 
+@router.post("/{user_id}/trades:batch", response_model=BatchTradeResponse)
+def execute_trades(
+    user_id: int,
+    request: BatchTradeRequest,
+    trade_executor: (
+        PortfolioService | GroupCommitExecutor | UserActorExecutor
+    ) = Depends(get_trade_executor),
+):
+    """
+    Buy and sell several assets in one request.
+    - Legs are applied in order and validated against the same balance and holdings.
+    - If any leg is rejected, none are applied.
+    """
+    try:
+        result = trade_executor.execute_trades(
+            user_id,
+            [TradeLeg(leg.side, leg.asset_id, leg.quantity) for leg in request.legs],
+        )
+        return BatchTradeResponse(
+            legs=[leg._asdict() for leg in result.legs],
+            balance=result.balance,
+            trade_count=result.trade_count,
+            gem_count=result.gem_count,
+        )
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{user_id}/trades", response_model=TradeHistoryPage)
+def list_trades(
+    user_id: int,
+    request: Request,
+    limit: Annotated[int, Query(ge=1, le=TRADE_HISTORY_MAX_PAGE_SIZE)] = 50,
+    cursor: str | None = None,
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+):
+    """
+    Retrieve a user's executed trades, newest first.
+    Follow `next` (or pass `next_cursor` as `cursor`) to fetch older trades.
+    """
+    try:
+        rows, next_cursor = portfolio_service.list_trades(user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    next_url = None
+    if next_cursor:
+        next_url = str(request.url.include_query_params(cursor=next_cursor))
+    return TradeHistoryPage(
+        trades=[TradeResponse.model_validate(row) for row in rows],
+        next_cursor=next_cursor,
+        next=next_url,
+    )
+
+
+@router.post(
+    "/{user_id}/orders", response_model=ConditionalOrderResponse, status_code=201
+)
+def create_conditional_order(
+    user_id: int,
+    request: ConditionalOrderRequest,
+    order_service: ConditionalOrderService = Depends(get_conditional_order_service),
+):
+    """
+    Place a limit or stop order that buys or sells once the asset's price
+    reaches the trigger price.
+    - A limit buy or stop sell triggers when the price falls to the trigger.
+    - A limit sell or stop buy triggers when the price rises to it.
+    """
+    try:
+        return order_service.create_order(
+            user_id,
+            request.asset_id,
+            request.side,
+            request.order_type,
+            request.quantity,
+            request.trigger_price,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{user_id}/orders", response_model=list[ConditionalOrderResponse])
+def list_conditional_orders(
+    user_id: int,
+    order_service: ConditionalOrderService = Depends(get_conditional_order_service),
+):
+    """
+    Retrieve a user's conditional orders, newest first.
+    """
+    return order_service.list_orders(user_id)
+
+
+@router.delete("/{user_id}/orders/{order_id}", response_model=ConditionalOrderResponse)
+def cancel_conditional_order(
+    user_id: int,
+    order_id: int,
+    order_service: ConditionalOrderService = Depends(get_conditional_order_service),
+):
+    """
+    Cancel a pending conditional order.
+    """
+    try:
+        return order_service.cancel_order(user_id, order_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+
 @router.get("/{user_id}/value", response_model=PortfolioValueResponse, status_code=200)
 def calculate_portfolio_value(
     user_id: int,
@@ -113,13 +240,23 @@ def calculate_portfolio_value(
 @router.get("/{user_id}/", response_model=PortfolioResponse, status_code=200)
 def get_portfolio(
     user_id: int,
+    request: Request,
+    response: Response,
     portfolio_service: PortfolioService = Depends(get_portfolio_service),
 ):
     """
-    Retrieve a user's portfolio and its assets.
+    Retrieve a user's portfolio and its assets, in two queries.
+    The ETag follows the portfolio's version; send it back in If-None-Match to
+    get a 304 without the holdings being loaded. Renaming an asset does not
+    change it.
     """
     try:
-        portfolio = portfolio_service.get_portfolio(user_id)
+        portfolio = portfolio_service.get_portfolio_version(user_id)
+        etag = version_etag(portfolio.version)
+        if is_not_modified(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        response.headers["ETag"] = etag
+
         portfolio_assets = portfolio_service.list_portfolio_assets(user_id)
 
         # Map PortfolioAsset and joined Asset data to PortfolioAssetResponse
@@ -134,7 +271,7 @@ def get_portfolio(
         ]
 
         return PortfolioResponse(
-            id=portfolio.id, user_id=portfolio.user_id, assets=assets_response
+            id=portfolio.portfolio_id, user_id=user_id, assets=assets_response
         )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
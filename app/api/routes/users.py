@@ -1,5 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 
+from app.api.etags import is_not_modified, version_etag
+from app.core.database import ConcurrentUpdateError
 from app.dependencies import get_user_service
 from app.schemas.users import BalanceOperation, UserCreate, UserResponse
 from app.services.user_service import UserService
@@ -31,15 +33,26 @@ def create_user(
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(user_id: int, user_service: UserService = Depends(get_user_service)):
+def get_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    user_service: UserService = Depends(get_user_service),
+):
     """
     Retrieve a user by their ID.
+    The ETag follows the user's version and rank; send it back in
+    If-None-Match to get a 304 when neither has changed.
     """
     try:
         user = user_service.get_user(user_id)
-        return user
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
+    etag = version_etag(user.version, user.rank)
+    if is_not_modified(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return user
 
 
 @router.post("/deposit", status_code=204)
@@ -52,6 +65,8 @@ def deposit_balance(
     try:
         user_service.deposit_balance(user_id=request.user_id, amount=request.amount)
         return {"detail": "Deposit successful."}
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
@@ -66,5 +81,7 @@ def withdraw_balance(
     try:
         user_service.withdraw_balance(user_id=request.user_id, amount=request.amount)
         return {"detail": "Withdrawal successful."}
+    except ConcurrentUpdateError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
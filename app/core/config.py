@@ -0,0 +1,113 @@
+import os
+
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Leaderboard ranking strategy:
+# - "incremental": ranks are summed from the gem histogram at query time
+# - "window": ranks are computed at query time with RANK() OVER (...)
+# - "scheduled": users.rank is recomputed by a background job
+RANKING_MODE = os.getenv("RANKING_MODE", "incremental")
+
+# Background rank recomputation: runs every interval, or sooner once the given
+# number of gem changes has accumulated. Enabled by default in "scheduled" mode.
+RANK_SCHEDULER_ENABLED = os.getenv(
+    "RANK_SCHEDULER_ENABLED", str(RANKING_MODE == "scheduled")
+).lower() in ("1", "true", "yes")
+RANK_SCHEDULER_INTERVAL_SECONDS = float(
+    os.getenv("RANK_SCHEDULER_INTERVAL_SECONDS", "60")
+)
+RANK_SCHEDULER_CHANGE_THRESHOLD = int(
+    os.getenv("RANK_SCHEDULER_CHANGE_THRESHOLD", "1000")
+)
+
+# Upper bound on the page size of the cursor-paginated leaderboard
+LEADERBOARD_MAX_PAGE_SIZE = int(os.getenv("LEADERBOARD_MAX_PAGE_SIZE", "100"))
+
+# Trade execution:
+# - "direct": each trade commits in its own request's transaction
+# - "group_commit": trades are queued and committed together in micro-batches
+# - "actor": each user's trades run one at a time on a worker owning the user
+TRADE_EXECUTION_MODE = os.getenv("TRADE_EXECUTION_MODE", "direct")
+TRADE_GROUP_COMMIT_MAX_BATCH = int(os.getenv("TRADE_GROUP_COMMIT_MAX_BATCH", "64"))
+TRADE_GROUP_COMMIT_MAX_DELAY_MS = float(
+    os.getenv("TRADE_GROUP_COMMIT_MAX_DELAY_MS", "5")
+)
+TRADE_ACTOR_WORKERS = int(os.getenv("TRADE_ACTOR_WORKERS", "8"))
+
+# Upper bound on the number of legs in one batch trade request
+TRADE_BATCH_MAX_LEGS = int(os.getenv("TRADE_BATCH_MAX_LEGS", "100"))
+
+# Monthly partitions of the trades ledger created ahead of time on Postgres, at
+# startup and on every maintenance pass
+TRADE_PARTITION_MONTHS_AHEAD = int(os.getenv("TRADE_PARTITION_MONTHS_AHEAD", "3"))
+
+# Upper bound on the page size of a user's trade history
+TRADE_HISTORY_MAX_PAGE_SIZE = int(os.getenv("TRADE_HISTORY_MAX_PAGE_SIZE", "100"))
+
+# Live leaderboard stream: changes are coalesced and pushed once per tick
+LEADERBOARD_STREAM_TICK_SECONDS = float(
+    os.getenv("LEADERBOARD_STREAM_TICK_SECONDS", "1")
+)
+LEADERBOARD_STREAM_MAX_TOP_N = int(os.getenv("LEADERBOARD_STREAM_MAX_TOP_N", "100"))
+LEADERBOARD_STREAM_KEEPALIVE_SECONDS = float(
+    os.getenv("LEADERBOARD_STREAM_KEEPALIVE_SECONDS", "15")
+)
+
+# Price levels per side returned by the order book endpoints at most
+ORDER_BOOK_MAX_DEPTH = int(os.getenv("ORDER_BOOK_MAX_DEPTH", "50"))
+
+# Attempts at a compare-and-swap write before a version conflict is reported
+OPTIMISTIC_RETRY_ATTEMPTS = int(os.getenv("OPTIMISTIC_RETRY_ATTEMPTS", "3"))
+
+# Achievement worker: awards the gems of outboxed trades in batches, woken by
+# each trade commit and otherwise polling every interval
+ACHIEVEMENT_WORKER_ENABLED = os.getenv(
+    "ACHIEVEMENT_WORKER_ENABLED", "true"
+).lower() in ("1", "true", "yes")
+ACHIEVEMENT_WORKER_INTERVAL_SECONDS = float(
+    os.getenv("ACHIEVEMENT_WORKER_INTERVAL_SECONDS", "1")
+)
+ACHIEVEMENT_BATCH_SIZE = int(os.getenv("ACHIEVEMENT_BATCH_SIZE", "500"))
+
+# Conditional orders claimed ("triggered") longer ago than this are taken to
+# belong to a process that stopped before executing them, and are executed by
+# the startup and maintenance passes
+CONDITIONAL_ORDER_RESUME_AFTER_SECONDS = float(
+    os.getenv("CONDITIONAL_ORDER_RESUME_AFTER_SECONDS", "60")
+)
+
+# Maintenance scheduler: periodically repairs derived state such as stored
+# portfolio valuations, which request handlers only adjust incrementally
+MAINTENANCE_ENABLED = os.getenv("MAINTENANCE_ENABLED", "true").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+MAINTENANCE_INTERVAL_SECONDS = float(os.getenv("MAINTENANCE_INTERVAL_SECONDS", "3600"))
+
+# Connection pool of the main engine, per process: size it so that the uvicorn
+# worker count times (pool size + overflow) stays below the server's limit.
+# Recycle is in seconds (-1 never recycles); pre-ping tests each connection on
+# checkout so that connections dropped by the server are replaced transparently.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "30"))
+DB_POOL_RECYCLE_SECONDS = int(os.getenv("DB_POOL_RECYCLE_SECONDS", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# Report each request's database use (statements and their time, checkouts,
+# wait and hold time) in Server-Timing and X-DB-Query-Count response headers
+DB_USAGE_HEADER_ENABLED = os.getenv("DB_USAGE_HEADER_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+
+# Logging: the minimum level, JSON lines instead of text, and the fraction of
+# requests that get a DEBUG line with their route, user and duration
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_JSON = os.getenv("LOG_JSON", "false").lower() in ("1", "true", "yes")
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "0.01"))
@@ -1,8 +1,21 @@
 import os
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from loguru import logger
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.core.config import (
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE_SECONDS,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT_SECONDS,
+    OPTIMISTIC_RETRY_ATTEMPTS,
+)
+from app.core.pool_stats import InstrumentedQueuePool, pool_stats
 
 # Load environment variables from .env file
 load_dotenv()
@@ -10,8 +23,17 @@ load_dotenv()
 # Build the database URL dynamically from environment variables
 DATABASE_URL = os.getenv("DATABASE_URL")
 
-# Create the SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+# Create the SQLAlchemy engine with an instrumented, configurable pool
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT_SECONDS,
+    pool_recycle=DB_POOL_RECYCLE_SECONDS,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+pool_stats.attach(engine.pool)
 
 # Create a configured "Session" class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -19,20 +41,122 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 # Base class for all ORM models
 Base = declarative_base()
 
+# Session.info key holding callbacks deferred until the transaction commits
+AFTER_COMMIT_CALLBACKS = "after_commit_callbacks"
+
+# Session.info key of a list that collects those callbacks instead, for sessions
+# whose commit only releases a savepoint inside a larger transaction
+DEFERRED_AFTER_COMMIT = "deferred_after_commit"
+
+
+class LazySession:
+    """
+    Stands in for a Session that is only created when first used.
+
+    A Session already defers checking out a pooled connection until its first
+    query; this also skips building one at all for requests that are answered
+    from a cache or rejected before reaching the database. Every attribute is
+    forwarded to the real Session once it exists.
+    """
+
+    __slots__ = ("_factory", "_session")
+
+    def __init__(self, factory=SessionLocal):
+        self._factory = factory
+        self._session: Session | None = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._factory()
+        return getattr(self._session, name)
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
 
 def get_db():
     """
     Dependency for database sessions in FastAPI routes.
-    Creates a new SQLAlchemy session for each request and closes it after use.
+    Provides a lazily created SQLAlchemy session for each request and closes it
+    after use; requests that never query never touch the connection pool.
     """
-    db = SessionLocal()
-    print(f"Using main database session: {db.bind.url}")
+    db = LazySession()
     try:
         yield db
     finally:
         db.close()
 
 
+def run_after_commit(db: Session, callback):
+    """
+    Defer a callback until the session's current transaction commits.
+    Callbacks are discarded if the transaction rolls back, which keeps
+    process-local state (indexes, caches) in step with committed data only.
+    """
+    db.info.setdefault(AFTER_COMMIT_CALLBACKS, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session):
+    callbacks = session.info.pop(AFTER_COMMIT_CALLBACKS, [])
+    deferred = session.info.get(DEFERRED_AFTER_COMMIT)
+    if deferred is not None:
+        # Nothing is durable yet; the owner of the outer transaction runs these
+        deferred.extend(callbacks)
+        return
+    for callback in callbacks:
+        try:
+            callback()
+        except Exception:
+            # The data is already committed; never fail the caller over this
+            logger.exception("After-commit callback failed.")
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_commit_callbacks(session: Session):
+    session.info.pop(AFTER_COMMIT_CALLBACKS, None)
+
+
+class ConcurrentUpdateError(ValueError):
+    """
+    A compare-and-swap write found that the row's version had moved on.
+    """
+
+
+def retry_on_conflict(
+    db: Session, operation, attempts: int = OPTIMISTIC_RETRY_ATTEMPTS
+):
+    """
+    Run a unit of work that ends in a commit, rolling back and running it again
+    from a fresh read whenever a versioned write conflicts with a concurrent one.
+    Raises ConcurrentUpdateError once `attempts` runs have all conflicted.
+    """
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation()
+        except (ConcurrentUpdateError, StaleDataError):
+            db.rollback()
+            logger.info("Version conflict, attempt {} of {}.", attempt, attempts)
+    raise ConcurrentUpdateError(
+        "The record was modified concurrently. Please try again."
+    )
+
+
+def dialect_insert(db: Session, model):
+    """
+    Build an INSERT for the session's dialect, so that ON CONFLICT
+    (upsert) clauses are available on both Postgres and SQLite.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
+
+
 def init_db():
     """
     Initialize the database schema using Alembic migrations instead of direct creation.
@@ -0,0 +1,48 @@
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import db_query_duration_seconds
+
+
+class RequestDbUsage:
+    """
+    One request's use of the database: the statements it ran and how long they
+    took, and the connections it checked out, waited for and held.
+    """
+
+    __slots__ = ("queries", "query_ms", "checkouts", "wait_ms", "hold_ms")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_ms = 0.0
+        self.checkouts = 0
+        self.wait_ms = 0.0
+        self.hold_ms = 0.0
+
+
+# Usage of the request being handled; the object is shared with the threadpool
+# threads that run its sync dependencies and endpoint, which copy the context
+request_db_usage: ContextVar[RequestDbUsage | None] = ContextVar(
+    "request_db_usage", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    context.db_usage_started_at = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "db_usage_started_at", None)
+    if started_at is None:
+        return
+    elapsed = time.perf_counter() - started_at
+    db_query_duration_seconds.observe(elapsed)
+    usage = request_db_usage.get()
+    if usage is not None:
+        usage.queries += 1
+        usage.query_ms += elapsed * 1000
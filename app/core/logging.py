@@ -0,0 +1,41 @@
+import random
+import sys
+
+from loguru import logger
+
+from app.core.config import LOG_JSON, LOG_LEVEL, LOG_REQUEST_SAMPLE_RATE
+
+# Fraction of requests logged by sample_request(); zero until logging is
+# configured at a level that lets request lines through
+_request_sample_rate = 0.0
+
+
+def configure_logging(
+    level: str = LOG_LEVEL,
+    json: bool = LOG_JSON,
+    request_sample_rate: float = LOG_REQUEST_SAMPLE_RATE,
+    sink=sys.stderr,
+) -> int:
+    """
+    Replace loguru's default handler with one that writes from a background
+    thread, so that request threads only enqueue records. With `json`, each
+    record is one JSON object carrying its bound fields under "extra".
+    Returns the handler's ID.
+    """
+    global _request_sample_rate
+    logger.remove()
+    handler_id = logger.add(
+        sink, level=level, enqueue=True, serialize=json, diagnose=False
+    )
+    debug_enabled = logger.level(level).no <= logger.level("DEBUG").no
+    _request_sample_rate = request_sample_rate if debug_enabled else 0.0
+    return handler_id
+
+
+def sample_request() -> bool:
+    """
+    Decide whether to log the current request; False without a random draw
+    when request logging is off.
+    """
+    rate = _request_sample_rate
+    return rate > 0 and (rate >= 1 or random.random() < rate)
@@ -0,0 +1,204 @@
+import os
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool
+
+from app.core.db_usage import request_db_usage
+from app.core.metrics import CallbackGauge
+
+
+class PoolStats:
+    """
+    Counters describing how hard a connection pool is being used.
+
+    Checkouts, checkins, new connections and invalidations come from pool
+    events, which also time how long each connection is held from checkout to
+    checkin. How long callers wait for a connection, and how often they give up
+    after `pool_timeout`, is recorded by InstrumentedQueuePool, because pool
+    events only fire once a connection has been handed out. Hold and wait times
+    are added to the current request's RequestDbUsage as well. The counters are
+    per process: with several uvicorn workers each one has its own pool.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pool: Pool | None = None
+        self.reset()
+
+    def reset(self):
+        """
+        Zero every counter, keeping the pool being observed.
+        """
+        with self._lock:
+            self.checkouts = 0
+            self.checkins = 0
+            self.connects = 0
+            self.invalidations = 0
+            self.timeouts = 0
+            self.peak_checked_out = 0
+            self.wait_ms_total = 0.0
+            self.wait_ms_max = 0.0
+            self.hold_ms_total = 0.0
+            self.hold_ms_max = 0.0
+
+    def attach(self, pool: Pool):
+        """
+        Listen to a pool's events and report its size with these counters.
+        """
+        self.observe(pool)
+        event.listen(pool, "connect", self._on_connect)
+        event.listen(pool, "checkout", self._on_checkout)
+        event.listen(pool, "checkin", self._on_checkin)
+        event.listen(pool, "invalidate", self._on_invalidate)
+
+    def observe(self, pool: Pool):
+        """
+        Report the size of a pool that already carries these listeners, such
+        as the copy made when an engine's pool is disposed and recreated.
+        """
+        self._pool = pool
+
+    def record_wait(self, wait_ms: float, timed_out: bool = False):
+        """
+        Record the time one caller spent acquiring a connection.
+        """
+        usage = request_db_usage.get()
+        if usage is not None:
+            usage.wait_ms += wait_ms
+        with self._lock:
+            self.wait_ms_total += wait_ms
+            self.wait_ms_max = max(self.wait_ms_max, wait_ms)
+            if timed_out:
+                self.timeouts += 1
+
+    def status(self) -> dict:
+        """
+        Report the pool's configuration, current use and counters.
+        """
+        pool = self._pool
+        queue_pool = pool if isinstance(pool, QueuePool) else None
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "pool_class": type(pool).__name__ if pool is not None else None,
+                "size": queue_pool.size() if queue_pool else None,
+                "max_overflow": queue_pool._max_overflow if queue_pool else None,
+                "timeout_seconds": queue_pool.timeout() if queue_pool else None,
+                "checked_out": queue_pool.checkedout() if queue_pool else None,
+                "checked_in": queue_pool.checkedin() if queue_pool else None,
+                # QueuePool counts up from -size until the base connections exist
+                "overflow": max(queue_pool.overflow(), 0) if queue_pool else None,
+                "peak_checked_out": self.peak_checked_out,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "timeouts": self.timeouts,
+                "wait_ms_total": round(self.wait_ms_total, 3),
+                "wait_ms_max": round(self.wait_ms_max, 3),
+                "wait_ms_avg": (
+                    round(self.wait_ms_total / self.checkouts, 3)
+                    if self.checkouts
+                    else None
+                ),
+                "hold_ms_total": round(self.hold_ms_total, 3),
+                "hold_ms_max": round(self.hold_ms_max, 3),
+                "hold_ms_avg": (
+                    round(self.hold_ms_total / self.checkins, 3)
+                    if self.checkins
+                    else None
+                ),
+            }
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        usage = request_db_usage.get()
+        if usage is not None:
+            usage.checkouts += 1
+        pool = self._pool
+        with self._lock:
+            self.checkouts += 1
+            if isinstance(pool, QueuePool):
+                self.peak_checked_out = max(self.peak_checked_out, pool.checkedout())
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        hold_ms = (
+            (time.perf_counter() - checked_out_at) * 1000
+            if checked_out_at is not None
+            else 0.0
+        )
+        usage = request_db_usage.get()
+        if usage is not None:
+            usage.hold_ms += hold_ms
+        with self._lock:
+            self.checkins += 1
+            self.hold_ms_total += hold_ms
+            self.hold_ms_max = max(self.hold_ms_max, hold_ms)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    QueuePool that times every connection acquisition into `pool_stats`,
+    including the ones that end in a pool timeout.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_stats.record_wait(
+                (time.perf_counter() - started) * 1000, timed_out=True
+            )
+            raise
+        pool_stats.record_wait((time.perf_counter() - started) * 1000)
+        return connection
+
+    def recreate(self):
+        # The copy keeps this pool's event listeners; only re-point the report
+        pool = super().recreate()
+        pool_stats.observe(pool)
+        return pool
+
+
+# Shared by every request handled by this process
+pool_stats = PoolStats()
+
+
+def _pool_connections():
+    status = pool_stats.status()
+    return [
+        ((state,), status[state]) for state in ("checked_out", "checked_in", "overflow")
+    ]
+
+
+CallbackGauge(
+    "db_pool_connections",
+    "Connections of the main engine's pool, by state.",
+    _pool_connections,
+    labelnames=("state",),
+)
+CallbackGauge(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after the pool timeout.",
+    lambda: pool_stats.timeouts,
+    kind="counter",
+)
+CallbackGauge(
+    "db_pool_wait_seconds_total",
+    "Time spent waiting for a pooled connection.",
+    lambda: pool_stats.wait_ms_total / 1000,
+    kind="counter",
+)
@@ -1,16 +1,31 @@
 from fastapi import Depends
-from loguru import logger
 from sqlalchemy.orm import Session
 
+from app.core.config import TRADE_EXECUTION_MODE
 from app.core.database import get_db
+from app.core.pool_stats import PoolStats, pool_stats
 from app.services import AssetService, PortfolioService, RankingService, UserService
+from app.services.leaderboard_cache import LeaderboardCache, leaderboard_cache
+from app.services.conditional_order_service import ConditionalOrderService
+from app.services.order_book_service import OrderBookService
+from app.services.leaderboard_stream import LeaderboardStream, leaderboard_stream
+from app.services.maintenance_scheduler import (
+    MaintenanceScheduler,
+    maintenance_scheduler,
+)
+from app.services.rank_scheduler import RankScheduler, rank_scheduler
+from app.services.trade_executor import (
+    GroupCommitExecutor,
+    UserActorExecutor,
+    group_commit_executor,
+    user_actor_executor,
+)
 
 
 def get_user_service(db: Session = Depends(get_db)) -> UserService:
     """
     Dependency to provide UserService with the required database session.
     """
-    logger.info(f"get_user_service called with db session: {db.bind.url}")
     return UserService(db=db)
 
 
@@ -18,15 +33,37 @@ def get_portfolio_service(db: Session = Depends(get_db)) -> PortfolioService:
     """
     Dependency to provide PortfolioService with the required database session.
     """
-    logger.info(f"get_portfolio_service called with db session: {db.bind.url}")
     return PortfolioService(db=db)
 
 
+def get_trade_executor(
+    portfolio_service: PortfolioService = Depends(get_portfolio_service),
+) -> PortfolioService | GroupCommitExecutor | UserActorExecutor:
+    """
+    Dependency to provide what executes buys and sells for the portfolio routes:
+    the request's PortfolioService, or the shared group-commit or per-user actor
+    executor when TRADE_EXECUTION_MODE is "group_commit" or "actor".
+    """
+    if TRADE_EXECUTION_MODE == "group_commit":
+        return group_commit_executor
+    if TRADE_EXECUTION_MODE == "actor":
+        return user_actor_executor
+    return portfolio_service
+
+
+def get_conditional_order_service(
+    db: Session = Depends(get_db),
+) -> ConditionalOrderService:
+    """
+    Dependency to provide ConditionalOrderService with the required database session.
+    """
+    return ConditionalOrderService(db)
+
+
 def get_ranking_service(db: Session = Depends(get_db)) -> RankingService:
     """
     Dependency to provide RankingService with the required database session.
     """
-    logger.info(f"get_ranking_service called with db session: {db.bind.url}")
     return RankingService(db=db)
 
 
@@ -34,5 +71,46 @@ def get_asset_service(db: Session = Depends(get_db)) -> AssetService:
     """
     Dependency to provide AssetService with the required database session.
     """
-    logger.info(f"get_asset_service called with db session: {db.bind.url}")
     return AssetService(db)
+
+
+def get_order_book_service(db: Session = Depends(get_db)) -> OrderBookService:
+    """
+    Dependency to provide OrderBookService with the required database session.
+    """
+    return OrderBookService(db)
+
+
+def get_leaderboard_cache() -> LeaderboardCache:
+    """
+    Dependency to provide the process-wide leaderboard snapshot cache.
+    """
+    return leaderboard_cache
+
+
+def get_leaderboard_stream() -> LeaderboardStream:
+    """
+    Dependency to provide the process-wide live leaderboard stream.
+    """
+    return leaderboard_stream
+
+
+def get_rank_scheduler() -> RankScheduler:
+    """
+    Dependency to provide the process-wide background rank scheduler.
+    """
+    return rank_scheduler
+
+
+def get_maintenance_scheduler() -> MaintenanceScheduler:
+    """
+    Dependency to provide the process-wide background maintenance scheduler.
+    """
+    return maintenance_scheduler
+
+
+def get_pool_stats() -> PoolStats:
+    """
+    Dependency to provide the process-wide database connection pool counters.
+    """
+    return pool_stats
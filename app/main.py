@@ -1,8 +1,22 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from loguru import logger
 
-from app.api.routes import assets, leaderboard, portfolios, users
+from app.api.middleware import instrument_request
+from app.api.routes import assets, internal, leaderboard, portfolios, users
+from app.core.database import SessionLocal
+from app.core.logging import configure_logging
+from app.core.metrics import CONTENT_TYPE, render_metrics
+from app.services.achievement_worker import achievement_worker
+from app.services.conditional_order_service import ConditionalOrderService
+from app.services.leaderboard_stream import leaderboard_stream
+from app.services.maintenance_scheduler import maintenance_scheduler
+from app.services.rank_scheduler import rank_scheduler
+from app.services.ranking_service import RankingService
+from app.services.trade_ledger import TradeLedger
+from app.services.trade_executor import group_commit_executor, user_actor_executor
 
 
 @asynccontextmanager
@@ -11,20 +25,47 @@ async def lifespan(app: FastAPI):
     Application lifespan context manager.
     Performs initialization and cleanup tasks for the FastAPI application.
     """
+    # Log from a background thread instead of the request threads
+    configure_logging()
     # No need to call init_db(), as Alembic manages the database schema.
+    # Build the in-memory rank index once; gem changes keep it current.
+    with SessionLocal() as db:
+        RankingService(db).rebuild_rank_index()
+        TradeLedger(db).ensure_partitions()
+        conditional_orders = ConditionalOrderService(db)
+        conditional_orders.rebuild_trigger_index()
+        # Finish orders a previous run claimed but never executed
+        conditional_orders.resume_triggered()
+    # Recompute stored ranks in the background instead of on the request path
+    rank_scheduler.start()
+    # Award gems for trades from the achievement outbox, off the request path
+    achievement_worker.start()
+    # Periodically repair stored valuations that incremental updates keep
+    maintenance_scheduler.start()
+    stream_task = asyncio.create_task(leaderboard_stream.run())
     yield
-    # Perform any cleanup tasks if needed (e.g., closing connections, files)
-    # For this project, no specific cleanup is needed.
+    stream_task.cancel()
+    leaderboard_stream.close()
+    rank_scheduler.stop()
+    achievement_worker.stop()
+    maintenance_scheduler.stop()
+    # Commit any trades still queued for a group commit
+    group_commit_executor.stop()
+    user_actor_executor.stop()
+    # Flush records still queued for the logging thread
+    await logger.complete()
 
 
 # Initialize FastAPI application with lifespan
 app = FastAPI(lifespan=lifespan)
+app.middleware("http")(instrument_request)
 
 # Include API routers
 app.include_router(users.router, prefix="/users", tags=["Users"])
 app.include_router(portfolios.router, prefix="/portfolios", tags=["Portfolios"])
 app.include_router(leaderboard.router, prefix="/leaderboard", tags=["Leaderboard"])
 app.include_router(assets.router, prefix="/assets", tags=["Assets"])
+app.include_router(internal.router, prefix="/internal", tags=["Internal"])
 
 
 @app.get("/")
@@ -41,3 +82,13 @@ def health_check():
     Health check endpoint.
     """
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus metrics of this worker process: request counts and latency by
+    route template and status, requests in flight, SQL statement latency,
+    committed trades by side, leaderboard cache hits and connection pool use.
+    """
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
@@ -1,6 +1,19 @@
+from app.models.achievement_event import AchievementEvent
 from app.models.asset import Asset
+from app.models.conditional_order import ConditionalOrder
+from app.models.gem_histogram import GemHistogram
 from app.models.portfolio import Portfolio
 from app.models.portfolio_assets import PortfolioAsset
+from app.models.trade import Trade
 from app.models.user import User
 
-__all__ = ["User", "Portfolio", "Asset", "PortfolioAsset"]
+__all__ = [
+    "User",
+    "Portfolio",
+    "Asset",
+    "PortfolioAsset",
+    "GemHistogram",
+    "Trade",
+    "ConditionalOrder",
+    "AchievementEvent",
+]
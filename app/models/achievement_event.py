@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, DateTime, Integer
+
+from app.core.database import Base
+
+
+class AchievementEvent(Base):
+    """
+    Outbox of executed trades awaiting achievement evaluation.
+
+    A trade inserts one row in its own transaction; the achievement worker
+    awards the gems it earned and deletes the row. No foreign keys, so the
+    insert on the trade path stays as cheap as possible.
+    """
+
+    __tablename__ = "achievement_events"
+
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    user_id = Column(Integer, nullable=False)
+    trade_count = Column(Integer, nullable=False)  # User's trade count after
+    trades = Column(Integer, nullable=False)  # Trades executed by the event
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
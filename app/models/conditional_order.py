@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, Integer, String
+
+from app.core.database import Base
+
+
+class ConditionalOrder(Base):
+    """
+    A buy or sell that waits for an asset's price to cross a trigger price.
+
+    Limit orders trigger on a favourable move (a buy when the price falls to the
+    trigger, a sell when it rises to it); stop orders on an adverse one.
+    """
+
+    __tablename__ = "conditional_orders"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    side = Column(String(4), nullable=False)  # "buy" or "sell"
+    order_type = Column(String(5), nullable=False)  # "limit" or "stop"
+    quantity = Column(Integer, nullable=False)
+    trigger_price = Column(Float, nullable=False)
+    # "pending", "triggered" while executing, then "executed", "failed"
+    # or "cancelled"
+    status = Column(String(9), default="pending", nullable=False)
+    executed_price = Column(Float, nullable=True)
+    error = Column(String, nullable=True)
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    executed_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        Index("ix_conditional_orders_user_id", user_id, id.desc()),
+        # Only pending orders are loaded into the trigger index
+        Index(
+            "ix_conditional_orders_pending",
+            asset_id,
+            postgresql_where=status == "pending",
+            sqlite_where=status == "pending",
+        ),
+    )
+
+    @property
+    def direction(self) -> str:
+        """
+        "below" if the order triggers once the price falls to its trigger price,
+        "above" if once the price rises to it.
+        """
+        return trigger_direction(self.side, self.order_type)
+
+
+def trigger_direction(side: str, order_type: str) -> str:
+    """
+    Which way the price has to move for an order to trigger.
+    """
+    buy = side == "buy"
+    limit = order_type == "limit"
+    return "below" if buy == limit else "above"
+
+
+def trigger_reached(direction: str, trigger_price: float, price: float) -> bool:
+    """
+    Whether `price` has reached an order's trigger price in its direction.
+    """
+    if direction == "below":
+        return price <= trigger_price
+    return price >= trigger_price
@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer
+
+from app.core.database import Base
+
+
+class GemHistogram(Base):
+    __tablename__ = "gem_histogram"
+
+    # One row per distinct gem count, holding how many users have it
+    gem_count = Column(Integer, primary_key=True, autoincrement=False)
+    user_count = Column(Integer, default=0, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, ForeignKey, Integer
+from sqlalchemy import Column, Float, ForeignKey, Integer
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -9,6 +9,8 @@ class Portfolio(Base):
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, unique=True)
+    # Sum of quantity * price over the holdings, kept current by ValuationService
+    market_value = Column(Float, default=0.0, nullable=False)
 
     # Relationships
     user = relationship("User", back_populates="portfolio")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, ForeignKey, Integer
+from sqlalchemy import Column, Float, ForeignKey, Integer, UniqueConstraint
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 
@@ -13,11 +13,21 @@ class PortfolioAsset(Base):
     asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
     quantity = Column(Integer, nullable=False)
     avg_cost = Column(Float, nullable=False)
+    # Bumped by every change to the holding
+    version = Column(Integer, default=1, nullable=False)
 
     # Relationships
     portfolio = relationship("Portfolio", back_populates="assets")
     asset = relationship("Asset")
 
+    __table_args__ = (
+        # One holding per asset per portfolio; the target of the buy upsert
+        UniqueConstraint(
+            "portfolio_id", "asset_id", name="uq_portfolio_assets_portfolio_asset"
+        ),
+    )
+    __mapper_args__ = {"version_id_col": version}
+
     @hybrid_property
     def name(self):
         return self.asset.name
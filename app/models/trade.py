@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, Index, Integer, String
+
+from app.core.database import Base
+
+
+class Trade(Base):
+    """
+    Append-only ledger of executed buys and sells.
+
+    Rows are only ever inserted, so there are no foreign keys to check and no
+    indexes besides the one serving the per-user history. On Postgres the table
+    is range-partitioned by created_at (see the migration).
+    """
+
+    __tablename__ = "trades"
+
+    id = Column(
+        BigInteger().with_variant(Integer, "sqlite"),
+        primary_key=True,
+        autoincrement=True,
+    )
+    user_id = Column(Integer, nullable=False)
+    asset_id = Column(Integer, nullable=False)
+    side = Column(String(4), nullable=False)  # "buy" or "sell"
+    quantity = Column(Integer, nullable=False)
+    price = Column(Float, nullable=False)
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+
+    __table_args__ = (
+        # Newest-first history per user; INCLUDE makes it an index-only scan
+        Index(
+            "ix_trades_user_created_id",
+            user_id,
+            created_at.desc(),
+            id.desc(),
+            postgresql_include=["asset_id", "side", "quantity", "price"],
+        ),
+    )
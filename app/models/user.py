@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Float, Integer, String
+from sqlalchemy import Column, Float, Index, Integer, String
 from sqlalchemy.orm import relationship
 
 from app.core.database import Base
@@ -13,5 +13,29 @@ class User(Base):
     rank = Column(Integer, default=0, nullable=False)
     trade_count = Column(Integer, default=0, nullable=False)
     balance = Column(Float, default=0.0, nullable=False)
+    # balance + portfolio market value, kept current by ValuationService
+    net_worth = Column(Float, default=0.0, nullable=False)
+    # Bumped by every write to the account (balance, gems, trades, holdings);
+    # writes compare-and-swap on it. Derived columns (rank, net_worth) do not
+    # bump it, so background maintenance never conflicts with trades.
+    version = Column(Integer, default=1, nullable=False)
 
     portfolio = relationship("Portfolio", back_populates="user")
+
+    __table_args__ = (
+        # Leaderboard order; INCLUDE makes the top-N read an index-only scan
+        Index(
+            "ix_users_gem_count_desc_id",
+            gem_count.desc(),
+            id,
+            postgresql_include=["username"],
+        ),
+        # Net-worth leaderboard order
+        Index(
+            "ix_users_net_worth_desc_id",
+            net_worth.desc(),
+            id,
+            postgresql_include=["username"],
+        ),
+    )
+    __mapper_args__ = {"version_id_col": version}
@@ -1,4 +1,6 @@
-from pydantic import BaseModel, ConfigDict
+from typing import Literal
+
+from pydantic import BaseModel, ConfigDict, Field
 
 
 # Schema for creating an asset
@@ -20,3 +22,62 @@ class AssetResponse(BaseModel):
     price: float
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Schema for placing an order; market orders omit the price
+class OrderRequest(BaseModel):
+    user_id: int
+    side: Literal["buy", "sell"]
+    quantity: int = Field(gt=0)
+    price: float | None = Field(default=None, gt=0)
+
+
+# Schema for one fill of an order
+class FillResponse(BaseModel):
+    price: float
+    quantity: int
+    buyer_id: int
+    seller_id: int
+    settled: bool
+    error: str | None = None
+
+
+# Schema for the outcome of placing an order
+class OrderResponse(BaseModel):
+    order_id: int
+    status: str
+    remaining_quantity: int
+    fills: list[FillResponse]
+    # Resting orders cancelled because their owner could not settle a fill
+    cancelled_order_ids: list[int] = []
+
+
+# Schema for one aggregated price level
+class BookLevelResponse(BaseModel):
+    price: float
+    quantity: int
+    orders: int
+
+
+# Schema for the top of an asset's order book
+class OrderBookSnapshot(BaseModel):
+    asset_id: int
+    best_bid: float | None
+    best_ask: float | None
+    last_price: float | None
+    bids: list[BookLevelResponse]
+    asks: list[BookLevelResponse]
+
+
+# Schema for one cumulative depth level
+class DepthLevelResponse(BaseModel):
+    price: float
+    quantity: int
+    cumulative_quantity: int
+
+
+# Schema for an asset's cumulative order book depth
+class OrderBookDepth(BaseModel):
+    asset_id: int
+    bids: list[DepthLevelResponse]
+    asks: list[DepthLevelResponse]
@@ -0,0 +1,37 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class DatabasePoolStats(BaseModel):
+    pid: int  # Each uvicorn worker process has its own pool
+    pool_class: str | None = None
+    size: int | None = None
+    max_overflow: int | None = None
+    timeout_seconds: float | None = None
+    checked_out: int | None = None
+    checked_in: int | None = None
+    overflow: int | None = None
+    peak_checked_out: int
+    checkouts: int
+    checkins: int
+    connects: int
+    invalidations: int
+    timeouts: int  # Checkouts that gave up after the pool timeout
+    wait_ms_total: float
+    wait_ms_max: float
+    wait_ms_avg: float | None = None
+    hold_ms_total: float  # Time connections spent checked out
+    hold_ms_max: float
+    hold_ms_avg: float | None = None
+
+
+class MaintenanceStatus(BaseModel):
+    enabled: bool
+    running: bool
+    interval_seconds: float
+    jobs: list[str]
+    runs: int
+    last_run_at: datetime | None = None
+    last_duration_ms: float | None = None
+    last_errors: dict[str, str]  # Job name to error of the last pass
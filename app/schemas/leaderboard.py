@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel, ConfigDict
 
 
@@ -8,3 +10,48 @@ class LeaderboardEntry(BaseModel):
     gem_count: int
 
     model_config = ConfigDict(from_attributes=True)
+
+
+# Response schema for net-worth leaderboard entries
+class NetWorthEntry(BaseModel):
+    rank: int
+    username: str
+    net_worth: float  # Balance plus portfolio market value
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Response schema for a single user's live rank
+class UserRankResponse(BaseModel):
+    user_id: int
+    gem_count: int
+    rank: int
+
+
+# Response schema for one page of the cursor-paginated leaderboard
+class LeaderboardPage(BaseModel):
+    entries: list[LeaderboardEntry]
+    next_cursor: str | None = None  # Opaque token for the following page
+    next: str | None = None  # Link to the following page, if any
+
+
+# Response schema for a user's standing relative to all users
+class UserPercentileResponse(BaseModel):
+    user_id: int
+    gem_count: int
+    rank: int
+    total_users: int
+    top_percent: float  # e.g. 3.0 means "in the top 3%"
+
+
+# Response schema for the background rank recomputation job
+class RankSchedulerStatus(BaseModel):
+    enabled: bool
+    running: bool
+    interval_seconds: float
+    change_threshold: int
+    pending_changes: int  # Gem changes committed since the last run
+    runs: int
+    last_run_at: datetime | None = None
+    last_duration_ms: float | None = None
+    last_error: str | None = None
@@ -1,7 +1,10 @@
-from typing import List, Union
+from datetime import datetime
+from typing import List, Literal, Union
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from app.core.config import TRADE_BATCH_MAX_LEGS
+
 
 # Request schema for adding assets to a portfolio
 class AddAssetRequest(BaseModel):
@@ -51,3 +54,84 @@ class PortfolioResponse(BaseModel):
 class PortfolioValueResponse(BaseModel):
     user_id: int
     portfolio_value: float
+
+
+# Request schema for one buy or sell in a batch of trades
+class TradeLegRequest(BaseModel):
+    side: Literal["buy", "sell"]
+    asset_id: int = Field(..., gt=0, description="ID must be greater than zero.")
+    quantity: int = Field(..., gt=0, description="Quantity must be greater than zero.")
+
+
+# Request schema for a batch of trades applied all or nothing
+class BatchTradeRequest(BaseModel):
+    legs: List[TradeLegRequest] = Field(
+        ..., min_length=1, max_length=TRADE_BATCH_MAX_LEGS
+    )
+
+
+# Response schema for one filled leg of a batch
+class TradeLegResponse(BaseModel):
+    side: str
+    asset_id: int
+    quantity: int
+    price: float  # Price the leg was filled at
+    remaining_quantity: int  # Quantity held after the leg
+    avg_cost: Union[float, None] = None  # None once the holding is sold off
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Response schema for a batch of trades
+class BatchTradeResponse(BaseModel):
+    legs: List[TradeLegResponse]
+    balance: float
+    trade_count: int
+    gem_count: int
+
+
+# Response schema for one executed trade
+class TradeResponse(BaseModel):
+    id: int
+    asset_id: int
+    side: str  # "buy" or "sell"
+    quantity: int
+    price: float  # Price the trade was filled at
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+# Response schema for one page of a user's trade history
+class TradeHistoryPage(BaseModel):
+    trades: List[TradeResponse]
+    next_cursor: Union[str, None] = None  # Opaque token for the following page
+    next: Union[str, None] = None  # Link to the following page, if any
+
+
+# Request schema for a limit or stop order that waits for a trigger price
+class ConditionalOrderRequest(BaseModel):
+    asset_id: int = Field(..., gt=0, description="ID must be greater than zero.")
+    side: Literal["buy", "sell"]
+    order_type: Literal["limit", "stop"]
+    quantity: int = Field(..., gt=0, description="Quantity must be greater than zero.")
+    trigger_price: float = Field(
+        ..., gt=0, description="Trigger price must be greater than zero."
+    )
+
+
+# Response schema for a conditional order
+class ConditionalOrderResponse(BaseModel):
+    id: int
+    asset_id: int
+    side: str
+    order_type: str
+    quantity: int
+    trigger_price: float
+    status: str  # "pending", "triggered", "executed", "failed" or "cancelled"
+    executed_price: Union[float, None] = None
+    error: Union[str, None] = None  # Why a triggered order failed to execute
+    created_at: datetime
+    executed_at: Union[datetime, None] = None
+
+    model_config = ConfigDict(from_attributes=True)
@@ -2,5 +2,12 @@ from app.services.asset_service import AssetService
 from app.services.portfolio_service import PortfolioService
 from app.services.ranking_service import RankingService
 from app.services.user_service import UserService
+from app.services.valuation_service import ValuationService
 
-__all__ = ["PortfolioService", "UserService", "RankingService", "AssetService"]
+__all__ = [
+    "PortfolioService",
+    "UserService",
+    "RankingService",
+    "AssetService",
+    "ValuationService",
+]
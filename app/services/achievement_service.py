@@ -0,0 +1,112 @@
+from collections import defaultdict
+
+from sqlalchemy import case, delete, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import ACHIEVEMENT_BATCH_SIZE
+from app.core.database import run_after_commit
+from app.models import AchievementEvent, User
+from app.services.achievement_worker import achievement_worker
+from app.services.ranking_service import RankingService
+
+# Gems awarded for every trade, plus one-off bonuses keyed by the trade count
+GEMS_PER_TRADE = 1
+MILESTONE_BONUSES = {5: 5, 10: 10}
+
+
+def gems_for_trades(trade_count: int, trades: int) -> int:
+    """
+    Gems earned by `trades` trades that took a user's trade count to
+    `trade_count`, including every milestone they crossed.
+    """
+    before = trade_count - trades
+    return GEMS_PER_TRADE * trades + sum(
+        bonus
+        for milestone, bonus in MILESTONE_BONUSES.items()
+        if before < milestone <= trade_count
+    )
+
+
+class AchievementService:
+    """
+    Records trades in the achievement outbox and awards their gems later.
+
+    The trade path only inserts an event, so its cost does not depend on the
+    achievement rules. The worker drains the outbox in batches: the rules are
+    evaluated in Python, the gems of every user in the batch are added with one
+    UPDATE, and the events are deleted in the same transaction.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record_trades(self, user_id: int, trade_count: int, trades: int = 1):
+        """
+        Queue the achievements of `trades` trades that took the user's trade
+        count to `trade_count`. Does not commit; the worker is woken once the
+        trade commits.
+        """
+        self.db.execute(
+            insert(AchievementEvent).values(
+                user_id=user_id, trade_count=trade_count, trades=trades
+            )
+        )
+        run_after_commit(self.db, achievement_worker.notify)
+
+    def pending_count(self) -> int:
+        """
+        Return the number of events not yet evaluated.
+        """
+        return self.db.query(AchievementEvent).count()
+
+    def process_pending(self, limit: int = ACHIEVEMENT_BATCH_SIZE) -> int:
+        """
+        Award the gems of up to `limit` of the oldest events and delete them, in
+        one transaction. Returns the number of events processed.
+
+        On Postgres the events are claimed with SKIP LOCKED, so several workers
+        can drain the outbox without waiting on each other.
+        """
+        events = self.db.execute(
+            select(
+                AchievementEvent.id,
+                AchievementEvent.user_id,
+                AchievementEvent.trade_count,
+                AchievementEvent.trades,
+            )
+            .order_by(AchievementEvent.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not events:
+            return 0
+
+        awards: dict[int, int] = defaultdict(int)
+        for event in events:
+            awards[event.user_id] += gems_for_trades(event.trade_count, event.trades)
+        awards = {user_id: gems for user_id, gems in awards.items() if gems}
+
+        if awards:
+            awarded = self.db.execute(
+                update(User)
+                .where(User.id.in_(awards))
+                .values(
+                    gem_count=User.gem_count + case(awards, value=User.id, else_=0),
+                    version=User.version + 1,
+                )
+                .returning(User.id, User.gem_count)
+                .execution_options(synchronize_session=False)
+            ).all()
+            ranking_service = RankingService(self.db)
+            for user_id, gem_count in sorted(awarded):
+                ranking_service.apply_gem_change(
+                    user_id, gem_count - awards[user_id], gem_count
+                )
+
+        self.db.execute(
+            delete(AchievementEvent)
+            .where(AchievementEvent.id.in_([event.id for event in events]))
+            .execution_options(synchronize_session=False)
+        )
+        self.db.commit()
+        return len(events)
@@ -0,0 +1,136 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    ACHIEVEMENT_BATCH_SIZE,
+    ACHIEVEMENT_WORKER_ENABLED,
+    ACHIEVEMENT_WORKER_INTERVAL_SECONDS,
+)
+from app.core.database import SessionLocal
+
+
+class AchievementWorker:
+    """
+    Background job that drains the achievement outbox.
+
+    Woken as soon as a trade commits, and otherwise every `interval_seconds`
+    to pick up events written by other processes. Each wake-up processes
+    batches of up to `batch_size` events until the outbox is empty, so trades
+    that arrive together are awarded together.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval_seconds: float = ACHIEVEMENT_WORKER_INTERVAL_SECONDS,
+        batch_size: int = ACHIEVEMENT_BATCH_SIZE,
+        enabled: bool = ACHIEVEMENT_WORKER_ENABLED,
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.enabled = enabled
+        self.batches = 0
+        self.events = 0
+        self.last_run_at: datetime | None = None
+        self.last_error: str | None = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def notify(self):
+        """
+        Wake the worker. Called after a trade commits, from any thread.
+        """
+        self._wake.set()
+
+    def start(self):
+        """
+        Start the background thread if the worker is enabled.
+        """
+        if not self.enabled or self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="achievement-worker", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the background thread after its current batch.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self) -> int:
+        """
+        Process batches until the outbox is empty. Returns the number of events
+        processed.
+        """
+        # Imported here: the achievement service wakes this worker
+        from app.services.achievement_service import AchievementService
+
+        self._wake.clear()
+        self.last_run_at = datetime.now(timezone.utc)
+        processed = 0
+        try:
+            while not self._stop.is_set():
+                with self.session_factory() as db:
+                    count = AchievementService(db).process_pending(self.batch_size)
+                if count:
+                    self.batches += 1
+                    self.events += count
+                    processed += count
+                if count < self.batch_size:
+                    break
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.exception("Achievement evaluation failed.")
+        return processed
+
+    def status(self) -> dict:
+        """
+        Report the worker configuration and how much it has processed.
+        """
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "batch_size": self.batch_size,
+            "batches": self.batches,
+            "events": self.events,
+            "last_run_at": self.last_run_at,
+            "last_error": self.last_error,
+        }
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.interval_seconds)
+            if self._stop.is_set():
+                break
+            started = time.perf_counter()
+            processed = self.run_once()
+            if processed:
+                logger.debug(
+                    "Awarded achievements for {} events in {:.1f} ms.",
+                    processed,
+                    (time.perf_counter() - started) * 1000,
+                )
+
+
+# Shared by every request handled by this process
+achievement_worker = AchievementWorker(SessionLocal)
@@ -1,7 +1,10 @@
+from loguru import logger
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
 from app.models.asset import Asset
+from app.services.conditional_order_service import ConditionalOrderService
+from app.services.valuation_service import ValuationService
 
 
 class AssetService:
@@ -42,21 +45,47 @@ class AssetService:
     ) -> Asset:
         """
         Update an asset's name and/or price.
+        A price change revalues the stored market value of every holding, then
+        executes the conditional orders it triggers. The asset row is locked
+        first so that concurrent price changes revalue from each other's price
+        instead of the same stale one.
         """
         try:
-            asset = self.get_asset(asset_id)
+            asset = (
+                self.db.query(Asset)
+                .filter(Asset.id == asset_id)
+                .with_for_update()
+                .populate_existing()
+                .first()
+            )
+            if not asset:
+                raise ValueError(f"Asset with ID {asset_id} not found.")
             if name:
                 asset.name = name
             if price:
+                ValuationService(self.db).apply_price_change(
+                    asset.id, asset.price, price
+                )
                 asset.price = price
 
             self.db.commit()
-            self.db.refresh(asset)
-            return asset
         except SQLAlchemyError as e:
             self.db.rollback()
             raise ValueError("Error updating asset.") from e
 
+        if price:
+            # The price change has committed; orders it triggers that fail to
+            # execute are recorded on the orders, not reported as a failed update
+            try:
+                ConditionalOrderService(self.db).execute_triggered(asset_id, price)
+            except SQLAlchemyError:
+                self.db.rollback()
+                logger.exception(
+                    "Executing orders triggered on asset {} failed.", asset_id
+                )
+        self.db.refresh(asset)
+        return asset
+
     def delete_asset(self, asset_id: int) -> None:
         """
         Delete an asset by ID.
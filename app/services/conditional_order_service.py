@@ -0,0 +1,299 @@
+from datetime import datetime, timedelta, timezone
+from functools import partial
+
+from loguru import logger
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import CONDITIONAL_ORDER_RESUME_AFTER_SECONDS
+from app.core.database import run_after_commit
+from app.models import Asset, ConditionalOrder, Portfolio
+from app.models.conditional_order import trigger_direction, trigger_reached
+from app.services.portfolio_service import PortfolioService
+from app.services.trigger_index import TriggerIndex, trigger_index
+
+
+# Columns returned when claiming orders, in the order they execute
+_CLAIMED = (
+    ConditionalOrder.id,
+    ConditionalOrder.user_id,
+    ConditionalOrder.asset_id,
+    ConditionalOrder.side,
+    ConditionalOrder.quantity,
+    ConditionalOrder.order_type,
+    ConditionalOrder.trigger_price,
+)
+
+
+class ConditionalOrderService:
+    """
+    Persists limit and stop orders and executes them when a price update
+    crosses their trigger price.
+
+    Pending orders are mirrored in the process-wide TriggerIndex, so a price
+    update only loads the orders it actually crosses. Each crossed order is
+    claimed in the database first, so it executes once even if another process
+    sees the same move, and then goes through PortfolioService like any other
+    buy or sell. Orders leave the index only once that claim has committed.
+    """
+
+    def __init__(self, db: Session, index: TriggerIndex = trigger_index):
+        self.db = db
+        self.index = index
+
+    def create_order(
+        self,
+        user_id: int,
+        asset_id: int,
+        side: str,
+        order_type: str,
+        quantity: int,
+        trigger_price: float,
+    ) -> ConditionalOrder:
+        """
+        Place an order that waits for the asset's price to reach `trigger_price`.
+        """
+        try:
+            price = self.db.execute(
+                select(Asset.price).where(Asset.id == asset_id)
+            ).scalar()
+            if price is None:
+                raise ValueError(f"Asset with ID {asset_id} not found.")
+            has_portfolio = self.db.execute(
+                select(Portfolio.id).where(Portfolio.user_id == user_id)
+            ).scalar()
+            if has_portfolio is None:
+                raise ValueError("Portfolio not found.")
+            direction = trigger_direction(side, order_type)
+            if trigger_reached(direction, trigger_price, price):
+                raise ValueError(
+                    f"Trigger price {trigger_price} is already reached "
+                    f"at the current price {price}."
+                )
+
+            order = ConditionalOrder(
+                user_id=user_id,
+                asset_id=asset_id,
+                side=side,
+                order_type=order_type,
+                quantity=quantity,
+                trigger_price=trigger_price,
+            )
+            self.db.add(order)
+            self.db.flush()
+            run_after_commit(
+                self.db,
+                partial(self.index.add, order.id, asset_id, direction, trigger_price),
+            )
+            self.db.commit()
+            self.db.refresh(order)
+            return order
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise ValueError("Error creating order.") from e
+
+    def cancel_order(self, user_id: int, order_id: int) -> ConditionalOrder:
+        """
+        Cancel one of a user's pending orders.
+        """
+        try:
+            order = self.db.execute(
+                update(ConditionalOrder)
+                .where(
+                    ConditionalOrder.id == order_id,
+                    ConditionalOrder.user_id == user_id,
+                    ConditionalOrder.status == "pending",
+                )
+                .values(status="cancelled")
+                .returning(ConditionalOrder)
+                .execution_options(synchronize_session=False)
+            ).scalar_one_or_none()
+            if order is None:
+                raise ValueError(f"Pending order with ID {order_id} not found.")
+            run_after_commit(
+                self.db,
+                partial(
+                    self.index.remove,
+                    order.id,
+                    order.asset_id,
+                    order.direction,
+                    order.trigger_price,
+                ),
+            )
+            self.db.commit()
+            return order
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise ValueError("Error cancelling order.") from e
+
+    def list_orders(self, user_id: int) -> list[ConditionalOrder]:
+        """
+        Retrieve a user's orders, newest first.
+        """
+        return list(
+            self.db.execute(
+                select(ConditionalOrder)
+                .where(ConditionalOrder.user_id == user_id)
+                .order_by(ConditionalOrder.id.desc())
+            ).scalars()
+        )
+
+    def execute_triggered(self, asset_id: int, price: float) -> list[int]:
+        """
+        Execute every pending order on the asset that `price` triggers, oldest
+        first. Returns the IDs of the orders that executed.
+
+        If the claim fails, the orders stay pending and indexed, to be
+        triggered again by the next price update.
+        """
+        triggered = self.index.triggered(asset_id, price)
+        if not triggered:
+            return []
+
+        # Claim the orders so that each executes exactly once
+        try:
+            claimed = self.db.execute(
+                update(ConditionalOrder)
+                .where(
+                    ConditionalOrder.id.in_([order_id for order_id, *_ in triggered]),
+                    ConditionalOrder.status == "pending",
+                )
+                .values(status="triggered", executed_at=datetime.now(timezone.utc))
+                .returning(*_CLAIMED)
+                .execution_options(synchronize_session=False)
+            ).all()
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            logger.exception(
+                "Claiming conditional orders on asset {} failed.", asset_id
+            )
+            return []
+
+        # Claimed here or by another process, or no longer pending: stop watching
+        for order_id, direction, trigger_price in triggered:
+            self.index.remove(order_id, asset_id, direction, trigger_price)
+        return self._execute(claimed)
+
+    def resume_triggered(
+        self, stale_after_seconds: float = CONDITIONAL_ORDER_RESUME_AFTER_SECONDS
+    ) -> list[int]:
+        """
+        Execute orders claimed more than `stale_after_seconds` ago that are still
+        "triggered", i.e. left behind by a process that stopped between claiming
+        and executing them. Each is claimed again first, so only one process
+        resumes it, and like any claimed order only executes if the current
+        price still reaches its trigger. Returns the IDs of the orders that
+        executed.
+        """
+        now = datetime.now(timezone.utc)
+        claimed = self.db.execute(
+            update(ConditionalOrder)
+            .where(
+                ConditionalOrder.status == "triggered",
+                ConditionalOrder.executed_at
+                < now - timedelta(seconds=stale_after_seconds),
+            )
+            .values(executed_at=now)
+            .returning(*_CLAIMED)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self.db.commit()
+        if claimed:
+            logger.warning("Resuming {} triggered conditional orders.", len(claimed))
+        return self._execute(claimed)
+
+    def rebuild_trigger_index(self):
+        """
+        Reload the trigger index from the pending orders in the database.
+        """
+        rows = self.db.execute(
+            select(
+                ConditionalOrder.id,
+                ConditionalOrder.asset_id,
+                ConditionalOrder.side,
+                ConditionalOrder.order_type,
+                ConditionalOrder.trigger_price,
+            ).where(ConditionalOrder.status == "pending")
+        )
+        self.index.load(
+            (order_id, asset_id, trigger_direction(side, order_type), trigger_price)
+            for order_id, asset_id, side, order_type, trigger_price in rows
+        )
+
+    def _execute(self, claimed) -> list[int]:
+        """
+        Execute claimed orders, oldest first, at the asset's current price.
+
+        The price is read with a shared lock, which holds off price updates
+        until the trade commits, so the trade fills at exactly the recorded
+        executed price. An order whose trigger that price no longer reaches,
+        because the price moved back since the claim, returns to pending and
+        to the trigger index instead.
+        """
+        executed = []
+        portfolio_service = PortfolioService(self.db)
+        for order in sorted(claimed):
+            price = self.db.execute(
+                select(Asset.price)
+                .where(Asset.id == order.asset_id)
+                .with_for_update(read=True)
+            ).scalar()
+            direction = trigger_direction(order.side, order.order_type)
+            if price is not None and not trigger_reached(
+                direction, order.trigger_price, price
+            ):
+                self._release(order, direction)
+                continue
+
+            # The status change commits together with the trade
+            self._finish(order.id, status="executed", executed_price=price)
+            try:
+                if order.side == "buy":
+                    portfolio_service.add_asset_to_portfolio(
+                        order.user_id, order.asset_id, order.quantity
+                    )
+                else:
+                    portfolio_service.remove_asset_from_portfolio(
+                        order.user_id, order.asset_id, order.quantity
+                    )
+                executed.append(order.id)
+            except ValueError as e:
+                self.db.rollback()
+                logger.warning("Conditional order {} failed: {}", order.id, e)
+                self._finish(
+                    order.id, status="failed", executed_price=None, error=str(e)
+                )
+                self.db.commit()
+        return executed
+
+    def _release(self, order, direction: str):
+        """
+        Return a claimed order to pending and to the trigger index.
+        """
+        self.db.execute(
+            update(ConditionalOrder)
+            .where(ConditionalOrder.id == order.id)
+            .values(status="pending", executed_at=None)
+            .execution_options(synchronize_session=False)
+        )
+        run_after_commit(
+            self.db,
+            partial(
+                self.index.add,
+                order.id,
+                order.asset_id,
+                direction,
+                order.trigger_price,
+            ),
+        )
+        self.db.commit()
+
+    def _finish(self, order_id: int, **values):
+        self.db.execute(
+            update(ConditionalOrder)
+            .where(ConditionalOrder.id == order_id)
+            .values(executed_at=datetime.now(timezone.utc), **values)
+            .execution_options(synchronize_session=False)
+        )
@@ -0,0 +1,122 @@
+import threading
+from bisect import bisect_left
+from typing import Callable
+
+from app.core.metrics import CallbackGauge
+from app.schemas.leaderboard import LeaderboardEntry
+
+# Requested top_n values are rounded up to one of these snapshot sizes
+DEFAULT_BUCKETS = (10, 25, 50, 100, 250, 500, 1000)
+
+
+class LeaderboardCache:
+    """
+    Process-local cache of top-N leaderboard snapshots.
+
+    Snapshots are kept per top_n bucket and tagged with a version that is
+    bumped whenever gems change. A stale snapshot is refreshed by the first
+    reader that notices it, while concurrent readers keep getting the stale
+    snapshot instead of all hitting the database (stale-while-revalidate).
+    """
+
+    def __init__(self, buckets: tuple[int, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._version = 0
+        self._version_lock = threading.Lock()
+        self._snapshots: dict[int, tuple[int, list[LeaderboardEntry]]] = {}
+        self._refresh_locks = {bucket: threading.Lock() for bucket in self.buckets}
+        self.hits = 0
+        self.misses = 0
+        self.stale_hits = 0
+
+    @property
+    def hit_ratio(self) -> float | None:
+        """
+        Share of reads served from a snapshot, stale ones included.
+        """
+        served = self.hits + self.stale_hits
+        total = served + self.misses
+        return served / total if total else None
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self):
+        """
+        Mark every snapshot as stale. Called after gem changes commit.
+        """
+        with self._version_lock:
+            self._version += 1
+
+    def clear(self):
+        """
+        Drop all snapshots and counters.
+        """
+        self._snapshots.clear()
+        self.hits = self.misses = self.stale_hits = 0
+        self.invalidate()
+
+    def get(
+        self, top_n: int, loader: Callable[[int], list[LeaderboardEntry]]
+    ) -> list[LeaderboardEntry]:
+        """
+        Return the top_n leaderboard entries, loading a snapshot with
+        `loader(bucket_size)` only when the cached one is missing or stale.
+        """
+        i = bisect_left(self.buckets, top_n)
+        if i == len(self.buckets):
+            # Larger than any snapshot; not worth caching
+            self.misses += 1
+            return loader(top_n)
+        bucket = self.buckets[i]
+
+        snapshot = self._snapshots.get(bucket)
+        if snapshot and snapshot[0] == self._version:
+            self.hits += 1
+            return snapshot[1][:top_n]
+
+        lock = self._refresh_locks[bucket]
+        if snapshot and not lock.acquire(blocking=False):
+            # Another request is already refreshing this bucket
+            self.stale_hits += 1
+            return snapshot[1][:top_n]
+        if not snapshot:
+            # Nothing to serve yet: wait for a single loader
+            lock.acquire()
+
+        try:
+            # Re-check: the snapshot may have been refreshed while waiting
+            snapshot = self._snapshots.get(bucket)
+            if snapshot and snapshot[0] == self._version:
+                self.hits += 1
+                return snapshot[1][:top_n]
+
+            self.misses += 1
+            version = self._version  # Changes during the load leave it stale
+            entries = loader(bucket)
+            self._snapshots[bucket] = (version, entries)
+            return entries[:top_n]
+        finally:
+            lock.release()
+
+
+# Shared by every request handled by this process
+leaderboard_cache = LeaderboardCache()
+
+CallbackGauge(
+    "leaderboard_cache_requests_total",
+    "Leaderboard reads, by whether a fresh or stale snapshot served them.",
+    lambda: [
+        (("hit",), leaderboard_cache.hits),
+        (("stale_hit",), leaderboard_cache.stale_hits),
+        (("miss",), leaderboard_cache.misses),
+    ],
+    labelnames=("result",),
+    kind="counter",
+)
+CallbackGauge(
+    "leaderboard_cache_hit_ratio",
+    "Share of leaderboard reads served from a snapshot.",
+    lambda: leaderboard_cache.hit_ratio,
+)
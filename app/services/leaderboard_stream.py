@@ -0,0 +1,220 @@
+import asyncio
+import json
+from typing import AsyncIterator, Callable
+
+from loguru import logger
+
+from app.core.config import (
+    LEADERBOARD_STREAM_KEEPALIVE_SECONDS,
+    LEADERBOARD_STREAM_MAX_TOP_N,
+    LEADERBOARD_STREAM_TICK_SECONDS,
+)
+from app.core.database import SessionLocal
+from app.schemas.leaderboard import LeaderboardEntry
+
+# Undelivered events a subscriber may queue before it is disconnected
+SUBSCRIBER_QUEUE_SIZE = 64
+
+
+class Subscriber:
+    """
+    One open leaderboard stream, fed through a bounded queue.
+    """
+
+    def __init__(self, top_n: int):
+        self.top_n = top_n
+        self.queue: asyncio.Queue[str | None] = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+
+    def push(self, event: str | None) -> bool:
+        """
+        Queue an event. Returns False if the subscriber has fallen too far behind,
+        in which case its queue is replaced by a close marker.
+        """
+        try:
+            self.queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+            return False
+
+
+def _load_top_n(n: int) -> list[LeaderboardEntry]:
+    """
+    Load the top n leaderboard entries in a short-lived session.
+    """
+    # Imported here: the ranking service reports gem changes to this module
+    from app.services.ranking_service import RankingService
+
+    with SessionLocal() as db:
+        return [
+            LeaderboardEntry(
+                rank=row.rank, username=row.username, gem_count=row.gem_count
+            )
+            for row in RankingService(db).get_leaderboard(n)
+        ]
+
+
+def _format_event(event: str, event_id: int, data: dict) -> str:
+    """
+    Serialize one Server-Sent Event.
+    """
+    return f"event: {event}\nid: {event_id}\ndata: {json.dumps(data)}\n\n"
+
+
+def diff_entries(
+    previous: list[LeaderboardEntry], current: list[LeaderboardEntry]
+) -> tuple[list[LeaderboardEntry], list[str]]:
+    """
+    Compare two top-N snapshots keyed by username.
+    Returns the entries that are new or changed, and the usernames that left.
+    """
+    before = {entry.username: entry for entry in previous}
+    after = {entry.username for entry in current}
+    changed = [entry for entry in current if before.get(entry.username) != entry]
+    removed = [username for username in before if username not in after]
+    return changed, removed
+
+
+class LeaderboardStream:
+    """
+    Fans leaderboard changes out to streaming subscribers.
+
+    Gem changes only mark the stream dirty. Once per tick, if anything changed,
+    a single top-N query is run and diffed against the previous snapshot; the
+    diff is serialized once per distinct top_n and pushed to every matching
+    subscriber, so the database cost does not grow with the number of clients.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[int], list[LeaderboardEntry]] = _load_top_n,
+        max_top_n: int = LEADERBOARD_STREAM_MAX_TOP_N,
+        tick_seconds: float = LEADERBOARD_STREAM_TICK_SECONDS,
+        keepalive_seconds: float = LEADERBOARD_STREAM_KEEPALIVE_SECONDS,
+    ):
+        self.loader = loader
+        self.max_top_n = max_top_n
+        self.tick_seconds = tick_seconds
+        self.keepalive_seconds = keepalive_seconds
+        self.event_id = 0
+        self._snapshot: list[LeaderboardEntry] | None = None
+        self._dirty = True
+        self._subscribers: dict[int, set[Subscriber]] = {}
+        self._refresh_lock = asyncio.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(group) for group in self._subscribers.values())
+
+    def mark_dirty(self):
+        """
+        Flag that gems changed. Called after gem changes commit, from any thread.
+        """
+        self._dirty = True
+
+    async def subscribe(self, top_n: int) -> Subscriber:
+        """
+        Register a subscriber and queue the current top_n as its first event.
+        """
+        async with self._refresh_lock:
+            # With nobody listening, ticks skip the refresh, so catch up here.
+            # Otherwise the pending change reaches this subscriber as a diff.
+            if self._snapshot is None or (self._dirty and not self._subscribers):
+                self._dirty = False
+                self._snapshot = await asyncio.to_thread(self.loader, self.max_top_n)
+            subscriber = Subscriber(top_n)
+            subscriber.push(
+                _format_event(
+                    "snapshot",
+                    self.event_id,
+                    {"entries": [e.model_dump() for e in self._snapshot[:top_n]]},
+                )
+            )
+            self._subscribers.setdefault(top_n, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """
+        Forget a subscriber whose stream has ended.
+        """
+        group = self._subscribers.get(subscriber.top_n)
+        if group is not None:
+            group.discard(subscriber)
+            if not group:
+                del self._subscribers[subscriber.top_n]
+
+    async def tick(self):
+        """
+        Reload the leaderboard once if it changed and push diffs to subscribers.
+        """
+        if not self._dirty or not self._subscribers:
+            return
+        async with self._refresh_lock:
+            self._dirty = False
+            previous = self._snapshot or []
+            current = await asyncio.to_thread(self.loader, self.max_top_n)
+            self._snapshot = current
+            self.event_id += 1
+
+            for top_n, group in list(self._subscribers.items()):
+                changed, removed = diff_entries(previous[:top_n], current[:top_n])
+                if not changed and not removed:
+                    continue
+                event = _format_event(
+                    "diff",
+                    self.event_id,
+                    {
+                        "changed": [entry.model_dump() for entry in changed],
+                        "removed": removed,
+                    },
+                )
+                for subscriber in list(group):
+                    if not subscriber.push(event):
+                        # It will reconnect and start again from a snapshot
+                        self.unsubscribe(subscriber)
+
+    async def run(self):
+        """
+        Tick until cancelled.
+        """
+        while True:
+            await asyncio.sleep(self.tick_seconds)
+            try:
+                await self.tick()
+            except Exception:
+                logger.exception("Failed to push leaderboard changes.")
+
+    def close(self):
+        """
+        End every open stream, e.g. on shutdown.
+        """
+        for group in list(self._subscribers.values()):
+            for subscriber in group:
+                subscriber.push(None)
+        self._subscribers.clear()
+
+    async def events(self, subscriber: Subscriber) -> AsyncIterator[str]:
+        """
+        Yield a subscriber's events as Server-Sent Events, with keepalive comments
+        so proxies do not drop idle connections.
+        """
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(
+                        subscriber.queue.get(), self.keepalive_seconds
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield event
+        finally:
+            self.unsubscribe(subscriber)
+
+
+# Shared by every request handled by this process
+leaderboard_stream = LeaderboardStream()
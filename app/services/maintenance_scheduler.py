@@ -0,0 +1,140 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.core.config import MAINTENANCE_ENABLED, MAINTENANCE_INTERVAL_SECONDS
+from app.core.database import SessionLocal
+from app.services.conditional_order_service import ConditionalOrderService
+from app.services.trade_ledger import TradeLedger
+from app.services.valuation_service import ValuationService
+
+
+def rebuild_valuations(db: Session):
+    """
+    Recompute stored market values and net worth, repairing any drift left by
+    relative updates that raced each other.
+    """
+    ValuationService(db).rebuild_valuations()
+    db.commit()
+
+
+def resume_triggered_orders(db: Session):
+    """
+    Execute conditional orders left claimed by a process that stopped before
+    executing them.
+    """
+    ConditionalOrderService(db).resume_triggered()
+
+
+def ensure_trade_partitions(db: Session):
+    """
+    Keep the monthly partitions of the trades ledger created months ahead.
+    """
+    TradeLedger(db).ensure_partitions()
+
+
+# Jobs run on every pass, in order, each in its own session
+MAINTENANCE_JOBS: dict[str, Callable[[Session], None]] = {
+    "rebuild_valuations": rebuild_valuations,
+    "resume_triggered_orders": resume_triggered_orders,
+    "ensure_trade_partitions": ensure_trade_partitions,
+}
+
+
+class MaintenanceScheduler:
+    """
+    Background job that periodically repairs derived state the request path
+    only keeps current incrementally.
+
+    Each pass runs every job in its own session; a failing job is logged and
+    recorded without stopping the jobs after it.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        jobs: dict[str, Callable[[Session], None]] = MAINTENANCE_JOBS,
+        interval_seconds: float = MAINTENANCE_INTERVAL_SECONDS,
+        enabled: bool = MAINTENANCE_ENABLED,
+    ):
+        self.session_factory = session_factory
+        self.jobs = jobs
+        self.interval_seconds = interval_seconds
+        self.enabled = enabled
+        self.runs = 0
+        self.last_run_at: datetime | None = None
+        self.last_duration_ms: float | None = None
+        self.last_errors: dict[str, str] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """
+        Start the background thread if the scheduler is enabled.
+        """
+        if not self.enabled or self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="maintenance-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the background thread and wait for an in-flight pass to finish.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self):
+        """
+        Run every job now and record when and how long the pass took.
+        """
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        errors = {}
+        for name, job in self.jobs.items():
+            try:
+                with self.session_factory() as db:
+                    job(db)
+            except Exception as e:
+                errors[name] = str(e)
+                logger.exception("Maintenance job {} failed.", name)
+        self.last_errors = errors
+        self.runs += 1
+        self.last_run_at = started_at
+        self.last_duration_ms = (time.perf_counter() - started) * 1000
+
+    def status(self) -> dict:
+        """
+        Report the scheduler configuration and the outcome of the last pass.
+        """
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "jobs": list(self.jobs),
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_errors": self.last_errors,
+        }
+
+    def _loop(self):
+        while not self._stop.wait(timeout=self.interval_seconds):
+            self.run_once()
+
+
+# Shared by every request handled by this process
+maintenance_scheduler = MaintenanceScheduler(SessionLocal)
@@ -0,0 +1,328 @@
+import threading
+from bisect import bisect_left, insort
+from collections import deque
+from itertools import count
+from typing import NamedTuple
+
+
+class Order:
+    """
+    A limit order (with a price) or a market order (price None).
+    """
+
+    __slots__ = ("id", "user_id", "side", "price", "quantity", "remaining")
+
+    def __init__(
+        self, order_id: int, user_id: int, side: str, quantity: int, price=None
+    ):
+        self.id = order_id
+        self.user_id = user_id
+        self.side = side
+        self.price = price
+        self.quantity = quantity
+        self.remaining = quantity
+
+
+class Fill(NamedTuple):
+    """
+    A match between an incoming order and a resting one, at the resting price.
+    """
+
+    price: float
+    quantity: int
+    buy_order_id: int
+    sell_order_id: int
+    buyer_id: int
+    seller_id: int
+
+
+class BookLevel(NamedTuple):
+    """
+    The resting quantity and number of orders at one price.
+    """
+
+    price: float
+    quantity: int
+    orders: int
+
+
+class OrderBook:
+    """
+    Price-time priority limit order book for one asset.
+
+    Each side maps a price to a FIFO queue of resting orders, next to a sorted
+    list of its prices arranged so that the best price is always last: bids
+    ascending by price, asks ascending by negated price. Matching at the best
+    level and removing an emptied level are then O(1); adding a new price level
+    is a binary search plus a list insert. Not thread-safe; see MatchingEngine.
+    """
+
+    def __init__(self, asset_id: int):
+        self.asset_id = asset_id
+        self.last_price: float | None = None
+        self._bids: dict[float, deque[Order]] = {}
+        self._asks: dict[float, deque[Order]] = {}
+        self._bid_keys: list[float] = []  # prices, best bid last
+        self._ask_keys: list[float] = []  # negated prices, best ask last
+        self._orders: dict[int, Order] = {}  # resting orders by ID
+        self._ids = count(1)
+
+    @property
+    def best_bid(self) -> float | None:
+        return self._bid_keys[-1] if self._bid_keys else None
+
+    @property
+    def best_ask(self) -> float | None:
+        return -self._ask_keys[-1] if self._ask_keys else None
+
+    def submit(
+        self, user_id: int, side: str, quantity: int, price: float | None = None
+    ) -> tuple[Order, list[Fill]]:
+        """
+        Match an order against the opposite side and rest any limit remainder.
+        A market order's unfilled remainder is cancelled.
+        """
+        if side not in ("buy", "sell"):
+            raise ValueError(f"Unknown order side '{side}'.")
+        if quantity <= 0:
+            raise ValueError("Quantity must be greater than zero.")
+
+        order = Order(next(self._ids), user_id, side, quantity, price)
+        order.remaining = 0
+        return order, self._match(order, quantity)
+
+    def resume(self, order: Order, quantity: int) -> list[Fill]:
+        """
+        Match `quantity` more of an order, for units it was matched with that
+        failed to settle. The order keeps its ID; a limit order rests (or adds
+        to its resting remainder) with whatever does not match again.
+        """
+        return self._match(order, quantity)
+
+    def quote(self, side: str, quantity: int) -> tuple[int, float]:
+        """
+        Return how many units an order on `side` could match at any price, up to
+        `quantity`, and what they would cost at the resting prices.
+        """
+        if side == "buy":
+            levels, prices = self._asks, [-key for key in reversed(self._ask_keys)]
+        else:
+            levels, prices = self._bids, reversed(self._bid_keys)
+        matched = 0
+        cost = 0.0
+        for price in prices:
+            for resting in levels[price]:
+                traded = min(quantity - matched, resting.remaining)
+                matched += traded
+                cost += traded * price
+                if matched == quantity:
+                    return matched, cost
+        return matched, cost
+
+    def _match(self, order: Order, quantity: int) -> list[Fill]:
+        if order.side == "buy":
+            levels, keys, sign = self._asks, self._ask_keys, -1
+        else:
+            levels, keys, sign = self._bids, self._bid_keys, 1
+        user_id, price = order.user_id, order.price
+        fills = []
+        remaining = quantity
+        while remaining and keys:
+            best = sign * keys[-1]
+            if price is not None and (best > price if sign < 0 else best < price):
+                break
+            queue = levels[best]
+            while remaining and queue:
+                resting = queue[0]
+                traded = min(remaining, resting.remaining)
+                resting.remaining -= traded
+                remaining -= traded
+                if sign < 0:
+                    fill = Fill(
+                        best, traded, order.id, resting.id, user_id, resting.user_id
+                    )
+                else:
+                    fill = Fill(
+                        best, traded, resting.id, order.id, resting.user_id, user_id
+                    )
+                fills.append(fill)
+                if not resting.remaining:
+                    queue.popleft()
+                    del self._orders[resting.id]
+            if not queue:
+                del levels[best]
+                keys.pop()
+        if fills:
+            self.last_price = fills[-1].price
+
+        resting = order.id in self._orders
+        order.remaining += remaining
+        if remaining and price is not None and not resting:
+            self._rest(order)
+        return fills
+
+    def reinstate(
+        self, order_id: int, user_id: int, side: str, quantity: int, price: float
+    ) -> bool:
+        """
+        Put back units of a resting order that matched but did not settle
+        because the other side defaulted. They join the order's remainder if
+        it still rests, or the back of its price level otherwise. Returns False,
+        putting nothing back, if the price now crosses the opposite side.
+        """
+        order = self._orders.get(order_id)
+        if order is not None:
+            order.remaining += quantity
+            return True
+        best = self.best_ask if side == "buy" else self.best_bid
+        if best is not None and (best <= price if side == "buy" else best >= price):
+            return False
+        self._rest(Order(order_id, user_id, side, quantity, price))
+        return True
+
+    def cancel(self, order_id: int, user_id: int | None = None) -> Order:
+        """
+        Remove a resting order from the book. With `user_id`, only that user's
+        order; another user's is reported as not found.
+        """
+        order = self._orders.get(order_id)
+        if order is None or (user_id is not None and order.user_id != user_id):
+            raise ValueError(f"Order with ID {order_id} not found.")
+        del self._orders[order_id]
+        if order.side == "buy":
+            levels, keys, key = self._bids, self._bid_keys, order.price
+        else:
+            levels, keys, key = self._asks, self._ask_keys, -order.price
+        queue = levels[order.price]
+        queue.remove(order)
+        if not queue:
+            del levels[order.price]
+            del keys[bisect_left(keys, key)]
+        return order
+
+    def get_order(self, order_id: int) -> Order | None:
+        """
+        Return a resting order, or None if it was filled, cancelled or never rested.
+        """
+        return self._orders.get(order_id)
+
+    def levels(self, side: str, depth: int) -> list[BookLevel]:
+        """
+        Aggregate the best `depth` price levels of one side, best first.
+        """
+        if side == "buy":
+            levels, prices = self._bids, self._bid_keys[::-1][:depth]
+        else:
+            levels, prices = self._asks, [-key for key in self._ask_keys[::-1][:depth]]
+        return [
+            BookLevel(
+                price,
+                sum(order.remaining for order in levels[price]),
+                len(levels[price]),
+            )
+            for price in prices
+        ]
+
+    def _rest(self, order: Order):
+        if order.side == "buy":
+            levels, keys, key = self._bids, self._bid_keys, order.price
+        else:
+            levels, keys, key = self._asks, self._ask_keys, -order.price
+        queue = levels.get(order.price)
+        if queue is None:
+            queue = levels[order.price] = deque()
+            insort(keys, key)
+        queue.append(order)
+        self._orders[order.id] = order
+
+
+class MatchingEngine:
+    """
+    One order book per asset, each guarded by its own lock so that different
+    assets match in parallel.
+    """
+
+    def __init__(self):
+        self._books: dict[int, OrderBook] = {}
+        self._locks: dict[int, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def book(self, asset_id: int) -> tuple[OrderBook, threading.Lock]:
+        """
+        Return an asset's book and its lock, creating them on first use.
+        """
+        book = self._books.get(asset_id)
+        if book is None:
+            with self._lock:
+                book = self._books.get(asset_id)
+                if book is None:
+                    self._locks[asset_id] = threading.Lock()
+                    book = self._books[asset_id] = OrderBook(asset_id)
+        return book, self._locks[asset_id]
+
+    def submit(
+        self,
+        asset_id: int,
+        user_id: int,
+        side: str,
+        quantity: int,
+        price: float | None = None,
+    ) -> tuple[Order, list[Fill]]:
+        """
+        Submit an order to an asset's book.
+        """
+        book, lock = self.book(asset_id)
+        with lock:
+            return book.submit(user_id, side, quantity, price)
+
+    def resume(self, asset_id: int, order: Order, quantity: int) -> list[Fill]:
+        """
+        Match more of an order already submitted to an asset's book.
+        """
+        book, lock = self.book(asset_id)
+        with lock:
+            return book.resume(order, quantity)
+
+    def reinstate(
+        self,
+        asset_id: int,
+        order_id: int,
+        user_id: int,
+        side: str,
+        quantity: int,
+        price: float,
+    ) -> bool:
+        """
+        Put unsettled units of a resting order back on an asset's book.
+        """
+        book, lock = self.book(asset_id)
+        with lock:
+            return book.reinstate(order_id, user_id, side, quantity, price)
+
+    def quote(self, asset_id: int, side: str, quantity: int) -> tuple[int, float]:
+        """
+        Price a market order against an asset's book without placing it.
+        """
+        book, lock = self.book(asset_id)
+        with lock:
+            return book.quote(side, quantity)
+
+    def cancel(self, asset_id: int, order_id: int, user_id: int | None = None) -> Order:
+        """
+        Cancel a resting order in an asset's book.
+        """
+        book, lock = self.book(asset_id)
+        with lock:
+            return book.cancel(order_id, user_id)
+
+    def clear(self):
+        """
+        Drop every book.
+        """
+        with self._lock:
+            self._books.clear()
+            self._locks.clear()
+
+
+# Shared by every request handled by this process
+matching_engine = MatchingEngine()
@@ -0,0 +1,249 @@
+from typing import NamedTuple
+
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models import Asset, Portfolio, PortfolioAsset, User
+from app.services.order_book import BookLevel, Fill, MatchingEngine, matching_engine
+from app.services.portfolio_service import FillSettlementError, PortfolioService
+
+
+class SettledFill(NamedTuple):
+    """
+    An order book fill and whether it settled against balances and holdings.
+    """
+
+    fill: Fill
+    settled: bool
+    error: str | None = None
+
+
+class OrderResult(NamedTuple):
+    """
+    The outcome of placing an order.
+    """
+
+    order_id: int
+    status: str  # "filled", "partially_filled", "resting" or "cancelled"
+    remaining_quantity: int
+    fills: list[SettledFill]
+    # Resting orders cancelled because their owner could not settle a fill
+    cancelled_order_ids: tuple[int, ...] = ()
+
+
+class BookSnapshot(NamedTuple):
+    """
+    Top of an asset's order book.
+    """
+
+    best_bid: float | None
+    best_ask: float | None
+    last_price: float | None
+    bids: list[BookLevel]
+    asks: list[BookLevel]
+
+
+class OrderBookService:
+    """
+    Places orders on the in-memory matching engine and settles the resulting
+    fills through PortfolioService. Matching happens in memory under the
+    asset's lock; each fill then settles in its own transaction.
+    """
+
+    def __init__(self, db: Session, engine: MatchingEngine = matching_engine):
+        self.db = db
+        self.engine = engine
+
+    def place_order(
+        self,
+        asset_id: int,
+        user_id: int,
+        side: str,
+        quantity: int,
+        price: float | None = None,
+    ) -> OrderResult:
+        """
+        Place a limit order (with a price) or a market order (without one).
+        The order is checked against the user's current balance or holding
+        before it can match.
+
+        Placing an order reserves nothing, so either side may no longer cover
+        a fill by the time it settles:
+        - If the resting (maker) side defaults, its order is cancelled, along
+          with any remainder still resting, and reported in
+          `cancelled_order_ids`. The units it failed to deliver or pay for go
+          back to this order, which matches them against the rest of the book.
+        - If this order's user defaults, the order is cancelled and the makers
+          it matched keep their units: they go back on the book, or are
+          reported as cancelled if the book has moved through their price.
+        """
+        self._check_order(asset_id, user_id, side, quantity, price)
+        order, fills = self.engine.submit(asset_id, user_id, side, quantity, price)
+        maker_side = "sell" if side == "buy" else "buy"
+
+        settled = []
+        cancelled_order_ids = []
+        cancelled = False  # This order's user defaulted
+        portfolio_service = PortfolioService(self.db)
+        while fills:
+            unsettled = 0
+            for fill in fills:
+                if side == "buy":
+                    maker_order_id, maker_id = fill.sell_order_id, fill.seller_id
+                else:
+                    maker_order_id, maker_id = fill.buy_order_id, fill.buyer_id
+                if cancelled:
+                    error = "Not settled: the order was cancelled."
+                else:
+                    try:
+                        portfolio_service.settle_fill(
+                            asset_id,
+                            fill.buyer_id,
+                            fill.seller_id,
+                            fill.quantity,
+                            fill.price,
+                        )
+                        settled.append(SettledFill(fill, True))
+                        continue
+                    except FillSettlementError as e:
+                        logger.warning(
+                            "Fill on asset {} failed to settle: {}", asset_id, e
+                        )
+                        error = str(e)
+                        if e.user_id != maker_id:
+                            cancelled = True
+                            self._cancel_quietly(asset_id, order.id)
+                settled.append(SettledFill(fill, False, error))
+
+                if cancelled:
+                    if not self.engine.reinstate(
+                        asset_id,
+                        maker_order_id,
+                        maker_id,
+                        maker_side,
+                        fill.quantity,
+                        fill.price,
+                    ):
+                        cancelled_order_ids.append(maker_order_id)
+                else:
+                    self._cancel_quietly(asset_id, maker_order_id)
+                    cancelled_order_ids.append(maker_order_id)
+                    unsettled += fill.quantity
+            fills = (
+                self.engine.resume(asset_id, order, unsettled)
+                if unsettled and not cancelled
+                else []
+            )
+
+        settled_quantity = sum(s.fill.quantity for s in settled if s.settled)
+        if cancelled:
+            remaining = quantity - settled_quantity
+            status = "partially_filled" if settled_quantity else "cancelled"
+        else:
+            remaining = order.remaining
+            if not remaining:
+                status = "filled"
+            elif settled_quantity:
+                status = "partially_filled"
+            else:
+                status = "cancelled" if price is None else "resting"
+        return OrderResult(
+            order.id,
+            status,
+            remaining,
+            settled,
+            tuple(dict.fromkeys(cancelled_order_ids)),
+        )
+
+    def cancel_order(self, asset_id: int, order_id: int, user_id: int):
+        """
+        Cancel one of a user's resting orders. Another user's order is reported
+        as not found.
+        """
+        self.engine.cancel(asset_id, order_id, user_id)
+
+    def _cancel_quietly(self, asset_id: int, order_id: int):
+        """
+        Cancel an order if any of it is still resting.
+        """
+        try:
+            self.engine.cancel(asset_id, order_id)
+        except ValueError:
+            pass  # Fully matched already; nothing rests
+
+    def get_book(self, asset_id: int, depth: int) -> BookSnapshot:
+        """
+        Return the best price levels on both sides of an asset's book.
+        """
+        self._get_asset(asset_id)
+        book, lock = self.engine.book(asset_id)
+        with lock:
+            return BookSnapshot(
+                book.best_bid,
+                book.best_ask,
+                book.last_price,
+                book.levels("buy", depth),
+                book.levels("sell", depth),
+            )
+
+    def get_depth(self, asset_id: int, levels: int) -> tuple[list, list]:
+        """
+        Return cumulative depth for both sides of an asset's book, best price
+        first: each entry is (price, quantity at the price, quantity up to and
+        including the price).
+        """
+        snapshot = self.get_book(asset_id, levels)
+        return _cumulative(snapshot.bids), _cumulative(snapshot.asks)
+
+    def _check_order(
+        self,
+        asset_id: int,
+        user_id: int,
+        side: str,
+        quantity: int,
+        price: float | None,
+    ):
+        self._get_asset(asset_id)
+        portfolio_id = self.db.execute(
+            select(Portfolio.id).where(Portfolio.user_id == user_id)
+        ).scalar()
+        if portfolio_id is None:
+            raise ValueError("Portfolio not found.")
+        if side == "sell":
+            held = self.db.execute(
+                select(PortfolioAsset.quantity).where(
+                    PortfolioAsset.portfolio_id == portfolio_id,
+                    PortfolioAsset.asset_id == asset_id,
+                )
+            ).scalar()
+            if (held or 0) < quantity:
+                raise ValueError("Insufficient quantity to sell.")
+        elif side == "buy":
+            balance = self.db.execute(
+                select(User.balance).where(User.id == user_id)
+            ).scalar()
+            if price is None:
+                # A market buy pays the resting asks it sweeps, not the mark
+                _, cost = self.engine.quote(asset_id, side, quantity)
+            else:
+                cost = quantity * price
+            if balance < cost:
+                raise ValueError("Insufficient balance to complete the trade.")
+        else:
+            raise ValueError(f"Unknown order side '{side}'.")
+
+    def _get_asset(self, asset_id: int) -> Asset:
+        asset = self.db.get(Asset, asset_id)
+        if not asset:
+            raise ValueError(f"Asset with ID {asset_id} not found.")
+        return asset
+
+
+def _cumulative(levels: list[BookLevel]) -> list[tuple[float, int, int]]:
+    total = 0
+    depth = []
+    for level in levels:
+        total += level.quantity
+        depth.append((level.price, level.quantity, total))
+    return depth
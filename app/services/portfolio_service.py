@@ -1,7 +1,72 @@
+from typing import NamedTuple
+
+from sqlalchemy import delete, exists, literal, select, update
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, contains_eager
 
+from app.core.database import (
+    ConcurrentUpdateError,
+    dialect_insert,
+    retry_on_conflict,
+)
 from app.models import Asset, Portfolio, PortfolioAsset, User
+from app.services.achievement_service import AchievementService
+from app.services.trade_ledger import TradeLedger
+from app.services.valuation_service import ValuationService
+
+
+class TradeLeg(NamedTuple):
+    """
+    One buy or sell in a batch of trades.
+    """
+
+    side: str  # "buy" or "sell"
+    asset_id: int
+    quantity: int
+
+
+class FilledLeg(NamedTuple):
+    """
+    The outcome of one leg of a batch, with the holding it left behind.
+    """
+
+    side: str
+    asset_id: int
+    quantity: int
+    price: float
+    remaining_quantity: int
+    avg_cost: float | None  # None once the holding is sold off
+
+
+class BatchTradeResult(NamedTuple):
+    """
+    Every filled leg of a batch and the user's totals after it.
+    """
+
+    legs: list[FilledLeg]
+    balance: float
+    trade_count: int
+    gem_count: int  # Gems already awarded; the batch's own follow asynchronously
+
+
+class FillSettlementError(ValueError):
+    """
+    An order book fill could not settle because one side lacked the funds or
+    units; `user_id` is the user who defaulted.
+    """
+
+    def __init__(self, message: str, user_id: int):
+        super().__init__(message)
+        self.user_id = user_id
+
+
+class PortfolioVersion(NamedTuple):
+    """
+    A portfolio's ID and its current version.
+    """
+
+    portfolio_id: int
+    version: int
 
 
 class PortfolioService:
@@ -39,60 +104,39 @@ class PortfolioService:
             raise ValueError("Portfolio not found.")
         return portfolio
 
+    def get_portfolio_version(self, user_id: int) -> PortfolioVersion:
+        """
+        Return a user's portfolio ID and version: the owner's version, which
+        every change to the holdings bumps.
+        """
+        row = self.db.execute(
+            select(Portfolio.id, User.version)
+            .join(Portfolio, Portfolio.user_id == User.id)
+            .where(User.id == user_id)
+        ).first()
+        if row is None:
+            raise ValueError("Portfolio not found.")
+        return PortfolioVersion(*row)
+
     def add_asset_to_portfolio(
         self, user_id: int, asset_id: int, quantity: int
     ) -> PortfolioAsset:
         """
         Buy an asset and add it to the user's portfolio.
         Returns the updated PortfolioAsset with joined Asset details.
+
+        The buy is a single transaction of set-based statements. One conditional
+        UPDATE deducts the cost only if the balance covers it, counts the trade,
+        and returns the asset's price and name. One upsert then adds the
+        quantity and recomputes the weighted average cost. The trade is queued
+        in the achievement outbox in the same transaction, and its gems are
+        awarded by the achievement worker after the commit. Lookups are only
+        made when the buy is rejected, to report why.
         """
         try:
-            user = self._get_user(user_id)
-            asset = self._get_asset(asset_id)
-
-            total_cost = quantity * asset.price
-            if user.balance < total_cost:
-                raise ValueError("Insufficient balance to complete the trade.")
-
-            # Deduct the cost from the user's balance
-            user.balance -= total_cost
-
-            # Add the asset to the portfolio
-            portfolio = self.get_portfolio(user_id)
-            portfolio_asset = (
-                self.db.query(PortfolioAsset)
-                .filter(
-                    PortfolioAsset.portfolio_id == portfolio.id,
-                    PortfolioAsset.asset_id == asset_id,
-                )
-                .first()
-            )
-
-            if portfolio_asset:
-                # Update quantity and calculate weighted average price
-                total_quantity = portfolio_asset.quantity + quantity
-                portfolio_asset.avg_cost = (
-                    portfolio_asset.avg_cost * portfolio_asset.quantity
-                    + asset.price * quantity
-                ) / total_quantity
-                portfolio_asset.quantity = total_quantity
-            else:
-                # Add the new asset to the portfolio
-                portfolio_asset = PortfolioAsset(
-                    portfolio_id=portfolio.id,
-                    asset_id=asset_id,
-                    quantity=quantity,
-                    avg_cost=asset.price,
-                )
-                self.db.add(portfolio_asset)
-
-            # Update trade stats for the user
-            self._record_trade(user)
+            portfolio_asset = self._buy(user_id, asset_id, quantity)
             self.db.commit()
-
-            # Return the updated PortfolioAsset with Asset details
-            return self.get_portfolio_asset(user_id, asset_id)
-
+            return portfolio_asset
         except SQLAlchemyError as e:
             self.db.rollback()
             raise ValueError("Error buying asset.") from e
@@ -100,67 +144,256 @@ class PortfolioService:
     def remove_asset_from_portfolio(self, user_id: int, asset_id: int, quantity: int):
         """
         Sell an asset and remove it from the user's portfolio.
+
+        The sell is a single transaction. One UPDATE credits the proceeds and
+        counts the trade only if the holding has enough quantity, so an
+        oversell affects no rows instead of racing a read-then-check. A
+        conditional decrement then takes the quantity from the holding, which
+        is deleted once it reaches zero. As with buys, the trade's gems are
+        awarded from the achievement outbox after the commit.
         """
         try:
-            user = self._get_user(user_id)
-            portfolio = self.get_portfolio(user_id)
+            portfolio_asset = self._sell(user_id, asset_id, quantity)
+            self.db.commit()
+            return portfolio_asset
+        except ValueError:
+            self.db.rollback()
+            raise
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise ValueError("Error selling asset.") from e
+
+    def execute_trades(self, user_id: int, legs: list[TradeLeg]) -> BatchTradeResult:
+        """
+        Execute a batch of buys and sells for one user, all or nothing.
+
+        The user row and the touched holdings are read once without locks, every
+        leg is validated in order against that snapshot, and the outcome is
+        written with one UPDATE of the user, one multi-row upsert of the holdings
+        and one DELETE of the holdings sold off, in a single commit. The trade
+        count is bumped once for the batch, and one achievement outbox event
+        covers every leg, so the worker later awards the batch's gems, including
+        any milestones it crosses, in one go.
+
+        The user UPDATE is a compare-and-swap on the version read with the
+        snapshot. Every write to the user's holdings also bumps that version, so
+        if anything changed since the read the batch is rolled back and re-run
+        from a fresh snapshot, a bounded number of times.
+        """
+        return retry_on_conflict(
+            self.db, lambda: self._execute_trades_once(user_id, legs)
+        )
 
-            portfolio_asset = (
-                self.db.query(PortfolioAsset)
-                .filter(
-                    PortfolioAsset.portfolio_id == portfolio.id,
-                    PortfolioAsset.asset_id == asset_id,
+    def _execute_trades_once(
+        self, user_id: int, legs: list[TradeLeg]
+    ) -> BatchTradeResult:
+        try:
+            trader = self.db.execute(
+                select(
+                    User.balance,
+                    User.trade_count,
+                    User.gem_count,
+                    User.version,
+                    Portfolio.id,
                 )
-                .first()
+                .outerjoin(Portfolio, Portfolio.user_id == User.id)
+                .where(User.id == user_id)
+            ).first()
+            if trader is None:
+                raise ValueError(f"User with ID {user_id} not found.")
+            if trader.id is None:
+                raise ValueError("Portfolio not found.")
+            portfolio_id = trader.id
+
+            asset_ids = {leg.asset_id for leg in legs}
+            prices = dict(
+                self.db.execute(
+                    select(Asset.id, Asset.price).where(Asset.id.in_(asset_ids))
+                ).all()
             )
+            holdings = {
+                row.asset_id: (row.quantity, row.avg_cost)
+                for row in self.db.execute(
+                    select(
+                        PortfolioAsset.asset_id,
+                        PortfolioAsset.quantity,
+                        PortfolioAsset.avg_cost,
+                    ).where(
+                        PortfolioAsset.portfolio_id == portfolio_id,
+                        PortfolioAsset.asset_id.in_(asset_ids),
+                    )
+                )
+            }
+
+            balance, filled = trader.balance, []
+            for i, leg in enumerate(legs, start=1):
+                if leg.asset_id not in prices:
+                    raise ValueError(
+                        f"Leg {i}: Asset with ID {leg.asset_id} not found."
+                    )
+                price = prices[leg.asset_id]
+                held, avg_cost = holdings.get(leg.asset_id, (0, None))
+                if leg.side == "buy":
+                    cost = leg.quantity * price
+                    if balance < cost:
+                        raise ValueError(
+                            f"Leg {i}: Insufficient balance to complete the trade."
+                        )
+                    balance -= cost
+                    avg_cost = ((avg_cost or 0) * held + cost) / (held + leg.quantity)
+                    held += leg.quantity
+                elif leg.side == "sell":
+                    if not held:
+                        raise ValueError(
+                            f"Leg {i}: Asset with ID {leg.asset_id} not found in portfolio."
+                        )
+                    if held < leg.quantity:
+                        raise ValueError(f"Leg {i}: Insufficient quantity to sell.")
+                    balance += leg.quantity * price
+                    held -= leg.quantity
+                    avg_cost = avg_cost if held else None
+                else:
+                    raise ValueError(f"Leg {i}: Unknown trade side '{leg.side}'.")
+                holdings[leg.asset_id] = (held, avg_cost)
+                filled.append(
+                    FilledLeg(
+                        leg.side, leg.asset_id, leg.quantity, price, held, avg_cost
+                    )
+                )
 
-            # Check if the portfolio_asset exists
-            if not portfolio_asset:
-                raise ValueError(f"Asset with ID {asset_id} not found in portfolio.")
-
-            # if not portfolio_asset:
-            #     raise ValueError("Asset not found in portfolio.")
-            if portfolio_asset.quantity < quantity:
-                raise ValueError("Insufficient quantity to sell.")
-
-            # Calculate proceeds from the sale
-            asset = self._get_asset(asset_id)
-            proceeds = quantity * asset.price
+            # Count the trades once for the whole batch, provided nothing
+            # changed the account since the snapshot
+            trade_count = trader.trade_count + len(legs)
+            cash_delta = balance - trader.balance
+            swapped = self.db.execute(
+                update(User)
+                .where(User.id == user_id, User.version == trader.version)
+                .values(
+                    balance=balance,
+                    trade_count=trade_count,
+                    version=trader.version + 1,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            if swapped.rowcount != 1:
+                raise ConcurrentUpdateError(
+                    f"User with ID {user_id} was modified concurrently."
+                )
 
-            # Update quantity or remove the asset if quantity becomes zero
-            portfolio_asset.quantity -= quantity
-            if portfolio_asset.quantity == 0:
-                self.db.delete(portfolio_asset)
+            # Write the final state of every touched holding
+            touched = {leg.asset_id for leg in legs}
+            kept = [
+                {
+                    "portfolio_id": portfolio_id,
+                    "asset_id": asset_id,
+                    "quantity": holdings[asset_id][0],
+                    "avg_cost": holdings[asset_id][1],
+                }
+                for asset_id in touched
+                if holdings[asset_id][0]
+            ]
+            if kept:
+                upsert = dialect_insert(self.db, PortfolioAsset).values(kept)
+                self.db.execute(
+                    upsert.on_conflict_do_update(
+                        index_elements=[
+                            PortfolioAsset.portfolio_id,
+                            PortfolioAsset.asset_id,
+                        ],
+                        set_={
+                            "version": PortfolioAsset.version + 1,
+                            "quantity": upsert.excluded.quantity,
+                            "avg_cost": upsert.excluded.avg_cost,
+                        },
+                    )
+                )
+            sold_off = [asset_id for asset_id in touched if not holdings[asset_id][0]]
+            if sold_off:
+                self.db.execute(
+                    delete(PortfolioAsset)
+                    .where(
+                        PortfolioAsset.portfolio_id == portfolio_id,
+                        PortfolioAsset.asset_id.in_(sold_off),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
 
-            # Add proceeds to the user's balance
-            user.balance += proceeds
+            ValuationService(self.db).apply_trade(
+                portfolio_id, user_id, holding_delta=-cash_delta, cash_delta=cash_delta
+            )
+            AchievementService(self.db).record_trades(
+                user_id, trade_count, trades=len(legs)
+            )
+            TradeLedger(self.db).record(
+                user_id,
+                [(leg.side, leg.asset_id, leg.quantity, leg.price) for leg in filled],
+            )
+            self.db.commit()
+            return BatchTradeResult(filled, balance, trade_count, trader.gem_count)
+        except ValueError:
+            self.db.rollback()
+            raise
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            raise ValueError("Error executing trades.") from e
+
+    def settle_fill(
+        self,
+        asset_id: int,
+        buyer_id: int,
+        seller_id: int,
+        quantity: int,
+        price: float,
+    ):
+        """
+        Settle an order book fill in one transaction: the seller delivers the
+        quantity and is paid `price` per unit, and the buyer pays and receives it,
+        through the same balance and holding updates as instant buys and sells.
+        Raises FillSettlementError naming the buyer or seller who defaulted.
 
-            # Update trade stats for the user
-            self._record_trade(user)
+        Both user rows are locked up front in ID order, so two fills between
+        the same users in opposite directions cannot deadlock.
+        """
+        party = seller_id
+        try:
+            self.db.execute(
+                select(User.id)
+                .where(User.id.in_((buyer_id, seller_id)))
+                .order_by(User.id)
+                .with_for_update()
+            )
+            self._sell(seller_id, asset_id, quantity, price)
+            party = buyer_id
+            self._buy(buyer_id, asset_id, quantity, price)
             self.db.commit()
-            return portfolio_asset
+        except ValueError as e:
+            self.db.rollback()
+            raise FillSettlementError(str(e), party) from e
         except SQLAlchemyError as e:
             self.db.rollback()
-            raise ValueError("Error selling asset.") from e
+            raise ValueError("Error settling trade.") from e
+
+    def list_trades(self, user_id: int, limit: int, cursor: str | None = None):
+        """
+        Get one page of a user's executed trades, newest first, and the cursor
+        for the next page. See TradeLedger.history.
+        """
+        return TradeLedger(self.db).history(user_id, limit, cursor)
 
     def get_portfolio_asset(self, user_id: int, asset_id: int) -> PortfolioAsset:
         """
         Retrieve a specific asset in a user's portfolio with asset details.
+        The portfolio is only looked up on its own when the asset is missing,
+        to report which of the two was not found.
         """
-        portfolio = self.get_portfolio(user_id)
-
         portfolio_asset = (
-            self.db.query(PortfolioAsset)
-            .join(Asset, PortfolioAsset.asset_id == Asset.id)  # Join with Asset
-            .filter(
-                PortfolioAsset.portfolio_id == portfolio.id,
-                PortfolioAsset.asset_id == asset_id,
-            )
-            .options(joinedload(PortfolioAsset.asset))  # Eager load Asset details
+            self._user_holdings(user_id)
+            .filter(PortfolioAsset.asset_id == asset_id)
             .first()
         )
 
         if not portfolio_asset:
+            self.get_portfolio(user_id)
             raise ValueError(f"Asset with ID {asset_id} not found in portfolio.")
 
         return portfolio_asset
@@ -168,21 +401,29 @@ class PortfolioService:
     def list_portfolio_assets(self, user_id: int) -> list[PortfolioAsset]:
         """
         List all assets in a user's portfolio, including quantity and price.
+        One query; the portfolio is only looked up on its own when it holds
+        nothing, to tell an empty portfolio from a missing one.
         """
         try:
-            portfolio = self.get_portfolio(user_id)
-
-            portfolio_assets = (
-                self.db.query(PortfolioAsset)
-                .join(Asset, PortfolioAsset.asset_id == Asset.id)
-                .filter(PortfolioAsset.portfolio_id == portfolio.id)
-                .options(joinedload(PortfolioAsset.asset))  # Eager load asset details
-                .all()
-            )
+            portfolio_assets = self._user_holdings(user_id).all()
+            if not portfolio_assets:
+                self.get_portfolio(user_id)
             return portfolio_assets
         except SQLAlchemyError as e:
             raise ValueError("Error retrieving portfolio assets.") from e
 
+    def _user_holdings(self, user_id: int):
+        """
+        Query a user's holdings with their assets loaded from the same join.
+        """
+        return (
+            self.db.query(PortfolioAsset)
+            .join(Portfolio, PortfolioAsset.portfolio_id == Portfolio.id)
+            .join(Asset, PortfolioAsset.asset_id == Asset.id)
+            .filter(Portfolio.user_id == user_id)
+            .options(contains_eager(PortfolioAsset.asset))
+        )
+
     def calculate_portfolio_value(self, user_id: int) -> float:
         """
         Calculate the total value of all assets in the user's portfolio.
@@ -200,20 +441,221 @@ class PortfolioService:
         except SQLAlchemyError as e:
             raise ValueError("Error calculating portfolio value.") from e
 
-    def _record_trade(self, user: User):
+    def _buy(
+        self, user_id: int, asset_id: int, quantity: int, price: float | None = None
+    ) -> PortfolioAsset:
+        """
+        Apply a buy at `price`, or at the asset's price if not given, and return
+        the resulting holding. Does not commit.
+        """
+        market_price = select(Asset.price).where(Asset.id == asset_id).scalar_subquery()
+        fill_price = market_price if price is None else literal(price)
+        portfolio_id = (
+            select(Portfolio.id).where(Portfolio.user_id == user_id).scalar_subquery()
+        )
+        bought = self.db.execute(
+            update(User)
+            .where(
+                User.id == user_id,
+                User.balance >= quantity * fill_price,
+                market_price.is_not(None),
+                portfolio_id.is_not(None),
+            )
+            .values(
+                balance=User.balance - quantity * fill_price,
+                **self._trade_counters(),
+            )
+            .returning(
+                User.trade_count,
+                fill_price.label("price"),
+                market_price.label("market_price"),
+                select(Asset.name)
+                .where(Asset.id == asset_id)
+                .scalar_subquery()
+                .label("name"),
+                portfolio_id.label("portfolio_id"),
+            )
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
+        if bought is None:
+            self._raise_rejected_buy(user_id, asset_id, quantity, price)
+
+        # Add the asset to the portfolio, or top up the existing holding
+        upsert = dialect_insert(self.db, PortfolioAsset).values(
+            portfolio_id=bought.portfolio_id,
+            asset_id=asset_id,
+            quantity=quantity,
+            avg_cost=bought.price,
+        )
+        total_quantity = PortfolioAsset.quantity + upsert.excluded.quantity
+        holding = self.db.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[
+                    PortfolioAsset.portfolio_id,
+                    PortfolioAsset.asset_id,
+                ],
+                set_={
+                    "version": PortfolioAsset.version + 1,
+                    "quantity": total_quantity,
+                    "avg_cost": (
+                        PortfolioAsset.avg_cost * PortfolioAsset.quantity
+                        + upsert.excluded.avg_cost * upsert.excluded.quantity
+                    )
+                    / total_quantity,
+                },
+            ).returning(
+                PortfolioAsset.id, PortfolioAsset.quantity, PortfolioAsset.avg_cost
+            )
+        ).one()
+
+        # Cash became holdings, which are valued at the market price
+        ValuationService(self.db).apply_trade(
+            bought.portfolio_id,
+            user_id,
+            holding_delta=quantity * bought.market_price,
+            cash_delta=-quantity * bought.price,
+        )
+        AchievementService(self.db).record_trades(user_id, bought.trade_count)
+        TradeLedger(self.db).record(
+            user_id, [("buy", asset_id, quantity, bought.price)]
+        )
+
+        # Return the updated PortfolioAsset with Asset details
+        return PortfolioAsset(
+            id=holding.id,
+            portfolio_id=bought.portfolio_id,
+            asset_id=asset_id,
+            quantity=holding.quantity,
+            avg_cost=holding.avg_cost,
+            asset=Asset(id=asset_id, name=bought.name, price=bought.market_price),
+        )
+
+    def _sell(
+        self, user_id: int, asset_id: int, quantity: int, price: float | None = None
+    ) -> PortfolioAsset:
         """
-        Update trade statistics and gems for the user.
+        Apply a sell at `price`, or at the asset's price if not given, and return
+        the remaining holding. Does not commit.
+
+        Like every trade, the sell locks the user row before the holding: the
+        proceeds are credited first, on condition that the holding covers the
+        quantity, and the holding is decremented second.
         """
-        user.trade_count += 1
-        user.gem_count += 1
+        market_price = select(Asset.price).where(Asset.id == asset_id).scalar_subquery()
+        fill_price = market_price if price is None else literal(price)
+        covered = (
+            PortfolioAsset.portfolio_id
+            == select(Portfolio.id)
+            .where(Portfolio.user_id == user_id)
+            .scalar_subquery(),
+            PortfolioAsset.asset_id == asset_id,
+            PortfolioAsset.quantity >= quantity,
+        )
+        # Add proceeds to the user's balance
+        trader = self.db.execute(
+            update(User)
+            .where(User.id == user_id, exists().where(*covered))
+            .values(
+                balance=User.balance + quantity * fill_price,
+                **self._trade_counters(),
+            )
+            .returning(
+                User.trade_count,
+                fill_price.label("price"),
+                market_price.label("market_price"),
+            )
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
+        if trader is None:
+            self._raise_rejected_sell(user_id, asset_id)
+
+        sold = self.db.execute(
+            update(PortfolioAsset)
+            .where(*covered)
+            .values(
+                quantity=PortfolioAsset.quantity - quantity,
+                version=PortfolioAsset.version + 1,
+            )
+            .returning(
+                PortfolioAsset.id,
+                PortfolioAsset.portfolio_id,
+                PortfolioAsset.quantity,
+                PortfolioAsset.avg_cost,
+            )
+            .execution_options(synchronize_session=False)
+        ).one_or_none()
+        if sold is None:
+            # Reachable: after waiting on the user's row lock, Postgres re-checks
+            # the UPDATE but evaluates EXISTS against its original snapshot, so
+            # a concurrent sell can pass the guard and leave too little here.
+            # Raising rolls back the credit above.
+            raise ValueError("Insufficient quantity to sell.")
+
+        # Remove the asset once the whole holding is sold
+        if sold.quantity == 0:
+            self.db.execute(
+                delete(PortfolioAsset)
+                .where(PortfolioAsset.id == sold.id)
+                .execution_options(synchronize_session=False)
+            )
+
+        ValuationService(self.db).apply_trade(
+            sold.portfolio_id,
+            user_id,
+            holding_delta=-quantity * trader.market_price,
+            cash_delta=quantity * trader.price,
+        )
+        AchievementService(self.db).record_trades(user_id, trader.trade_count)
+        TradeLedger(self.db).record(
+            user_id, [("sell", asset_id, quantity, trader.price)]
+        )
+        return PortfolioAsset(
+            id=sold.id,
+            portfolio_id=sold.portfolio_id,
+            asset_id=asset_id,
+            quantity=sold.quantity,
+            avg_cost=sold.avg_cost,
+        )
 
-        # Add bonus gems for milestones
-        if user.trade_count == 5:
-            user.gem_count += 5
-        elif user.trade_count == 10:
-            user.gem_count += 10
+    def _trade_counters(self) -> dict:
+        """
+        SET clauses that count a trade in the same UPDATE that moves the user's
+        balance and bumps their version. Its gems are awarded from the
+        achievement outbox.
+        """
+        return {"version": User.version + 1, "trade_count": User.trade_count + 1}
 
-        self.db.commit()
+    def _raise_rejected_buy(
+        self, user_id: int, asset_id: int, quantity: int, price: float | None
+    ):
+        """
+        Explain why the conditional buy matched no user.
+        """
+        user = self._get_user(user_id)
+        asset = self._get_asset(asset_id)
+        if user.balance < quantity * (asset.price if price is None else price):
+            raise ValueError("Insufficient balance to complete the trade.")
+        self.get_portfolio(user_id)
+        # Everything checks out now: the balance changed concurrently
+        raise ValueError("Insufficient balance to complete the trade.")
+
+    def _raise_rejected_sell(self, user_id: int, asset_id: int):
+        """
+        Explain why the conditional sell matched no holding.
+        """
+        self._get_user(user_id)
+        portfolio = self.get_portfolio(user_id)
+        holding = (
+            self.db.query(PortfolioAsset)
+            .filter(
+                PortfolioAsset.portfolio_id == portfolio.id,
+                PortfolioAsset.asset_id == asset_id,
+            )
+            .first()
+        )
+        if not holding:
+            raise ValueError(f"Asset with ID {asset_id} not found in portfolio.")
+        raise ValueError("Insufficient quantity to sell.")
 
     def _get_user(self, user_id: int) -> User:
         """
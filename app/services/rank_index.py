@@ -0,0 +1,135 @@
+import threading
+from typing import Iterable
+
+
+class FenwickTree:
+    """
+    Binary indexed tree of counts over the integer keys 0..capacity-1.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self._tree = [0] * (capacity + 1)
+
+    def add(self, key: int, delta: int):
+        """
+        Add delta to the count stored at key.
+        """
+        i = key + 1
+        while i <= self.capacity:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, key: int) -> int:
+        """
+        Return the sum of counts for keys 0..key inclusive.
+        """
+        total = 0
+        i = min(key + 1, self.capacity)
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+
+
+class GemRankIndex:
+    """
+    Process-local rank index over users' gem counts.
+
+    Gem counts are bucketed into a Fenwick tree, so the rank of a user is
+    `1 + users with more gems` in O(log G) where G is the highest gem count.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self._lock = threading.Lock()
+        self._tree = FenwickTree(capacity)
+        self._gems: dict[int, int] = {}
+        self._counts: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._gems)
+
+    def load(self, rows: Iterable[tuple[int, int]]):
+        """
+        Replace the index contents with (user_id, gem_count) rows.
+        """
+        gems = dict(rows)
+        counts: dict[int, int] = {}
+        for gem_count in gems.values():
+            self._validate(gem_count)
+            counts[gem_count] = counts.get(gem_count, 0) + 1
+
+        capacity = 1024
+        while gems and max(counts) >= capacity:
+            capacity *= 2
+        tree = FenwickTree(capacity)
+        for gem_count, count in counts.items():
+            tree.add(gem_count, count)
+
+        with self._lock:
+            self._tree, self._gems, self._counts = tree, gems, counts
+
+    def update(self, user_id: int, gem_count: int):
+        """
+        Insert a user or move them to a new gem count.
+        """
+        self._validate(gem_count)
+        with self._lock:
+            previous = self._gems.get(user_id)
+            if previous == gem_count:
+                return
+            if previous is not None:
+                self._detach(user_id, previous)
+            if gem_count >= self._tree.capacity:
+                self._grow(gem_count)
+            self._gems[user_id] = gem_count
+            self._counts[gem_count] = self._counts.get(gem_count, 0) + 1
+            self._tree.add(gem_count, 1)
+
+    def remove(self, user_id: int):
+        """
+        Drop a user from the index if present.
+        """
+        with self._lock:
+            previous = self._gems.get(user_id)
+            if previous is not None:
+                self._detach(user_id, previous)
+
+    def lookup(self, user_id: int) -> tuple[int, int] | None:
+        """
+        Return (gem_count, rank) for a user as one consistent read.
+        """
+        with self._lock:
+            gem_count = self._gems.get(user_id)
+            if gem_count is None:
+                return None
+            return gem_count, self._rank_for(gem_count)
+
+    def _rank_for(self, gem_count: int) -> int:
+        ahead = len(self._gems) - self._tree.prefix_sum(gem_count)
+        return ahead + 1
+
+    def _detach(self, user_id: int, gem_count: int):
+        del self._gems[user_id]
+        self._counts[gem_count] -= 1
+        if not self._counts[gem_count]:
+            del self._counts[gem_count]
+        self._tree.add(gem_count, -1)
+
+    def _grow(self, gem_count: int):
+        capacity = self._tree.capacity
+        while gem_count >= capacity:
+            capacity *= 2
+        tree = FenwickTree(capacity)
+        for key, count in self._counts.items():
+            tree.add(key, count)
+        self._tree = tree
+
+    @staticmethod
+    def _validate(gem_count: int):
+        if gem_count < 0:
+            raise ValueError("Gem count cannot be negative.")
+
+
+# Shared by every request handled by this process
+rank_index = GemRankIndex()
@@ -0,0 +1,135 @@
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable
+
+from loguru import logger
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    RANK_SCHEDULER_CHANGE_THRESHOLD,
+    RANK_SCHEDULER_ENABLED,
+    RANK_SCHEDULER_INTERVAL_SECONDS,
+)
+from app.core.database import SessionLocal
+
+
+class RankScheduler:
+    """
+    Background job that recomputes and persists every user's rank.
+
+    Runs on a fixed interval, or earlier once `change_threshold` gem changes
+    have been committed, whichever comes first. Each run rebuilds the gem
+    histogram, rewrites users.rank with set-based UPDATEs and reloads the
+    in-memory rank index, so process-local state is re-synced as well.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval_seconds: float = RANK_SCHEDULER_INTERVAL_SECONDS,
+        change_threshold: int = RANK_SCHEDULER_CHANGE_THRESHOLD,
+        enabled: bool = RANK_SCHEDULER_ENABLED,
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.change_threshold = change_threshold
+        self.enabled = enabled
+        self.pending_changes = 0
+        self.runs = 0
+        self.last_run_at: datetime | None = None
+        self.last_duration_ms: float | None = None
+        self.last_error: str | None = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def record_gem_change(self):
+        """
+        Count a committed gem change, waking the job once the threshold is hit.
+        """
+        with self._lock:
+            self.pending_changes += 1
+            if self.pending_changes >= self.change_threshold:
+                self._wake.set()
+
+    def start(self):
+        """
+        Start the background thread if the scheduler is enabled.
+        """
+        if not self.enabled or self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, name="rank-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the background thread and wait for an in-flight run to finish.
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_once(self):
+        """
+        Recompute all ranks now and record when and how long it took.
+        """
+        # Imported here: the ranking service reports gem changes to this module
+        from app.services.ranking_service import RankingService
+
+        with self._lock:
+            self.pending_changes = 0
+            self._wake.clear()
+
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        try:
+            with self.session_factory() as db:
+                ranking_service = RankingService(db)
+                ranking_service.assign_ranks()
+                ranking_service.rebuild_rank_index()
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+            logger.exception("Scheduled rank recomputation failed.")
+        finally:
+            self.runs += 1
+            self.last_run_at = started_at
+            self.last_duration_ms = (time.perf_counter() - started) * 1000
+
+    def status(self) -> dict:
+        """
+        Report the scheduler configuration and the outcome of the last run.
+        """
+        return {
+            "enabled": self.enabled,
+            "running": self.running,
+            "interval_seconds": self.interval_seconds,
+            "change_threshold": self.change_threshold,
+            "pending_changes": self.pending_changes,
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_duration_ms": self.last_duration_ms,
+            "last_error": self.last_error,
+        }
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self.interval_seconds)
+            if self._stop.is_set():
+                break
+            self.run_once()
+
+
+# Shared by every request handled by this process
+rank_scheduler = RankScheduler(SessionLocal)
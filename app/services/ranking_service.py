@@ -1,39 +1,221 @@
-from sqlalchemy import asc, desc
+import base64
+import json
+from functools import partial
+from typing import NamedTuple
+
+from sqlalchemy import asc, case, delete, desc, func, insert, select, update
 from sqlalchemy.orm import Session
 
+from app.core.config import RANKING_MODE
+from app.core.database import dialect_insert, run_after_commit
+from app.models.gem_histogram import GemHistogram
 from app.models.user import User
+from app.services.leaderboard_cache import leaderboard_cache
+from app.services.leaderboard_stream import leaderboard_stream
+from app.services.rank_index import GemRankIndex, rank_index
+from app.services.rank_scheduler import rank_scheduler
+
+RANKING_MODES = ("incremental", "window", "scheduled")
+
+
+class RankedUser(NamedTuple):
+    """
+    A leaderboard row with its competition rank.
+    """
+
+    id: int
+    username: str
+    gem_count: int
+    rank: int
+
+
+class NetWorthRank(NamedTuple):
+    """
+    A net-worth leaderboard row with its competition rank.
+    """
+
+    id: int
+    username: str
+    net_worth: float
+    rank: int
+
+
+def encode_cursor(gem_count: int, user_id: int, rank: int, position: int) -> str:
+    """
+    Encode a leaderboard position as an opaque, URL-safe cursor token.
+    """
+    payload = json.dumps([gem_count, user_id, rank, position], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[int, int, int, int]:
+    """
+    Decode a cursor token produced by `encode_cursor`.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        gem_count, user_id, rank, position = (int(value) for value in values)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+    return gem_count, user_id, rank, position
+
+
+class UserStanding(NamedTuple):
+    """
+    A user's position relative to the whole user base.
+    """
+
+    gem_count: int
+    rank: int
+    total_users: int
+    top_percent: float
 
 
 class RankingService:
-    def __init__(self, db: Session):
+    def __init__(
+        self, db: Session, mode: str = RANKING_MODE, index: GemRankIndex = rank_index
+    ):
+        if mode not in RANKING_MODES:
+            raise ValueError(f"Unknown ranking mode '{mode}'.")
         self.db = db
+        self.mode = mode
+        self.index = index
 
     def update_user_gem_count(self, user_id: int, gem_count: int):
         """
         Update the gem count of a user in the database.
         """
+        if gem_count < 0:
+            raise ValueError("Gem count cannot be negative.")
         user = self.db.query(User).filter(User.id == user_id).first()
         if not user:
             raise ValueError("User not found.")
+        previous_gem_count = user.gem_count
         user.gem_count = gem_count
+        self.apply_gem_change(user_id, previous_gem_count, gem_count)
         self.db.commit()
 
+    def apply_gem_change(self, user_id: int, old_gem_count: int, new_gem_count: int):
+        """
+        Record a single user's gem change in the gem histogram.
+
+        The user moves from one bucket to the other with two upserts, whatever
+        the ranking mode. In "incremental" and "window" modes ranks are never
+        stored, so no other user's row is written; in "scheduled" mode
+        users.rank is recomputed in the background. Does not commit; the
+        caller owns the transaction.
+
+        The in-memory rank index and leaderboard cache follow once the
+        transaction commits.
+        """
+        if old_gem_count == new_gem_count:
+            return
+        self._after_commit(user_id, new_gem_count)
+        self._shift_histogram(old_gem_count, -1)
+        self._shift_histogram(new_gem_count, 1)
+
+    def track_user(self, user_id: int, gem_count: int = 0):
+        """
+        Count a newly created user in the gem histogram, and add them
+        to the in-memory rank index on commit.
+        """
+        self._shift_histogram(gem_count, 1)
+        self._after_commit(user_id, gem_count)
+
+    def rebuild_gem_histogram(self):
+        """
+        Rebuild the gem histogram from users with a single GROUP BY.
+        Does not commit.
+        """
+        self.db.execute(delete(GemHistogram))
+        self.db.execute(
+            insert(GemHistogram).from_select(
+                ["gem_count", "user_count"],
+                select(User.gem_count, func.count(User.id)).group_by(User.gem_count),
+            )
+        )
+
+    def get_user_standing(self, user_id: int) -> UserStanding:
+        """
+        Return a user's rank, the total user count and the top percentage
+        they fall in, answered from the gem histogram without sorting users.
+        """
+        gem_count = self.db.execute(
+            select(User.gem_count).where(User.id == user_id)
+        ).scalar()
+        if gem_count is None:
+            raise ValueError("User not found.")
+
+        ahead, total = self.db.execute(
+            select(
+                func.coalesce(
+                    func.sum(
+                        case(
+                            (
+                                GemHistogram.gem_count > gem_count,
+                                GemHistogram.user_count,
+                            ),
+                            else_=0,
+                        )
+                    ),
+                    0,
+                ),
+                func.coalesce(func.sum(GemHistogram.user_count), 0),
+            )
+        ).one()
+        rank = ahead + 1
+        total = max(total, rank)
+        return UserStanding(gem_count, rank, total, round(100 * rank / total, 2))
+
+    def rebuild_rank_index(self):
+        """
+        Load the in-memory rank index from every user's current gem count.
+        """
+        self.index.load(self.db.execute(select(User.id, User.gem_count)).all())
+
+    def get_user_rank(self, user_id: int) -> tuple[int, int]:
+        """
+        Return (gem_count, rank) for a user from the in-memory rank index.
+        Answers in O(log G) without touching the database.
+        """
+        entry = self.index.lookup(user_id)
+        if entry is None:
+            raise ValueError("User not found.")
+        return entry
+
+    def rank_for_gem_count(self, gem_count: int) -> int:
+        """
+        Return the competition rank a user with the given gem count would hold.
+        """
+        return self.db.execute(select(self._rank_expression(gem_count))).scalar_one()
+
     def assign_ranks(self):
         """
         Assign ranks to users in the database based on their gem counts.
         Handles ties by assigning the same rank to users with equal gem counts.
-        """
-        users = self.db.query(User).order_by(desc(User.gem_count)).all()
-        rank = 1
-        previous_gem_count = None
-
-        for i, user in enumerate(users):
-            # Assign the same rank for users with the same gem_count
-            if user.gem_count != previous_gem_count:
-                rank = i + 1  # Adjust rank only for different gem_count
-            user.rank = rank
-            previous_gem_count = user.gem_count
 
+        This is a full rebuild: the gem histogram is recounted, a rank is derived
+        per gem count from its running total, and users are updated by joining on
+        gem_count, so the users table is never sorted. Day-to-day changes only
+        move users between histogram buckets through `apply_gem_change`.
+        """
+        self.rebuild_gem_histogram()
+        ahead = func.sum(GemHistogram.user_count).over(
+            order_by=desc(GemHistogram.gem_count), rows=(None, -1)
+        )
+        bucket_ranks = select(
+            GemHistogram.gem_count,
+            (func.coalesce(ahead, 0) + 1).label("bucket_rank"),
+        ).subquery()
+        self.db.execute(
+            update(User)
+            .where(User.gem_count == bucket_ranks.c.gem_count)
+            .values(rank=bucket_ranks.c.bucket_rank)
+            .execution_options(synchronize_session=False)
+        )
+        run_after_commit(self.db, leaderboard_cache.invalidate)
+        run_after_commit(self.db, leaderboard_stream.mark_dirty)
         self.db.commit()
 
     def get_top_n_users(self, n: int):
@@ -48,3 +230,229 @@ class RankingService:
             .all()
         )
         return top_users
+
+    def get_leaderboard(self, n: int):
+        """
+        Get the top n leaderboard rows as (id, username, gem_count, rank).
+
+        Only columns covered by the (gem_count DESC, id) leaderboard index are
+        read, so Postgres can answer this with an index-only scan. In
+        "incremental" mode each row's rank is summed from the gem histogram, in
+        "window" mode it is computed with RANK() OVER (...), and in "scheduled"
+        mode it is read from users.rank, which may trail gem_count until the
+        next run.
+        """
+        if self.mode == "incremental":
+            rank = self._histogram_rank()
+        elif self.mode == "window":
+            rank = self._rank_window()
+        else:
+            rank = User.rank
+        query = (
+            select(User.id, User.username, User.gem_count, rank.label("rank"))
+            .order_by(desc(User.gem_count), asc(User.id))
+            .limit(n)
+        )
+        return self.db.execute(query).all()
+
+    def get_net_worth_leaderboard(self, n: int) -> list[NetWorthRank]:
+        """
+        Get the top n users by net worth (balance plus portfolio market value).
+
+        Reads the stored net worth through the (net_worth DESC, id) index, so no
+        portfolio is valued at query time. Tied users share a rank.
+        """
+        rows = self.db.execute(
+            select(User.id, User.username, User.net_worth)
+            .order_by(desc(User.net_worth), asc(User.id))
+            .limit(n)
+        ).all()
+        ranked, rank, previous = [], 0, None
+        for position, row in enumerate(rows, start=1):
+            if row.net_worth != previous:
+                rank, previous = position, row.net_worth
+            ranked.append(NetWorthRank(row.id, row.username, row.net_worth, rank))
+        return ranked
+
+    def get_users_around(self, user_id: int, size: int = 5):
+        """
+        Get up to `size` users directly above and below a user on the leaderboard,
+        as (id, username, gem_count, rank) rows in leaderboard order.
+
+        Each direction is answered by keyset seeks on the (gem_count DESC, id)
+        index: first the tied users on either side of the user's ID, then the
+        neighbouring gem counts. No OFFSET is involved, so the cost does not
+        depend on how deep in the ranking the user sits. Ranks are summed from
+        the gem histogram once per distinct gem count in the window.
+        """
+        me = self.db.execute(
+            select(User.id, User.username, User.gem_count).where(User.id == user_id)
+        ).first()
+        if not me:
+            raise ValueError("User not found.")
+
+        above = self._seek_above(me.gem_count, user_id, size)
+        below = self._seek_below(me.gem_count, user_id, size)
+
+        window = list(reversed(above)) + [me] + below
+        ranks = self._ranks_for_gem_counts({row.gem_count for row in window})
+        return [
+            RankedUser(row.id, row.username, row.gem_count, ranks[row.gem_count])
+            for row in window
+        ]
+
+    def get_leaderboard_page(self, limit: int, cursor: str | None = None):
+        """
+        Get one page of the leaderboard in (gem_count DESC, id ASC) order.
+
+        Returns the page as ranked rows and an opaque cursor for the next page,
+        or None on the last page. The cursor carries the last row's sort key,
+        rank and position, so every page is a keyset seek that costs the same
+        as the first and needs no OFFSET or counting.
+        """
+        if cursor is None:
+            rows = self._seek([], [desc(User.gem_count), asc(User.id)], limit + 1)
+            start_position, previous = 1, None
+        else:
+            gem_count, user_id, rank, position = decode_cursor(cursor)
+            rows = self._seek_below(gem_count, user_id, limit + 1)
+            start_position, previous = position + 1, (gem_count, rank)
+
+        page = self._with_competition_ranks(rows[:limit], start_position, previous)
+        if len(rows) <= limit:
+            return page, None
+        last = page[-1]
+        next_cursor = encode_cursor(
+            last.gem_count, last.id, last.rank, start_position + limit - 1
+        )
+        return page, next_cursor
+
+    def _seek_above(self, gem_count: int, user_id: int, limit: int) -> list:
+        """
+        Seek up to `limit` users ranked directly ahead of (gem_count, user_id),
+        nearest first: tied users with a lower ID, then higher gem counts.
+        """
+        rows = self._seek(
+            [User.gem_count == gem_count, User.id < user_id], [desc(User.id)], limit
+        )
+        if len(rows) < limit:
+            rows += self._seek(
+                [User.gem_count > gem_count],
+                [asc(User.gem_count), desc(User.id)],
+                limit - len(rows),
+            )
+        return rows
+
+    def _seek_below(self, gem_count: int, user_id: int, limit: int) -> list:
+        """
+        Seek up to `limit` users ranked directly behind (gem_count, user_id),
+        nearest first: tied users with a higher ID, then lower gem counts.
+        """
+        rows = self._seek(
+            [User.gem_count == gem_count, User.id > user_id], [asc(User.id)], limit
+        )
+        if len(rows) < limit:
+            rows += self._seek(
+                [User.gem_count < gem_count],
+                [desc(User.gem_count), asc(User.id)],
+                limit - len(rows),
+            )
+        return rows
+
+    def _seek(self, conditions, order_by, limit: int) -> list:
+        """
+        Run a single keyset seek on the leaderboard index.
+        """
+        query = (
+            select(User.id, User.username, User.gem_count)
+            .where(*conditions)
+            .order_by(*order_by)
+            .limit(limit)
+        )
+        return list(self.db.execute(query).all())
+
+    def _ranks_for_gem_counts(self, gem_counts: set[int]) -> dict[int, int]:
+        """
+        Return the competition rank for each of the given gem counts, summed
+        from the gem histogram in a single round trip.
+        """
+        gem_counts = sorted(gem_counts)
+        ranks = self.db.execute(
+            select(*(self._rank_expression(gem_count) for gem_count in gem_counts))
+        ).one()
+        return dict(zip(gem_counts, ranks))
+
+    @staticmethod
+    def _with_competition_ranks(rows, start_position: int, previous=None):
+        """
+        Attach competition ranks to a contiguous slice of the leaderboard that
+        starts at `start_position`.
+
+        Uses the same tie rules as `assign_ranks`: equal gem counts share a
+        rank, and a new gem count takes its position as rank. `previous` is the
+        (gem_count, rank) of the row just before the slice, if any.
+        """
+        previous_gem_count, rank = previous or (None, None)
+        ranked = []
+        for i, row in enumerate(rows):
+            # Assign the same rank for users with the same gem_count
+            if row.gem_count != previous_gem_count:
+                rank = start_position + i
+            ranked.append(RankedUser(row.id, row.username, row.gem_count, rank))
+            previous_gem_count = row.gem_count
+        return ranked
+
+    @staticmethod
+    def _histogram_rank():
+        """
+        Per-row rank for queries over users: `1 + users with more gems`,
+        summed over the gem histogram buckets above the row's gem count.
+        """
+        ahead = (
+            select(func.coalesce(func.sum(GemHistogram.user_count), 0))
+            .where(GemHistogram.gem_count > User.gem_count)
+            .correlate(User)
+        )
+        return ahead.scalar_subquery() + 1
+
+    @staticmethod
+    def _rank_window():
+        """
+        Competition rank over all users: ties share a rank and the next
+        distinct gem count skips ahead, matching `assign_ranks`.
+        """
+        return func.rank().over(order_by=desc(User.gem_count))
+
+    def _after_commit(self, user_id: int, gem_count: int):
+        """
+        Propagate a user's new gem count to process-local state on commit.
+        """
+        run_after_commit(self.db, partial(self.index.update, user_id, gem_count))
+        run_after_commit(self.db, leaderboard_cache.invalidate)
+        run_after_commit(self.db, leaderboard_stream.mark_dirty)
+        run_after_commit(self.db, rank_scheduler.record_gem_change)
+
+    def _shift_histogram(self, gem_count: int, delta: int):
+        """
+        Add delta to the number of users holding gem_count.
+        """
+        upsert = dialect_insert(self.db, GemHistogram).values(
+            gem_count=gem_count, user_count=delta
+        )
+        self.db.execute(
+            upsert.on_conflict_do_update(
+                index_elements=[GemHistogram.gem_count],
+                set_={"user_count": GemHistogram.user_count + delta},
+            )
+        )
+
+    @staticmethod
+    def _rank_expression(gem_count: int):
+        """
+        Build a scalar expression for `1 + number of users with more gems`,
+        summed over the gem histogram instead of counting users.
+        """
+        ahead = select(func.coalesce(func.sum(GemHistogram.user_count), 0)).where(
+            GemHistogram.gem_count > gem_count
+        )
+        return ahead.scalar_subquery() + 1
@@ -0,0 +1,298 @@
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from typing import Any, NamedTuple
+
+from loguru import logger
+from sqlalchemy import Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    TRADE_ACTOR_WORKERS,
+    TRADE_GROUP_COMMIT_MAX_BATCH,
+    TRADE_GROUP_COMMIT_MAX_DELAY_MS,
+)
+from app.core.database import DEFERRED_AFTER_COMMIT, engine
+from app.services.portfolio_service import PortfolioService, TradeLeg
+
+
+class _Trade(NamedTuple):
+    method: str
+    kwargs: dict
+    future: Future
+
+
+class _TradeMethods(ABC):
+    """
+    The PortfolioService trade methods, forwarded to `submit`.
+    """
+
+    def add_asset_to_portfolio(self, user_id: int, asset_id: int, quantity: int):
+        """
+        Queue a buy; see PortfolioService.add_asset_to_portfolio.
+        """
+        return self.submit(
+            "add_asset_to_portfolio",
+            user_id=user_id,
+            asset_id=asset_id,
+            quantity=quantity,
+        )
+
+    def remove_asset_from_portfolio(self, user_id: int, asset_id: int, quantity: int):
+        """
+        Queue a sell; see PortfolioService.remove_asset_from_portfolio.
+        """
+        return self.submit(
+            "remove_asset_from_portfolio",
+            user_id=user_id,
+            asset_id=asset_id,
+            quantity=quantity,
+        )
+
+    def execute_trades(self, user_id: int, legs: list[TradeLeg]):
+        """
+        Queue a batch of legs; see PortfolioService.execute_trades.
+        """
+        return self.submit("execute_trades", user_id=user_id, legs=legs)
+
+    @abstractmethod
+    def submit(self, method: str, **kwargs) -> Any:
+        """
+        Run the named PortfolioService method with `kwargs` and return its
+        result once the trade has committed.
+        """
+
+
+class GroupCommitExecutor(_TradeMethods):
+    """
+    Executes trades from many requests in shared transactions (group commit).
+
+    Callers block on a future while a worker thread drains the queue, either
+    every `max_delay_ms` or as soon as `max_batch` trades are waiting. Each trade
+    in a batch runs through PortfolioService in its own SAVEPOINT, so a rejected
+    trade is rolled back alone, and the batch is committed once. Futures are
+    resolved only after that commit, so a trade that returns is as durable as one
+    committed on its own; if the commit fails, every trade in the batch fails.
+    """
+
+    def __init__(
+        self,
+        bind: Engine = engine,
+        max_batch: int = TRADE_GROUP_COMMIT_MAX_BATCH,
+        max_delay_ms: float = TRADE_GROUP_COMMIT_MAX_DELAY_MS,
+    ):
+        self.bind = bind
+        self.max_batch = max_batch
+        self.max_delay_ms = max_delay_ms
+        self.batches = 0
+        self.trades = 0
+        self._queue: queue.Queue[_Trade | None] = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        # Checked without the lock on every trade; start() and stop() set it
+        self._started = False
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, method: str, **kwargs) -> Any:
+        """
+        Queue a PortfolioService call and wait until its batch has committed.
+        """
+        if not self._started:
+            self.start()
+        future = Future()
+        self._queue.put(_Trade(method, kwargs, future))
+        return future.result()
+
+    def start(self):
+        """
+        Start the worker thread if it is not already running.
+        """
+        with self._lock:
+            if not self.running:
+                self._thread = threading.Thread(
+                    target=self._loop, name="trade-group-commit", daemon=True
+                )
+                self._thread.start()
+            self._started = True
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Commit whatever is queued, then stop the worker thread.
+        """
+        with self._lock:
+            self._started = False
+            if self._thread is None:
+                return
+            self._queue.put(None)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def run_batch(self, batch: list[_Trade]):
+        """
+        Apply a batch of trades in one transaction and resolve their futures.
+        """
+        outcomes, callbacks = [], []
+        try:
+            with self.bind.connect() as connection:
+                transaction = connection.begin()
+                for trade in batch:
+                    # Each service commit only releases this trade's savepoint
+                    db = Session(
+                        bind=connection, join_transaction_mode="create_savepoint"
+                    )
+                    db.info[DEFERRED_AFTER_COMMIT] = callbacks
+                    try:
+                        service = PortfolioService(db)
+                        result = getattr(service, trade.method)(**trade.kwargs)
+                        outcomes.append((trade.future, result, None))
+                    except Exception as e:
+                        outcomes.append((trade.future, None, e))
+                    finally:
+                        db.close()
+                transaction.commit()
+        except Exception as e:
+            logger.exception("Group commit of {} trades failed.", len(batch))
+            for trade in batch:
+                trade.future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.trades += len(batch)
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                logger.exception("After-commit callback failed.")
+        for future, result, error in outcomes:
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def _loop(self):
+        stopping = False
+        while not stopping:
+            trade = self._queue.get()
+            if trade is None:
+                break
+            batch = [trade]
+            deadline = time.monotonic() + self.max_delay_ms / 1000
+            while len(batch) < self.max_batch:
+                try:
+                    trade = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if trade is None:
+                    stopping = True
+                    break
+                batch.append(trade)
+            self.run_batch(batch)
+
+
+class UserActorExecutor(_TradeMethods):
+    """
+    Executes each user's trades one at a time on a worker that owns the user.
+
+    Trades are hash-partitioned by user_id over `workers` threads, each with its
+    own queue and committing each trade in its own session. All trades of one
+    user are therefore applied in submission order by a single thread and never
+    wait on each other's row locks, while users owned by different workers
+    trade in parallel.
+    """
+
+    def __init__(self, bind: Engine = engine, workers: int = TRADE_ACTOR_WORKERS):
+        self.bind = bind
+        self.workers = workers
+        # Trades committed by each worker, written only by that worker's thread
+        self._trades = [0] * workers
+        self._queues: list[queue.Queue[_Trade | None]] = [
+            queue.Queue() for _ in range(workers)
+        ]
+        self._lock = threading.Lock()
+        self._threads: list[threading.Thread] = []
+        # Checked without the lock on every trade; start() and stop() set it
+        self._started = False
+
+    @property
+    def running(self) -> bool:
+        return any(thread.is_alive() for thread in self._threads)
+
+    @property
+    def trades(self) -> int:
+        return sum(self._trades)
+
+    def worker_for(self, user_id: int) -> int:
+        """
+        Return the index of the worker that owns a user.
+        """
+        return hash(user_id) % self.workers
+
+    def submit(self, method: str, **kwargs) -> Any:
+        """
+        Queue a PortfolioService call on the user's worker and wait for it to
+        commit.
+        """
+        if not self._started:
+            self.start()
+        future = Future()
+        self._queues[self.worker_for(kwargs["user_id"])].put(
+            _Trade(method, kwargs, future)
+        )
+        return future.result()
+
+    def start(self):
+        """
+        Start the worker threads if they are not already running.
+        """
+        with self._lock:
+            if not self.running:
+                self._threads = [
+                    threading.Thread(
+                        target=self._loop,
+                        args=(i,),
+                        name=f"trade-actor-{i}",
+                        daemon=True,
+                    )
+                    for i in range(self.workers)
+                ]
+                for thread in self._threads:
+                    thread.start()
+            self._started = True
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Finish whatever is queued, then stop the worker threads.
+        """
+        with self._lock:
+            self._started = False
+            # Without workers a sentinel would stay queued and stop the next ones
+            if not self.running:
+                self._threads = []
+                return
+            for trades in self._queues:
+                trades.put(None)
+            for thread in self._threads:
+                thread.join(timeout)
+            self._threads = []
+
+    def _loop(self, worker: int):
+        trades = self._queues[worker]
+        while (trade := trades.get()) is not None:
+            try:
+                with Session(bind=self.bind) as db:
+                    service = PortfolioService(db)
+                    result = getattr(service, trade.method)(**trade.kwargs)
+                self._trades[worker] += 1
+                trade.future.set_result(result)
+            except Exception as e:
+                trade.future.set_exception(e)
+
+
+# Shared by every request handled by this process
+group_commit_executor = GroupCommitExecutor()
+user_actor_executor = UserActorExecutor()
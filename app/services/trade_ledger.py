@@ -0,0 +1,183 @@
+import base64
+import json
+from datetime import date, datetime, timezone
+from functools import partial
+
+from loguru import logger
+from sqlalchemy import desc, insert, or_, select, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import TRADE_PARTITION_MONTHS_AHEAD
+from app.core.database import run_after_commit
+from app.core.metrics import trades_total
+from app.models.trade import Trade
+
+
+def encode_trade_cursor(created_at: datetime, trade_id: int) -> str:
+    """
+    Encode a position in a user's trade history as an opaque cursor token.
+    """
+    payload = json.dumps([created_at.isoformat(), trade_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_trade_cursor(cursor: str) -> tuple[datetime, int]:
+    """
+    Decode a cursor token produced by `encode_trade_cursor`.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, trade_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(created_at), int(trade_id)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+
+
+def _count_trades(buys: int, sells: int):
+    """
+    Add committed trades to the trades_total metric.
+    """
+    if buys:
+        trades_total.inc(("buy",), buys)
+    if sells:
+        trades_total.inc(("sell",), sells)
+
+
+class TradeLedger:
+    """
+    Writes executed trades to the append-only `trades` table and pages through
+    a user's history by (created_at, id), newest first.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def record(self, user_id: int, fills: list[tuple[str, int, int, float]]):
+        """
+        Append (side, asset_id, quantity, price) fills for a user with a single
+        INSERT. Does not commit; the caller owns the transaction.
+        """
+        now = datetime.now(timezone.utc)
+        self.db.execute(
+            insert(Trade),
+            [
+                {
+                    "user_id": user_id,
+                    "side": side,
+                    "asset_id": asset_id,
+                    "quantity": quantity,
+                    "price": price,
+                    "created_at": now,
+                }
+                for side, asset_id, quantity, price in fills
+            ],
+        )
+        buys = sum(1 for side, *_ in fills if side == "buy")
+        run_after_commit(self.db, partial(_count_trades, buys, len(fills) - buys))
+
+    def history(self, user_id: int, limit: int, cursor: str | None = None):
+        """
+        Get one page of a user's trades, newest first, and the cursor for the
+        next page (None on the last page). Each page is a keyset seek on the
+        (user_id, created_at, id) index, so deep pages cost the same as the first.
+        """
+        query = (
+            select(
+                Trade.id,
+                Trade.asset_id,
+                Trade.side,
+                Trade.quantity,
+                Trade.price,
+                Trade.created_at,
+            )
+            .where(Trade.user_id == user_id)
+            .order_by(desc(Trade.created_at), desc(Trade.id))
+            .limit(limit + 1)
+        )
+        if cursor is not None:
+            created_at, trade_id = decode_trade_cursor(cursor)
+            query = query.where(
+                or_(
+                    Trade.created_at < created_at,
+                    (Trade.created_at == created_at) & (Trade.id < trade_id),
+                )
+            )
+        rows = self.db.execute(query).all()
+        if len(rows) <= limit:
+            return rows, None
+        last = rows[limit - 1]
+        return rows[:limit], encode_trade_cursor(last.created_at, last.id)
+
+    def ensure_partitions(self, months_ahead: int = TRADE_PARTITION_MONTHS_AHEAD):
+        """
+        Create the monthly Postgres partitions of `trades` for the current month
+        and the next `months_ahead`, so inserts never land in the default
+        partition. Runs at startup and on every maintenance pass, well ahead of
+        each month boundary. A no-op on other databases or an unpartitioned
+        table.
+
+        Each partition is created in its own transaction; one that cannot be
+        created is logged and retried on the next pass instead of failing the
+        caller.
+        """
+        if self.db.get_bind().dialect.name != "postgresql":
+            return
+        partitioned = self.db.execute(
+            text(
+                "SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = 'trades'::regclass"
+            )
+        ).first()
+        if not partitioned:
+            return
+
+        today = date.today()
+        for offset in range(months_ahead + 1):
+            year, month = divmod(today.month - 1 + offset, 12)
+            start = date(today.year + year, month + 1, 1)
+            year, month = divmod(start.month, 12)
+            end = date(start.year + year, month + 1, 1)
+            name = f"trades_{start:%Y_%m}"
+            try:
+                exists = self.db.execute(
+                    text("SELECT to_regclass(:name)"), {"name": name}
+                ).scalar()
+                if not exists:
+                    self._create_partition(name, start, end)
+                self.db.commit()
+            except SQLAlchemyError:
+                self.db.rollback()
+                logger.exception("Creating trades partition {} failed.", name)
+
+    def _create_partition(self, name: str, start: date, end: date):
+        """
+        Create one monthly partition. Trades of the month that already landed
+        in the default partition, which would make creating it fail, are moved
+        into it first. Does not commit.
+        """
+        bounds = f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        in_range = "created_at >= :start AND created_at < :end"
+        stranded = self.db.execute(
+            text(f"SELECT count(*) FROM trades_default WHERE {in_range}"),
+            {"start": start, "end": end},
+        ).scalar()
+        if not stranded:
+            self.db.execute(text(f"CREATE TABLE {name} PARTITION OF trades {bounds}"))
+            return
+
+        logger.warning("Moving {} trades from trades_default into {}.", stranded, name)
+        self.db.execute(
+            text(
+                f"CREATE TABLE {name} "
+                "(LIKE trades INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+            )
+        )
+        self.db.execute(
+            text(
+                f"WITH moved AS (DELETE FROM trades_default WHERE {in_range} "
+                f"RETURNING *) INSERT INTO {name} SELECT * FROM moved"
+            ),
+            {"start": start, "end": end},
+        )
+        self.db.execute(text(f"ALTER TABLE trades ATTACH PARTITION {name} {bounds}"))
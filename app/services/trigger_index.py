@@ -0,0 +1,92 @@
+import threading
+from bisect import bisect_left, insort
+from typing import Iterable
+
+
+class TriggerIndex:
+    """
+    Process-local index of pending conditional orders by trigger price.
+
+    Each asset keeps two sorted lists of (key, order_id), arranged so that the
+    orders a price move crosses always sit at the end of the list:
+    - "below" orders fire once price <= trigger, keyed by trigger price;
+    - "above" orders fire once price >= trigger, keyed by negated trigger price.
+    A new price therefore finds its k crossed orders with one binary search,
+    O(log n + k), without touching the orders that stay pending.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._below: dict[int, list[tuple[float, int]]] = {}
+        self._above: dict[int, list[tuple[float, int]]] = {}
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(keys) for keys in self._below.values()) + sum(
+                len(keys) for keys in self._above.values()
+            )
+
+    def load(self, rows: Iterable[tuple[int, int, str, float]]):
+        """
+        Replace the index contents with (order_id, asset_id, direction,
+        trigger_price) rows.
+        """
+        below: dict[int, list[tuple[float, int]]] = {}
+        above: dict[int, list[tuple[float, int]]] = {}
+        for order_id, asset_id, direction, trigger_price in rows:
+            if direction == "below":
+                below.setdefault(asset_id, []).append((trigger_price, order_id))
+            else:
+                above.setdefault(asset_id, []).append((-trigger_price, order_id))
+        for keys in (*below.values(), *above.values()):
+            keys.sort()
+        with self._lock:
+            self._below, self._above = below, above
+
+    def add(self, order_id: int, asset_id: int, direction: str, trigger_price: float):
+        """
+        Start watching a pending order.
+        """
+        book, key = self._side(direction, trigger_price)
+        with self._lock:
+            insort(book.setdefault(asset_id, []), (key, order_id))
+
+    def remove(
+        self, order_id: int, asset_id: int, direction: str, trigger_price: float
+    ):
+        """
+        Stop watching an order, if it is still indexed.
+        """
+        book, key = self._side(direction, trigger_price)
+        with self._lock:
+            keys = book.get(asset_id)
+            if not keys:
+                return
+            i = bisect_left(keys, (key, order_id))
+            if i < len(keys) and keys[i] == (key, order_id):
+                del keys[i]
+
+    def triggered(self, asset_id: int, price: float) -> list[tuple[int, str, float]]:
+        """
+        Return (order_id, direction, trigger_price) for the orders that trigger
+        at `price`, leaving them indexed until they are removed.
+        """
+        with self._lock:
+            below = self._below.get(asset_id, [])
+            above = self._above.get(asset_id, [])
+            return [
+                (order_id, "below", key)
+                for key, order_id in below[bisect_left(below, (price,)) :]
+            ] + [
+                (order_id, "above", -key)
+                for key, order_id in above[bisect_left(above, (-price,)) :]
+            ]
+
+    def _side(self, direction: str, trigger_price: float):
+        if direction == "below":
+            return self._below, trigger_price
+        return self._above, -trigger_price
+
+
+# Shared by every request handled by this process
+trigger_index = TriggerIndex()
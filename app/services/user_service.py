@@ -1,19 +1,15 @@
-import logging
-
 from sqlalchemy.orm import Session
 
+from app.core.database import retry_on_conflict
 from app.models.user import User
 from app.schemas.users import UserCreate
-
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+from app.services.ranking_service import RankingService
+from app.services.valuation_service import ValuationService
 
 
 class UserService:
     def __init__(self, db: Session):
         self.db = db
-        logger.info(f"UserService initialized with session: {db.bind.url}")
 
     def create_user(self, user_data: UserCreate) -> User:
         """
@@ -26,9 +22,16 @@ class UserService:
         if existing_user:
             raise ValueError("Username already exists.")
 
-        # Create a new user instance and add to the database
-        user = User(username=user_data.username)
+        # Create a new user instance and add to the database. New users start
+        # with no gems, so they share the rank of everyone else on zero.
+        ranking_service = RankingService(self.db)
+        user = User(
+            username=user_data.username,
+            rank=ranking_service.rank_for_gem_count(0),
+        )
         self.db.add(user)
+        self.db.flush()
+        ranking_service.track_user(user.id)
         self.db.commit()
         self.db.refresh(user)  # Refresh to get updated fields (e.g., autogenerated ID)
         return user
@@ -51,21 +54,35 @@ class UserService:
     def deposit_balance(self, user_id: int, amount: float):
         """
         Deposit an amount to the user's balance.
+        The write is a compare-and-swap on the user's version, retried from a
+        fresh read if a concurrent write got there first.
         """
-        user = self.get_user(user_id)
-        if amount <= 0:
-            raise ValueError("Deposit amount must be positive.")
-        user.balance += amount
-        self.db.commit()
+
+        def deposit():
+            user = self.get_user(user_id)
+            if amount <= 0:
+                raise ValueError("Deposit amount must be positive.")
+            user.balance += amount
+            ValuationService(self.db).apply_cash_change(user.id, amount)
+            self.db.commit()
+
+        retry_on_conflict(self.db, deposit)
 
     def withdraw_balance(self, user_id: int, amount: float):
         """
         Withdraw an amount from the user's balance if sufficient funds are available.
+        The funds check and the write are retried together if the user's version
+        moved on in between.
         """
-        user = self.get_user(user_id)
-        if amount <= 0:
-            raise ValueError("Withdrawal amount must be positive.")
-        if user.balance < amount:
-            raise ValueError("Insufficient funds.")
-        user.balance -= amount
-        self.db.commit()
+
+        def withdraw():
+            user = self.get_user(user_id)
+            if amount <= 0:
+                raise ValueError("Withdrawal amount must be positive.")
+            if user.balance < amount:
+                raise ValueError("Insufficient funds.")
+            user.balance -= amount
+            ValuationService(self.db).apply_cash_change(user.id, -amount)
+            self.db.commit()
+
+        retry_on_conflict(self.db, withdraw)
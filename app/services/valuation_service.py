@@ -0,0 +1,122 @@
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Asset, Portfolio, PortfolioAsset, User
+
+
+class ValuationService:
+    """
+    Maintains the stored portfolio market values and user net worth that back
+    the net-worth leaderboard.
+
+    Every change is applied as a relative, set-based UPDATE in the caller's
+    transaction, so nothing here commits and no portfolio is ever revalued
+    from scratch on the request path.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def apply_trade(
+        self, portfolio_id: int, user_id: int, holding_delta: float, cash_delta: float
+    ):
+        """
+        Record a trade that moved `holding_delta` of market value into the
+        portfolio and `cash_delta` into the user's balance.
+        """
+        self.db.execute(
+            update(Portfolio)
+            .where(Portfolio.id == portfolio_id)
+            .values(market_value=Portfolio.market_value + holding_delta)
+            .execution_options(synchronize_session=False)
+        )
+        # Trades at the market price leave net worth unchanged
+        if holding_delta + cash_delta:
+            self.apply_cash_change(user_id, holding_delta + cash_delta)
+
+    def apply_cash_change(self, user_id: int, amount: float):
+        """
+        Record a deposit (positive) or withdrawal (negative) in net worth.
+        """
+        self.db.execute(
+            update(User)
+            .where(User.id == user_id)
+            .values(net_worth=User.net_worth + amount)
+            .execution_options(synchronize_session=False)
+        )
+
+    def apply_price_change(self, asset_id: int, old_price: float, new_price: float):
+        """
+        Revalue every holding of an asset after its price changed, touching
+        only the portfolios and users that hold it.
+        """
+        delta = new_price - old_price
+        if not delta:
+            return
+
+        held_in_portfolio = (
+            select(func.sum(PortfolioAsset.quantity))
+            .where(
+                PortfolioAsset.portfolio_id == Portfolio.id,
+                PortfolioAsset.asset_id == asset_id,
+            )
+            .scalar_subquery()
+        )
+        self.db.execute(
+            update(Portfolio)
+            .where(
+                Portfolio.id.in_(
+                    select(PortfolioAsset.portfolio_id).where(
+                        PortfolioAsset.asset_id == asset_id
+                    )
+                )
+            )
+            .values(market_value=Portfolio.market_value + delta * held_in_portfolio)
+            .execution_options(synchronize_session=False)
+        )
+
+        held_by_user = (
+            select(func.sum(PortfolioAsset.quantity))
+            .join(Portfolio, Portfolio.id == PortfolioAsset.portfolio_id)
+            .where(Portfolio.user_id == User.id, PortfolioAsset.asset_id == asset_id)
+            .scalar_subquery()
+        )
+        self.db.execute(
+            update(User)
+            .where(
+                User.id.in_(
+                    select(Portfolio.user_id)
+                    .join(PortfolioAsset, PortfolioAsset.portfolio_id == Portfolio.id)
+                    .where(PortfolioAsset.asset_id == asset_id)
+                )
+            )
+            .values(net_worth=User.net_worth + delta * held_by_user)
+            .execution_options(synchronize_session=False)
+        )
+
+    def rebuild_valuations(self):
+        """
+        Recompute every market value and net worth from the holdings.
+        Repairs any drift; does not commit.
+        """
+        holdings_value = (
+            select(func.sum(PortfolioAsset.quantity * Asset.price))
+            .join(Asset, Asset.id == PortfolioAsset.asset_id)
+            .where(PortfolioAsset.portfolio_id == Portfolio.id)
+            .scalar_subquery()
+        )
+        self.db.execute(
+            update(Portfolio)
+            .values(market_value=func.coalesce(holdings_value, 0.0))
+            .execution_options(synchronize_session=False)
+        )
+        market_value = (
+            select(Portfolio.market_value)
+            .where(Portfolio.user_id == User.id)
+            .scalar_subquery()
+        )
+        self.db.execute(
+            update(User)
+            .values(net_worth=User.balance + func.coalesce(market_value, 0.0))
+            .execution_options(synchronize_session=False)
+        )
@@ -1,11 +1,15 @@
+from contextlib import contextmanager
+
 import pytest
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from tests.test_database import TestSessionLocal, test_engine
 
 from app.core.database import Base, get_db
 from app.main import app
 from app.models import User
+from app.services.leaderboard_cache import leaderboard_cache
 
 # SQLite test database URL for unit tests
 SQLITE_TEST_DATABASE_URL = "sqlite:///:memory:"
@@ -69,10 +73,14 @@ def postgres_db_session(postgres_engine):
 
     app.dependency_overrides[get_db] = _test_db_override
 
+    # Snapshots from earlier tests do not match the freshly seeded tables
+    leaderboard_cache.clear()
+
     # Clean tables and reset sequences before the test
     for table in reversed(Base.metadata.sorted_tables):
         session.execute(table.delete())
-        session.execute(text(f"ALTER SEQUENCE {table.name}_id_seq RESTART WITH 1;"))
+        if "id" in table.c:
+            session.execute(text(f"ALTER SEQUENCE {table.name}_id_seq RESTART WITH 1;"))
     session.commit()
 
     try:
@@ -125,3 +133,34 @@ def postgres_users(postgres_db_session):
     postgres_db_session.bulk_save_objects(user_data)
     postgres_db_session.commit()
     return user_data
+
+
+@pytest.fixture
+def query_counter():
+    """
+    Count the SQL statements run inside a block, on any engine and thread, and
+    fail the test if there are more than `max_queries`:
+
+        with query_counter(max_queries=2) as statements:
+            ...
+    """
+
+    @contextmanager
+    def counting(max_queries: int | None = None):
+        statements = []
+
+        def collect(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(Engine, "before_cursor_execute", collect)
+        try:
+            yield statements
+        finally:
+            event.remove(Engine, "before_cursor_execute", collect)
+        if max_queries is not None:
+            assert len(statements) <= max_queries, (
+                f"Expected at most {max_queries} queries, ran {len(statements)}:\n"
+                + "\n".join(statements)
+            )
+
+    return counting
@@ -2,6 +2,7 @@ import pytest
 
 from app.models import User
 from app.services import AssetService, PortfolioService, RankingService, UserService
+from app.services.achievement_service import AchievementService
 
 
 @pytest.fixture
@@ -36,6 +37,15 @@ def asset_service(sqlite_db_session):
     return AssetService(sqlite_db_session)
 
 
+@pytest.fixture
+def achievement_service(sqlite_db_session):
+    """
+    Fixture to initialize AchievementService with the SQLite test database session,
+    for draining the achievement outbox before asserting gem counts.
+    """
+    return AchievementService(sqlite_db_session)
+
+
 # User and data fixtures
 @pytest.fixture(autouse=True)
 def sqlite_users(sqlite_db_session):
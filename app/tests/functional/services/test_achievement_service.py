@@ -0,0 +1,85 @@
+import pytest
+from sqlalchemy import event
+
+from app.models import AchievementEvent
+from app.services.achievement_service import gems_for_trades
+from app.services.achievement_worker import AchievementWorker
+
+pytestmark = pytest.mark.functional
+
+
+def test_gems_for_trades():
+    """Test that each trade earns a gem plus every milestone it crosses."""
+    assert gems_for_trades(trade_count=3, trades=1) == 1
+    assert gems_for_trades(trade_count=5, trades=1) == 6
+    assert gems_for_trades(trade_count=11, trades=8) == 8 + 5 + 10
+
+
+def test_process_pending_folds_awards_into_one_update(
+    sqlite_engine, achievement_service, user_service, sqlite_db_session
+):
+    """Test that one batch awards many users with a single UPDATE of users."""
+    # Arrange: Eve (4 trades) reaches the fifth-trade milestone in two events
+    achievement_service.record_trades(user_id=5, trade_count=5)
+    achievement_service.record_trades(user_id=5, trade_count=6)
+    achievement_service.record_trades(user_id=1, trade_count=3, trades=3)
+    sqlite_db_session.commit()
+    updates = []
+
+    def collect(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE users"):
+            updates.append(statement)
+
+    event.listen(sqlite_engine, "before_cursor_execute", collect)
+
+    # Act
+    try:
+        processed = achievement_service.process_pending()
+    finally:
+        event.remove(sqlite_engine, "before_cursor_execute", collect)
+
+    # Assert: Rank upkeep updates users too, but gems move in one statement
+    assert processed == 3
+    assert sum("gem_count=(users.gem_count" in update for update in updates) == 1
+    assert user_service.get_user(user_id=5).gem_count == 4 + 6 + 1
+    assert user_service.get_user(user_id=1).gem_count == 150 + 3
+    assert achievement_service.pending_count() == 0
+
+
+def test_process_pending_respects_limit(achievement_service, sqlite_db_session):
+    """Test that a batch takes the oldest events first and no more than the limit."""
+    # Arrange
+    for trade_count in range(1, 4):
+        achievement_service.record_trades(user_id=2, trade_count=trade_count)
+    sqlite_db_session.commit()
+
+    # Act
+    first = achievement_service.process_pending(limit=2)
+
+    # Assert
+    assert first == 2
+    remaining = sqlite_db_session.query(AchievementEvent).one()
+    assert remaining.trade_count == 3
+
+
+def test_worker_drains_outbox(
+    sqlite_engine, achievement_service, user_service, sqlite_db_session
+):
+    """Test that one worker run processes batches until the outbox is empty."""
+    # Arrange
+    for trade_count in range(1, 6):
+        achievement_service.record_trades(user_id=3, trade_count=trade_count)
+    sqlite_db_session.commit()
+    worker = AchievementWorker(
+        lambda: type(sqlite_db_session)(bind=sqlite_engine), batch_size=2
+    )
+
+    # Act
+    processed = worker.run_once()
+
+    # Assert
+    assert processed == 5
+    assert worker.status()["batches"] == 3
+    assert worker.status()["last_error"] is None
+    sqlite_db_session.expire_all()
+    assert user_service.get_user(user_id=3).gem_count == 200 + 5 + 5
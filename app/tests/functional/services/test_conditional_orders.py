@@ -0,0 +1,279 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event, update
+from sqlalchemy.exc import OperationalError
+
+from app.models import ConditionalOrder, User
+from app.services.conditional_order_service import ConditionalOrderService
+from app.services.trigger_index import TriggerIndex, trigger_index
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture(autouse=True)
+def empty_trigger_index():
+    """Start every test with an empty process-wide trigger index."""
+    trigger_index.load([])
+    yield
+    trigger_index.load([])
+
+
+@pytest.fixture
+def order_service(sqlite_db_session):
+    """Fixture for a ConditionalOrderService on the shared trigger index."""
+    return ConditionalOrderService(sqlite_db_session)
+
+
+@pytest.fixture
+def gold(portfolio_service, asset_service):
+    """
+    Fixture for an asset priced at 100 that Bob (ID 2) holds 5 units of, with
+    portfolios for Alice (ID 1) and Bob.
+    """
+    asset = asset_service.create_asset(name="Gold", price=100.0)
+    portfolio_service.create_portfolio(user_id=1)
+    portfolio_service.create_portfolio(user_id=2)
+    portfolio_service.add_asset_to_portfolio(user_id=2, asset_id=asset.id, quantity=5)
+    return asset
+
+
+def test_trigger_index_finds_only_crossed_orders():
+    """Test that a price move returns exactly the orders it crosses."""
+    # Arrange
+    index = TriggerIndex()
+    index.load(
+        [
+            (1, 7, "below", 90.0),
+            (2, 7, "below", 80.0),
+            (3, 7, "above", 110.0),
+            (4, 7, "above", 120.0),
+            (5, 8, "below", 95.0),
+        ]
+    )
+
+    # Act: remove each crossed order once handled, as execution does
+    fell = index.triggered(7, 85.0)
+    for order_id, direction, trigger_price in fell:
+        index.remove(order_id, 7, direction, trigger_price)
+    rose = index.triggered(7, 110.0)
+    again = index.triggered(7, 85.0)
+
+    # Assert
+    assert fell == [(1, "below", 90.0)]
+    assert rose == [(3, "above", 110.0)]
+    assert again == []
+    assert len(index) == 4
+
+
+def test_trigger_index_remove():
+    """Test that a removed order no longer triggers."""
+    # Arrange
+    index = TriggerIndex()
+    index.add(1, 7, "below", 90.0)
+    index.add(2, 7, "below", 90.0)
+
+    # Act
+    index.remove(1, 7, "below", 90.0)
+
+    # Assert
+    assert index.triggered(7, 50.0) == [(2, "below", 90.0)]
+
+
+def test_limit_buy_executes_when_price_falls(
+    order_service, asset_service, gold, sqlite_db_session
+):
+    """Test that a limit buy fills through the normal buy path once triggered."""
+    # Arrange
+    order = order_service.create_order(1, gold.id, "buy", "limit", 2, 90.0)
+
+    # Act
+    asset_service.update_asset(gold.id, price=95.0)
+    untouched = order_service.list_orders(1)[0].status
+    asset_service.update_asset(gold.id, price=85.0)
+
+    # Assert
+    assert untouched == "pending"
+    sqlite_db_session.expire_all()
+    executed = sqlite_db_session.get(ConditionalOrder, order.id)
+    assert executed.status == "executed"
+    assert executed.executed_price == 85.0
+    assert sqlite_db_session.get(User, 1).balance == 500.0 - 170.0
+    assert len(trigger_index) == 0
+
+
+def test_stop_sell_executes_when_price_falls(
+    order_service, asset_service, gold, sqlite_db_session
+):
+    """Test that a stop sell sells the holding once the price drops."""
+    # Arrange
+    order_service.create_order(2, gold.id, "sell", "stop", 5, 80.0)
+
+    # Act
+    asset_service.update_asset(gold.id, price=75.0)
+
+    # Assert
+    sqlite_db_session.expire_all()
+    assert order_service.list_orders(2)[0].status == "executed"
+    assert sqlite_db_session.get(User, 2).balance == 1000.0 - 500.0 + 375.0
+
+
+def test_triggered_order_that_cannot_execute_fails(order_service, asset_service, gold):
+    """Test that a rejected trade marks the order failed with the reason."""
+    # Arrange
+    order_service.create_order(1, gold.id, "buy", "stop", 10, 120.0)
+
+    # Act
+    asset_service.update_asset(gold.id, price=125.0)
+
+    # Assert
+    order = order_service.list_orders(1)[0]
+    assert order.status == "failed"
+    assert order.error == "Insufficient balance to complete the trade."
+
+
+def test_create_order_already_triggered(order_service, gold):
+    """Test that an order whose trigger is already reached is rejected."""
+    # Act & Assert
+    with pytest.raises(ValueError, match="is already reached"):
+        order_service.create_order(1, gold.id, "buy", "limit", 1, 150.0)
+
+
+def test_cancel_order(order_service, asset_service, gold):
+    """Test that a cancelled order does not execute."""
+    # Arrange
+    order = order_service.create_order(1, gold.id, "buy", "limit", 1, 90.0)
+
+    # Act
+    cancelled = order_service.cancel_order(1, order.id)
+    asset_service.update_asset(gold.id, price=80.0)
+
+    # Assert
+    assert cancelled.status == "cancelled"
+    assert order_service.list_orders(1)[0].status == "cancelled"
+    with pytest.raises(ValueError, match=f"Pending order with ID {order.id}"):
+        order_service.cancel_order(1, order.id)
+
+
+def test_rebuild_trigger_index(order_service, gold):
+    """Test that pending orders are reloaded into the trigger index."""
+    # Arrange
+    order = order_service.create_order(1, gold.id, "buy", "limit", 1, 90.0)
+    trigger_index.load([])
+
+    # Act
+    order_service.rebuild_trigger_index()
+
+    # Assert
+    assert trigger_index.triggered(gold.id, 90.0) == [(order.id, "below", 90.0)]
+
+
+def test_failed_claim_keeps_orders_pending(
+    order_service, asset_service, gold, sqlite_engine
+):
+    """Test that orders stay pending and indexed when their claim fails, and the
+    committed price change is not reported as failed."""
+    # Arrange
+    order = order_service.create_order(1, gold.id, "buy", "limit", 1, 90.0)
+
+    def fail_claim(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE conditional_orders"):
+            raise OperationalError(statement, parameters, Exception("lock timeout"))
+
+    event.listen(sqlite_engine, "before_cursor_execute", fail_claim)
+
+    # Act
+    try:
+        updated = asset_service.update_asset(gold.id, price=85.0)
+    finally:
+        event.remove(sqlite_engine, "before_cursor_execute", fail_claim)
+
+    # Assert
+    assert updated.price == 85.0
+    assert order_service.list_orders(1)[0].status == "pending"
+    assert trigger_index.triggered(gold.id, 85.0) == [(order.id, "below", 90.0)]
+
+
+def test_resume_stale_triggered_orders(
+    order_service, asset_service, gold, sqlite_db_session
+):
+    """Test that orders claimed long ago but never executed are executed."""
+    # Arrange
+    stale = order_service.create_order(1, gold.id, "buy", "limit", 1, 90.0)
+    recent = order_service.create_order(1, gold.id, "buy", "limit", 1, 80.0)
+    now = datetime.now(timezone.utc)
+    for order_id, claimed_at in (
+        (stale.id, now - timedelta(minutes=5)),
+        (recent.id, now),
+    ):
+        sqlite_db_session.execute(
+            update(ConditionalOrder)
+            .where(ConditionalOrder.id == order_id)
+            .values(status="triggered", executed_at=claimed_at)
+        )
+    sqlite_db_session.commit()
+    asset_service.update_asset(gold.id, price=75.0)
+
+    # Act
+    executed = order_service.resume_triggered(stale_after_seconds=60)
+
+    # Assert
+    assert executed == [stale.id]
+    statuses = {order.id: order.status for order in order_service.list_orders(1)}
+    assert statuses == {stale.id: "executed", recent.id: "triggered"}
+
+
+def test_resumed_order_waits_when_price_moved_back(
+    order_service, asset_service, gold, sqlite_db_session
+):
+    """Test that a resumed order whose trigger the price no longer reaches goes
+    back to pending instead of filling at the current price."""
+    # Arrange: claimed when the price fell to 85, but the price is back at 100
+    order = order_service.create_order(1, gold.id, "buy", "limit", 1, 90.0)
+    trigger_index.load([])
+    sqlite_db_session.execute(
+        update(ConditionalOrder)
+        .where(ConditionalOrder.id == order.id)
+        .values(
+            status="triggered",
+            executed_at=datetime.now(timezone.utc) - timedelta(minutes=5),
+        )
+    )
+    sqlite_db_session.commit()
+
+    # Act
+    executed = order_service.resume_triggered(stale_after_seconds=60)
+
+    # Assert
+    assert executed == []
+    assert order_service.list_orders(1)[0].status == "pending"
+    assert sqlite_db_session.get(User, 1).balance == 500.0
+    assert trigger_index.triggered(gold.id, 90.0) == [(order.id, "below", 90.0)]
+
+
+def test_resumed_order_records_its_fill_price(
+    order_service, asset_service, gold, sqlite_db_session
+):
+    """Test that an order executes, and reports, the price it filled at."""
+    # Arrange: claimed at 85, resumed after the price fell further to 80
+    order = order_service.create_order(1, gold.id, "buy", "limit", 1, 90.0)
+    sqlite_db_session.execute(
+        update(ConditionalOrder)
+        .where(ConditionalOrder.id == order.id)
+        .values(
+            status="triggered",
+            executed_at=datetime.now(timezone.utc) - timedelta(minutes=5),
+        )
+    )
+    sqlite_db_session.commit()
+    trigger_index.load([])
+    asset_service.update_asset(gold.id, price=80.0)
+
+    # Act
+    executed = order_service.resume_triggered(stale_after_seconds=60)
+
+    # Assert
+    assert executed == [order.id]
+    sqlite_db_session.expire_all()
+    assert sqlite_db_session.get(ConditionalOrder, order.id).executed_price == 80.0
+    assert sqlite_db_session.get(User, 1).balance == 500.0 - 80.0
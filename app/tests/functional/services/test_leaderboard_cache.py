@@ -0,0 +1,94 @@
+import threading
+
+import pytest
+
+from app.schemas.leaderboard import LeaderboardEntry
+from app.services.leaderboard_cache import LeaderboardCache, leaderboard_cache
+
+pytestmark = pytest.mark.functional
+
+
+def _entries(n, gem_count=10):
+    """Build n leaderboard entries with a recognisable gem count."""
+    return [
+        LeaderboardEntry(rank=i + 1, username=f"user{i}", gem_count=gem_count)
+        for i in range(n)
+    ]
+
+
+def test_cache_hit_until_invalidated():
+    """Test that snapshots are reused until a gem change bumps the version."""
+    # Arrange
+    cache = LeaderboardCache(buckets=(10, 50))
+    calls = []
+
+    def loader(n):
+        calls.append(n)
+        return _entries(n, gem_count=len(calls))
+
+    # Act
+    first = cache.get(3, loader)
+    second = cache.get(7, loader)
+    cache.invalidate()
+    third = cache.get(3, loader)
+
+    # Assert
+    assert len(first) == 3 and len(second) == 7
+    assert third[0].gem_count == 2
+    assert calls == [10, 10]
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_cache_bypassed_above_largest_bucket():
+    """Test that oversized requests go straight to the loader."""
+    # Arrange
+    cache = LeaderboardCache(buckets=(10,))
+
+    # Act
+    entries = cache.get(25, _entries)
+
+    # Assert
+    assert len(entries) == 25
+    assert cache.misses == 1
+
+
+def test_stale_snapshot_served_during_refresh():
+    """Test that readers get the stale snapshot while one reader refreshes."""
+    # Arrange
+    cache = LeaderboardCache(buckets=(10,))
+    cache.get(10, lambda n: _entries(n, gem_count=1))
+    cache.invalidate()
+    loading = threading.Event()
+    release = threading.Event()
+
+    def slow_loader(n):
+        loading.set()
+        release.wait(timeout=5)
+        return _entries(n, gem_count=2)
+
+    refresher = threading.Thread(target=cache.get, args=(10, slow_loader))
+    refresher.start()
+    loading.wait(timeout=5)
+
+    # Act: A concurrent read must not call a loader of its own
+    stale = cache.get(10, pytest.fail)
+    release.set()
+    refresher.join(timeout=5)
+    fresh = cache.get(10, pytest.fail)
+
+    # Assert
+    assert stale[0].gem_count == 1
+    assert fresh[0].gem_count == 2
+    assert cache.stale_hits == 1
+
+
+def test_gem_change_invalidates_on_commit(ranking_service):
+    """Test that committed gem changes invalidate the shared cache."""
+    # Arrange
+    version = leaderboard_cache.version
+
+    # Act
+    ranking_service.update_user_gem_count(user_id=1, gem_count=999)
+
+    # Assert
+    assert leaderboard_cache.version > version
@@ -0,0 +1,152 @@
+import asyncio
+import json
+
+import pytest
+
+from app.schemas.leaderboard import LeaderboardEntry
+from app.services.leaderboard_stream import LeaderboardStream, diff_entries
+
+pytestmark = pytest.mark.functional
+
+
+def _parse(event):
+    """Split a Server-Sent Event into its name and decoded data."""
+    fields = dict(line.split(": ", 1) for line in event.strip().split("\n"))
+    return fields["event"], json.loads(fields["data"])
+
+
+class FakeLeaderboard:
+    """Loader over an in-memory list of (username, gem_count) pairs."""
+
+    def __init__(self, gems):
+        self.gems = dict(gems)
+        self.calls = 0
+
+    def __call__(self, n):
+        self.calls += 1
+        ordered = sorted(self.gems.items(), key=lambda item: -item[1])
+        return [
+            LeaderboardEntry(rank=i + 1, username=username, gem_count=gem_count)
+            for i, (username, gem_count) in enumerate(ordered[:n])
+        ]
+
+
+def test_diff_entries():
+    """Test that only moved, new and departed users are reported."""
+    # Arrange
+    previous = FakeLeaderboard({"Alice": 30, "Bob": 20, "Charlie": 10})(3)
+    current = FakeLeaderboard({"Alice": 30, "Charlie": 25, "Diana": 22})(3)
+
+    # Act
+    changed, removed = diff_entries(previous, current)
+
+    # Assert
+    assert [entry.username for entry in changed] == ["Charlie", "Diana"]
+    assert removed == ["Bob"]
+
+
+def test_snapshot_then_coalesced_diff():
+    """Test that subscribers get one snapshot and one diff per tick."""
+
+    async def scenario():
+        leaderboard = FakeLeaderboard({"Alice": 30, "Bob": 20, "Charlie": 10})
+        stream = LeaderboardStream(loader=leaderboard, max_top_n=10)
+        subscribers = [await stream.subscribe(2) for _ in range(3)]
+
+        # Several gem changes between ticks
+        leaderboard.gems["Charlie"] = 25
+        stream.mark_dirty()
+        leaderboard.gems["Charlie"] = 40
+        stream.mark_dirty()
+        await stream.tick()
+        await stream.tick()  # Nothing changed since: no event, no query
+
+        return leaderboard, [
+            [s.queue.get_nowait() for _ in range(s.queue.qsize())] for s in subscribers
+        ]
+
+    # Act
+    leaderboard, received = asyncio.run(scenario())
+
+    # Assert: One query for the snapshot and one for the tick, not per subscriber
+    assert leaderboard.calls == 2
+    for events in received:
+        assert len(events) == 2
+        assert _parse(events[0]) == (
+            "snapshot",
+            {
+                "entries": [
+                    {"rank": 1, "username": "Alice", "gem_count": 30},
+                    {"rank": 2, "username": "Bob", "gem_count": 20},
+                ]
+            },
+        )
+        assert _parse(events[1]) == (
+            "diff",
+            {
+                "changed": [
+                    {"rank": 1, "username": "Charlie", "gem_count": 40},
+                    {"rank": 2, "username": "Alice", "gem_count": 30},
+                ],
+                "removed": ["Bob"],
+            },
+        )
+
+
+def test_changes_outside_top_n_are_not_pushed():
+    """Test that subscribers only hear about their own top N."""
+
+    async def scenario():
+        leaderboard = FakeLeaderboard({"Alice": 30, "Bob": 20, "Charlie": 10})
+        stream = LeaderboardStream(loader=leaderboard, max_top_n=10)
+        top_one = await stream.subscribe(1)
+        top_three = await stream.subscribe(3)
+
+        leaderboard.gems["Charlie"] = 15
+        stream.mark_dirty()
+        await stream.tick()
+        return top_one.queue.qsize(), top_three.queue.qsize()
+
+    # Act & Assert
+    assert asyncio.run(scenario()) == (1, 2)
+
+
+def test_slow_subscriber_is_disconnected(monkeypatch):
+    """Test that a subscriber that stops reading is dropped instead of buffered."""
+    monkeypatch.setattr("app.services.leaderboard_stream.SUBSCRIBER_QUEUE_SIZE", 2)
+
+    async def scenario():
+        leaderboard = FakeLeaderboard({"Alice": 30, "Bob": 20})
+        stream = LeaderboardStream(loader=leaderboard, max_top_n=10)
+        subscriber = await stream.subscribe(2)
+
+        for gems in (40, 50, 60):
+            leaderboard.gems["Bob"] = gems
+            stream.mark_dirty()
+            await stream.tick()
+
+        events = [event async for event in stream.events(subscriber)]
+        return stream.subscriber_count, events
+
+    # Act
+    subscriber_count, events = asyncio.run(scenario())
+
+    # Assert: The backlog is dropped and the stream ends so the client resyncs
+    assert subscriber_count == 0
+    assert events == []
+
+
+def test_close_ends_streams():
+    """Test that closing the stream ends every subscriber's events."""
+
+    async def scenario():
+        stream = LeaderboardStream(loader=FakeLeaderboard({"Alice": 30}))
+        subscriber = await stream.subscribe(10)
+        stream.close()
+        return [event async for event in stream.events(subscriber)]
+
+    # Act
+    events = asyncio.run(scenario())
+
+    # Assert
+    assert [_parse(event)[0] for event in events] == ["snapshot"]
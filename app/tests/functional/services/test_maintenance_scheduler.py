@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import update
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Portfolio
+from app.services.maintenance_scheduler import (
+    MAINTENANCE_JOBS,
+    MaintenanceScheduler,
+)
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture
+def session_factory(sqlite_engine):
+    """Fixture for sessions bound to the SQLite test database."""
+    return sessionmaker(bind=sqlite_engine)
+
+
+def test_run_once_repairs_drifted_valuations(
+    session_factory, sqlite_db_session, portfolio_service, asset_service
+):
+    """Test that a pass recomputes a market value that drifted."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    asset = asset_service.create_asset(name="Stock A", price=50.0)
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=asset.id, quantity=4)
+    sqlite_db_session.execute(update(Portfolio).values(market_value=999.0))
+    sqlite_db_session.commit()
+    scheduler = MaintenanceScheduler(session_factory, enabled=True)
+
+    # Act
+    scheduler.run_once()
+
+    # Assert
+    sqlite_db_session.expire_all()
+    portfolio = sqlite_db_session.query(Portfolio).filter_by(user_id=1).one()
+    assert portfolio.market_value == 200.0
+    status = scheduler.status()
+    assert status["runs"] == 1
+    assert status["jobs"] == list(MAINTENANCE_JOBS)
+    assert status["last_errors"] == {}
+
+
+def test_failing_job_does_not_stop_the_pass(session_factory):
+    """Test that a failing job is recorded and the jobs after it still run."""
+    # Arrange
+    ran = []
+
+    def broken(db):
+        raise RuntimeError("boom")
+
+    scheduler = MaintenanceScheduler(
+        session_factory,
+        jobs={"broken": broken, "after": lambda db: ran.append(True)},
+        enabled=True,
+    )
+
+    # Act
+    scheduler.run_once()
+
+    # Assert
+    assert ran == [True]
+    assert scheduler.status()["last_errors"] == {"broken": "boom"}
+
+
+def test_stop_without_start(session_factory):
+    """Test that stopping a scheduler that never started returns at once."""
+    # Arrange
+    scheduler = MaintenanceScheduler(session_factory, enabled=True)
+
+    # Act
+    scheduler.stop()
+
+    # Assert
+    assert not scheduler.running
@@ -0,0 +1,246 @@
+import pytest
+
+from app.models import User
+from app.services.order_book import MatchingEngine, OrderBook
+from app.services.order_book_service import OrderBookService
+from app.services.portfolio_service import FillSettlementError, PortfolioService
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture
+def order_book_service(sqlite_db_session):
+    """Fixture for an OrderBookService with its own matching engine."""
+    return OrderBookService(sqlite_db_session, engine=MatchingEngine())
+
+
+@pytest.fixture
+def traded_asset(portfolio_service, asset_service):
+    """
+    Fixture for an asset that Bob (ID 2) holds 10 units of, with portfolios for
+    Alice (ID 1) and Bob.
+    """
+    asset = asset_service.create_asset(name="Gold", price=10.0)
+    portfolio_service.create_portfolio(user_id=1)
+    portfolio_service.create_portfolio(user_id=2)
+    portfolio_service.add_asset_to_portfolio(user_id=2, asset_id=asset.id, quantity=10)
+    return asset
+
+
+def test_price_time_priority():
+    """Test that better prices match first, then earlier orders at one price."""
+    # Arrange
+    book = OrderBook(asset_id=1)
+    first, _ = book.submit(1, "sell", 5, 101.0)
+    second, _ = book.submit(2, "sell", 5, 101.0)
+    best, _ = book.submit(3, "sell", 5, 100.0)
+
+    # Act
+    _, fills = book.submit(4, "buy", 12, 101.0)
+
+    # Assert
+    assert [(f.sell_order_id, f.price, f.quantity) for f in fills] == [
+        (best.id, 100.0, 5),
+        (first.id, 101.0, 5),
+        (second.id, 101.0, 2),
+    ]
+    assert book.best_ask == 101.0
+    assert book.levels("sell", 5)[0].quantity == 3
+    assert book.last_price == 101.0
+
+
+def test_limit_remainder_rests():
+    """Test that an unfilled limit remainder rests at its price."""
+    # Arrange
+    book = OrderBook(asset_id=1)
+    book.submit(1, "sell", 3, 100.0)
+
+    # Act
+    order, fills = book.submit(2, "buy", 5, 100.5)
+
+    # Assert
+    assert sum(fill.quantity for fill in fills) == 3
+    assert order.remaining == 2
+    assert book.best_bid == 100.5
+    assert book.best_ask is None
+    assert book.get_order(order.id) is order
+
+
+def test_market_remainder_is_cancelled():
+    """Test that a market order never rests."""
+    # Arrange
+    book = OrderBook(asset_id=1)
+    book.submit(1, "buy", 4, 99.0)
+
+    # Act
+    order, fills = book.submit(2, "sell", 10)
+
+    # Assert
+    assert [(f.price, f.quantity) for f in fills] == [(99.0, 4)]
+    assert order.remaining == 6
+    assert book.best_bid is None
+    assert book.get_order(order.id) is None
+
+
+def test_cancel_order():
+    """Test cancelling a resting order removes its price level."""
+    # Arrange
+    book = OrderBook(asset_id=1)
+    order, _ = book.submit(1, "buy", 4, 99.0)
+    book.submit(1, "buy", 4, 98.0)
+
+    # Act
+    book.cancel(order.id)
+
+    # Assert
+    assert book.best_bid == 98.0
+    with pytest.raises(ValueError, match=f"Order with ID {order.id} not found."):
+        book.cancel(order.id)
+
+
+def test_place_order_settles_fills(order_book_service, traded_asset, sqlite_db_session):
+    """Test that a matched order moves cash and units between the two users."""
+    # Arrange
+    order_book_service.place_order(traded_asset.id, 2, "sell", 4, 12.0)
+
+    # Act
+    result = order_book_service.place_order(traded_asset.id, 1, "buy", 6, 12.0)
+
+    # Assert
+    assert result.status == "partially_filled"
+    assert result.remaining_quantity == 2
+    assert [settled.settled for settled in result.fills] == [True]
+    sqlite_db_session.expire_all()
+    assert sqlite_db_session.get(User, 1).balance == 500.0 - 48.0
+    assert sqlite_db_session.get(User, 2).balance == 1000.0 - 100.0 + 48.0
+    bids, asks = order_book_service.get_depth(traded_asset.id, 5)
+    assert bids == [(12.0, 2, 2)]
+    assert asks == []
+
+
+def test_place_order_rejects_uncovered_sell(order_book_service, traded_asset):
+    """Test that a sell larger than the holding never reaches the book."""
+    # Act & Assert
+    with pytest.raises(ValueError, match="Insufficient quantity to sell."):
+        order_book_service.place_order(traded_asset.id, 2, "sell", 11, 12.0)
+    assert order_book_service.get_book(traded_asset.id, 5).asks == []
+
+
+def test_cancel_checks_owner():
+    """Test that an order cannot be cancelled by another user."""
+    # Arrange
+    book = OrderBook(asset_id=1)
+    order, _ = book.submit(1, "buy", 4, 99.0)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match=f"Order with ID {order.id} not found."):
+        book.cancel(order.id, user_id=2)
+    assert book.get_order(order.id) is order
+    book.cancel(order.id, user_id=1)
+    assert book.best_bid is None
+
+
+def test_reinstate_unless_crossed():
+    """Test that unsettled maker units go back unless the book moved through them."""
+    # Arrange
+    book = OrderBook(asset_id=1)
+    maker, _ = book.submit(1, "sell", 5, 100.0)
+    book.submit(2, "buy", 5)
+    book.submit(3, "buy", 1, 99.0)
+
+    # Act
+    reinstated = book.reinstate(maker.id, 1, "sell", 5, 100.0)
+    crossed = book.reinstate(maker.id + 100, 1, "sell", 5, 98.0)
+
+    # Assert
+    assert reinstated and not crossed
+    assert book.levels("sell", 5)[0].quantity == 5
+    assert book.get_order(maker.id).remaining == 5
+
+
+def test_place_order_rejects_market_buy_priced_by_book(
+    order_book_service, traded_asset
+):
+    """Test that a market buy is checked against the asks it would sweep."""
+    # Arrange: asks well above the asset's mark price of 10
+    order_book_service.place_order(traded_asset.id, 2, "sell", 10, 60.0)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Insufficient balance"):
+        order_book_service.place_order(traded_asset.id, 1, "buy", 10)
+    assert order_book_service.get_book(traded_asset.id, 5).asks[0].quantity == 10
+
+
+def test_defaulting_maker_is_cancelled(
+    order_book_service, traded_asset, portfolio_service
+):
+    """Test that a maker who no longer holds the units is cancelled visibly."""
+    # Arrange
+    maker = order_book_service.place_order(traded_asset.id, 2, "sell", 10, 12.0)
+    portfolio_service.remove_asset_from_portfolio(2, traded_asset.id, 5)
+
+    # Act
+    result = order_book_service.place_order(traded_asset.id, 1, "buy", 10)
+
+    # Assert
+    assert result.status == "cancelled"
+    assert result.remaining_quantity == 10
+    assert [settled.settled for settled in result.fills] == [False]
+    assert result.fills[0].error == "Insufficient quantity to sell."
+    assert result.cancelled_order_ids == (maker.order_id,)
+    assert order_book_service.get_book(traded_asset.id, 5).asks == []
+
+
+def test_taker_matches_on_after_maker_default(
+    order_book_service, traded_asset, portfolio_service
+):
+    """Test that units a maker failed to deliver match the next maker instead."""
+    # Arrange
+    defaulting = order_book_service.place_order(traded_asset.id, 2, "sell", 10, 12.0)
+    portfolio_service.remove_asset_from_portfolio(2, traded_asset.id, 5)
+    portfolio_service.create_portfolio(user_id=3)
+    portfolio_service.add_asset_to_portfolio(
+        user_id=3, asset_id=traded_asset.id, quantity=5
+    )
+    order_book_service.place_order(traded_asset.id, 3, "sell", 5, 13.0)
+
+    # Act
+    result = order_book_service.place_order(traded_asset.id, 1, "buy", 10, 13.0)
+
+    # Assert
+    assert [(s.fill.seller_id, s.settled) for s in result.fills] == [
+        (2, False),
+        (3, True),
+    ]
+    assert result.status == "partially_filled"
+    assert result.remaining_quantity == 5
+    assert result.cancelled_order_ids == (defaulting.order_id,)
+    bids, asks = order_book_service.get_depth(traded_asset.id, 5)
+    assert bids == [(13.0, 5, 5)]
+    assert asks == []
+
+
+def test_defaulting_taker_leaves_makers_on_book(
+    order_book_service, traded_asset, monkeypatch
+):
+    """Test that makers keep their units when the incoming order's user defaults."""
+    # Arrange
+    maker = order_book_service.place_order(traded_asset.id, 2, "sell", 4, 12.0)
+
+    def default(self, asset_id, buyer_id, seller_id, quantity, price):
+        raise FillSettlementError("Insufficient balance.", buyer_id)
+
+    monkeypatch.setattr(PortfolioService, "settle_fill", default)
+
+    # Act
+    result = order_book_service.place_order(traded_asset.id, 1, "buy", 6, 12.0)
+
+    # Assert
+    assert result.status == "cancelled"
+    assert result.remaining_quantity == 6
+    assert result.cancelled_order_ids == ()
+    snapshot = order_book_service.get_book(traded_asset.id, 5)
+    assert snapshot.bids == []
+    assert [(level.price, level.quantity) for level in snapshot.asks] == [(12.0, 4)]
+    book, _ = order_book_service.engine.book(traded_asset.id)
+    assert book.get_order(maker.order_id).remaining == 4
@@ -0,0 +1,157 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import sessionmaker
+
+from app.core import pool_stats as pool_stats_module
+from app.core.database import LazySession
+from app.core.db_usage import RequestDbUsage, request_db_usage
+from app.core.pool_stats import InstrumentedQueuePool, PoolStats
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    """Fresh pool counters, standing in for the process-wide ones."""
+    stats = PoolStats()
+    monkeypatch.setattr(pool_stats_module, "pool_stats", stats)
+    return stats
+
+
+@pytest.fixture
+def instrumented_engine(tmp_path, stats):
+    """A one-connection instrumented pool over a SQLite file database."""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    stats.attach(engine.pool)
+    yield engine
+    engine.dispose()
+
+
+def test_checkouts_and_checkins_are_counted(instrumented_engine, stats):
+    """Test that pool events count connections and what is checked out."""
+    # Act
+    with instrumented_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+        during = stats.status()
+    after = stats.status()
+
+    # Assert
+    assert during["checked_out"] == 1
+    assert during["checkouts"] == 1
+    assert after["checked_out"] == 0
+    assert after["checkins"] == 1
+    assert after["connects"] == 1
+    assert after["peak_checked_out"] == 1
+    assert after["size"] == 1
+    assert after["max_overflow"] == 0
+    assert after["wait_ms_avg"] is not None
+
+
+def test_exhausted_pool_records_wait_and_timeout(instrumented_engine, stats):
+    """Test that a checkout that gives up is counted with the time it waited."""
+    # Arrange: Hold the only connection
+    with instrumented_engine.connect():
+        # Act
+        with pytest.raises(PoolTimeoutError):
+            instrumented_engine.connect()
+        status = stats.status()
+
+    # Assert
+    assert status["timeouts"] == 1
+    assert status["checkouts"] == 1
+    assert status["wait_ms_max"] >= 50
+
+
+def test_recreated_pool_keeps_reporting(instrumented_engine, stats):
+    """Test that disposing the engine leaves the counters on its new pool."""
+    # Arrange
+    with instrumented_engine.connect():
+        pass
+
+    # Act
+    instrumented_engine.dispose()
+    with instrumented_engine.connect():
+        status = stats.status()
+
+    # Assert: Listeners were copied to the new pool exactly once
+    assert status["checked_out"] == 1
+    assert status["checkouts"] == 2
+    assert status["connects"] == 2
+
+
+def test_hold_time_is_added_to_the_request(instrumented_engine, stats):
+    """Test that checkouts and hold time accrue to the current request's usage."""
+    # Arrange
+    usage = RequestDbUsage()
+    token = request_db_usage.set(usage)
+
+    # Act
+    try:
+        for _ in range(2):
+            with instrumented_engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+                time.sleep(0.01)
+    finally:
+        request_db_usage.reset(token)
+    with instrumented_engine.connect():
+        pass
+
+    # Assert: The last checkout happened outside the request
+    assert usage.checkouts == 2
+    assert usage.hold_ms >= 20
+    assert stats.status()["checkins"] == 3
+    assert stats.status()["hold_ms_total"] >= usage.hold_ms
+    assert stats.status()["hold_ms_max"] >= 10
+
+
+def test_lazy_session_checks_out_nothing_until_queried(instrumented_engine, stats):
+    """Test that a request's session is only created, and a connection only
+    checked out, once it is used."""
+    # Arrange
+    db = LazySession(sessionmaker(bind=instrumented_engine))
+
+    # Act
+    db.close()
+    unused = stats.status()["checkouts"]
+    db = LazySession(sessionmaker(bind=instrumented_engine))
+    created = db.started
+    db.execute(text("SELECT 1"))
+    during = stats.status()["checked_out"]
+    db.close()
+
+    # Assert
+    assert unused == 0
+    assert created is False
+    assert db.started is True
+    assert during == 1
+    assert stats.status()["checked_out"] == 0
+
+
+def test_queries_are_counted_per_request(instrumented_engine, stats):
+    """Test that cursor events count the request's statements and their time."""
+    # Arrange
+    usage = RequestDbUsage()
+    token = request_db_usage.set(usage)
+
+    # Act
+    try:
+        with instrumented_engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("SELECT 1"))
+    finally:
+        request_db_usage.reset(token)
+    with instrumented_engine.connect() as connection:
+        connection.execute(text("SELECT 1"))
+
+    # Assert: The last statement ran outside the request
+    assert usage.queries == 3
+    assert usage.query_ms > 0
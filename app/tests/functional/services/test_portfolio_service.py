@@ -1,6 +1,12 @@
 import logging
 
 import pytest
+from sqlalchemy import event, update
+
+from app.core.database import ConcurrentUpdateError
+from app.core.metrics import trades_total
+from app.models import User
+from app.services.portfolio_service import TradeLeg
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -252,7 +258,7 @@ def test_get_portfolio_asset_not_found(portfolio_service):
 
 
 def test_buy_asset_with_fifth_trade_bonus(
-    portfolio_service, user_service, asset_service
+    portfolio_service, user_service, asset_service, achievement_service
 ):
     """Test milestone bonus on the 5th trade."""
     # Arrange
@@ -264,6 +270,7 @@ def test_buy_asset_with_fifth_trade_bonus(
     portfolio_service.add_asset_to_portfolio(
         user_id=user.id, asset_id=asset.id, quantity=10
     )
+    achievement_service.process_pending()
 
     # Assert
     portfolio_assets = portfolio_service.get_portfolio_asset(
@@ -278,7 +285,7 @@ def test_buy_asset_with_fifth_trade_bonus(
 
 
 def test_buy_asset_with_tenth_trade_bonus(
-    portfolio_service, user_service, asset_service
+    portfolio_service, user_service, asset_service, achievement_service
 ):
     """Test milestone bonus on the 10th trade."""
     # Arrange
@@ -290,6 +297,7 @@ def test_buy_asset_with_tenth_trade_bonus(
     portfolio_service.add_asset_to_portfolio(
         user_id=user.id, asset_id=asset.id, quantity=5
     )
+    achievement_service.process_pending()
 
     # Assert
     portfolio_asset = portfolio_service.get_portfolio_asset(
@@ -301,3 +309,385 @@ def test_buy_asset_with_tenth_trade_bonus(
     assert updated_user.balance == 1000.0  # 1500.0 - (5 * 100)
     assert portfolio_asset.quantity == 5
     assert portfolio_asset.avg_cost == 100.0
+
+
+def test_trade_maintains_ranks(
+    portfolio_service, user_service, asset_service, ranking_service, achievement_service
+):
+    """Test that a trade's gem award moves the user on the leaderboard."""
+    # Arrange: Eve (13 gems, 4 trades) trails Frank (14 gems) by one gem
+    ranking_service.rebuild_gem_histogram()
+    ranking_service.update_user_gem_count(user_id=5, gem_count=13)
+    portfolio_service.create_portfolio(user_id=5)
+    asset = asset_service.create_asset(name="Stock A", price=10.0)
+
+    # Act
+    portfolio_service.add_asset_to_portfolio(user_id=5, asset_id=asset.id, quantity=1)
+    achievement_service.process_pending()
+
+    # Assert: Eve's fifth-trade bonus (19 gems) lifts Eve past Frank
+    users = user_service.list_users()
+    ranks = {row.id: row.rank for row in ranking_service.get_leaderboard(n=6)}
+    assert ranks[5] == 5
+    assert ranks[6] == 6
+    for user in users:
+        expected = 1 + sum(other.gem_count > user.gem_count for other in users)
+        assert ranks[user.id] == expected
+
+
+def test_buy_rejected_without_side_effects(
+    portfolio_service, user_service, asset_service
+):
+    """Test that rejected buys report why and leave the user untouched."""
+    # Arrange
+    asset = asset_service.create_asset(name="Stock A", price=100.0)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Portfolio not found."):
+        portfolio_service.add_asset_to_portfolio(
+            user_id=1, asset_id=asset.id, quantity=1
+        )
+    portfolio_service.create_portfolio(user_id=1)
+    with pytest.raises(ValueError, match="Insufficient balance to complete the trade."):
+        portfolio_service.add_asset_to_portfolio(
+            user_id=1, asset_id=asset.id, quantity=6
+        )
+    with pytest.raises(ValueError, match="Asset with ID 999 not found."):
+        portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=999, quantity=1)
+    with pytest.raises(ValueError, match="User with ID 999 not found."):
+        portfolio_service.add_asset_to_portfolio(
+            user_id=999, asset_id=asset.id, quantity=1
+        )
+
+    user = user_service.get_user(user_id=1)
+    assert (user.balance, user.trade_count, user.gem_count) == (500.0, 0, 150)
+
+
+def test_buy_statement_count(sqlite_engine, portfolio_service, asset_service):
+    """Test that a buy issues a fixed, small number of statements."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    asset_id = asset_service.create_asset(name="Stock A", price=10.0).id
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=asset_id, quantity=1)
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0])
+
+    event.listen(sqlite_engine, "before_cursor_execute", count)
+
+    # Act
+    try:
+        portfolio_asset = portfolio_service.add_asset_to_portfolio(
+            user_id=1, asset_id=asset_id, quantity=3
+        )
+    finally:
+        event.remove(sqlite_engine, "before_cursor_execute", count)
+
+    # Assert: No SELECTs; balance, holding and market value, then the outbox event
+    assert "SELECT" not in statements
+    assert statements[:3] == ["UPDATE", "INSERT", "UPDATE"]
+    assert (portfolio_asset.quantity, portfolio_asset.name) == (4, "Stock A")
+
+
+def test_sell_decrements_then_deletes(
+    sqlite_engine, portfolio_service, user_service, asset_service, achievement_service
+):
+    """Test that sells credit proceeds and drop the holding when it reaches zero."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    asset_id = asset_service.create_asset(name="Stock A", price=50.0).id
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=asset_id, quantity=4)
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0])
+
+    event.listen(sqlite_engine, "before_cursor_execute", count)
+
+    # Act
+    try:
+        partial = portfolio_service.remove_asset_from_portfolio(
+            user_id=1, asset_id=asset_id, quantity=3
+        )
+        entire = portfolio_service.remove_asset_from_portfolio(
+            user_id=1, asset_id=asset_id, quantity=1
+        )
+    finally:
+        event.remove(sqlite_engine, "before_cursor_execute", count)
+
+    # Assert
+    assert (partial.quantity, entire.quantity) == (1, 0)
+    assert "SELECT" not in statements
+    assert "DELETE" in statements
+    achievement_service.process_pending()
+    user = user_service.get_user(user_id=1)
+    assert (user.balance, user.trade_count, user.gem_count) == (500.0, 3, 153)
+    with pytest.raises(ValueError, match="not found in portfolio."):
+        portfolio_service.get_portfolio_asset(user_id=1, asset_id=asset_id)
+
+
+def test_sell_locks_user_before_holding(
+    portfolio_service, asset_service, query_counter
+):
+    """Test that a sell, like a buy, writes the user row before the holding."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    asset_id = asset_service.create_asset(name="Stock A", price=50.0).id
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=asset_id, quantity=4)
+
+    # Act
+    with query_counter() as statements:
+        portfolio_service.remove_asset_from_portfolio(
+            user_id=1, asset_id=asset_id, quantity=1
+        )
+
+    # Assert
+    updates = [s.split()[1] for s in statements if s.startswith("UPDATE")]
+    assert updates.index("users") < updates.index("portfolio_assets")
+
+
+def test_sell_rejected_without_side_effects(
+    portfolio_service, user_service, asset_service
+):
+    """Test that rejected sells report why and leave the user untouched."""
+    # Arrange
+    asset_id = asset_service.create_asset(name="Stock A", price=50.0).id
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="Portfolio not found."):
+        portfolio_service.remove_asset_from_portfolio(
+            user_id=1, asset_id=asset_id, quantity=1
+        )
+    portfolio_service.create_portfolio(user_id=1)
+    with pytest.raises(ValueError, match=f"Asset with ID {asset_id} not found"):
+        portfolio_service.remove_asset_from_portfolio(
+            user_id=1, asset_id=asset_id, quantity=1
+        )
+
+    user = user_service.get_user(user_id=1)
+    assert (user.balance, user.trade_count, user.gem_count) == (500.0, 0, 150)
+
+
+def test_execute_trades_batch(
+    portfolio_service, user_service, asset_service, achievement_service
+):
+    """Test applying mixed legs against one snapshot with gems awarded once."""
+    # Arrange: Eve has 4 trades, so this batch crosses the fifth-trade milestone
+    portfolio_service.create_portfolio(user_id=5)
+    gold = asset_service.create_asset(name="Gold", price=100.0).id
+    silver = asset_service.create_asset(name="Silver", price=10.0).id
+
+    # Act
+    result = portfolio_service.execute_trades(
+        user_id=5,
+        legs=[
+            TradeLeg("buy", gold, 5),
+            TradeLeg("buy", silver, 20),
+            TradeLeg("sell", gold, 2),
+            TradeLeg("sell", silver, 20),
+        ],
+    )
+
+    # Assert
+    assert [(leg.remaining_quantity, leg.avg_cost) for leg in result.legs] == [
+        (5, 100.0),
+        (20, 10.0),
+        (3, 100.0),
+        (0, None),
+    ]
+    assert (result.balance, result.trade_count, result.gem_count) == (1700.0, 8, 4)
+    assert achievement_service.process_pending() == 1
+    user = user_service.get_user(user_id=5)
+    assert (user.balance, user.trade_count, user.gem_count) == (1700.0, 8, 13)
+    assert [pa.asset_id for pa in portfolio_service.list_portfolio_assets(5)] == [gold]
+
+
+def test_execute_trades_all_or_nothing(portfolio_service, user_service, asset_service):
+    """Test that one rejected leg leaves every leg unapplied."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    gold = asset_service.create_asset(name="Gold", price=100.0).id
+
+    # Act & Assert: The second leg oversells what the first leg bought
+    with pytest.raises(ValueError, match="Leg 2: Insufficient quantity to sell."):
+        portfolio_service.execute_trades(
+            user_id=1, legs=[TradeLeg("buy", gold, 2), TradeLeg("sell", gold, 3)]
+        )
+    with pytest.raises(ValueError, match="Leg 1: Insufficient balance"):
+        portfolio_service.execute_trades(user_id=1, legs=[TradeLeg("buy", gold, 6)])
+
+    user = user_service.get_user(user_id=1)
+    assert (user.balance, user.trade_count, user.gem_count) == (500.0, 0, 150)
+    assert portfolio_service.list_portfolio_assets(1) == []
+
+
+def _bump_user_version_before_swap(db, user_id: int, times: int):
+    """
+    Simulate a concurrent writer: bump the user's version just before the next
+    `times` versioned UPDATEs of the user reach the database.
+    """
+    remaining = [times]
+
+    @event.listens_for(db, "do_orm_execute")
+    def bump(state):
+        if remaining[0] and state.is_update and "version" in str(state.statement):
+            if state.statement.table.name == "users":
+                remaining[0] -= 1
+                state.session.connection().execute(
+                    update(User)
+                    .where(User.id == user_id)
+                    .values(version=User.version + 1)
+                )
+
+
+def test_execute_trades_retries_on_version_conflict(
+    portfolio_service, user_service, asset_service, sqlite_db_session
+):
+    """Test that a batch that loses a version race is re-run from a fresh read."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    gold = asset_service.create_asset(name="Gold", price=100.0).id
+    version = user_service.get_user(user_id=1).version
+    _bump_user_version_before_swap(sqlite_db_session, user_id=1, times=1)
+
+    # Act
+    result = portfolio_service.execute_trades(
+        user_id=1, legs=[TradeLeg("buy", gold, 2)]
+    )
+
+    # Assert: The conflicting attempt rolled back and the retry applied once
+    assert result.balance == 300.0
+    sqlite_db_session.expire_all()
+    user = user_service.get_user(user_id=1)
+    assert (user.balance, user.trade_count, user.version) == (300.0, 1, version + 1)
+    assert [pa.version for pa in portfolio_service.list_portfolio_assets(1)] == [1]
+
+
+def test_execute_trades_gives_up_after_repeated_conflicts(
+    portfolio_service, user_service, asset_service, sqlite_db_session
+):
+    """Test that retries are bounded and leave nothing applied."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    gold = asset_service.create_asset(name="Gold", price=100.0).id
+    _bump_user_version_before_swap(sqlite_db_session, user_id=1, times=10)
+
+    # Act & Assert
+    with pytest.raises(ConcurrentUpdateError, match="modified concurrently"):
+        portfolio_service.execute_trades(user_id=1, legs=[TradeLeg("buy", gold, 2)])
+    user = user_service.get_user(user_id=1)
+    assert (user.balance, user.trade_count) == (500.0, 0)
+    assert portfolio_service.list_portfolio_assets(1) == []
+
+
+def test_trades_bump_versions(portfolio_service, user_service, asset_service):
+    """Test that buys and sells bump the user's and the holding's versions."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    gold = asset_service.create_asset(name="Gold", price=10.0).id
+    version = portfolio_service.get_portfolio_version(user_id=1).version
+
+    # Act
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=gold, quantity=5)
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=gold, quantity=5)
+    portfolio_service.remove_asset_from_portfolio(user_id=1, asset_id=gold, quantity=1)
+
+    # Assert
+    assert portfolio_service.get_portfolio_version(user_id=1).version == version + 3
+    assert portfolio_service.get_portfolio_asset(1, gold).version == 3
+
+
+def test_trades_are_recorded_and_paginated(portfolio_service, asset_service):
+    """Test that every executed leg lands in the ledger, newest first."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    gold = asset_service.create_asset(name="Gold", price=10.0).id
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=gold, quantity=5)
+    portfolio_service.remove_asset_from_portfolio(user_id=1, asset_id=gold, quantity=2)
+    portfolio_service.execute_trades(
+        user_id=1, legs=[TradeLeg("buy", gold, 1), TradeLeg("sell", gold, 4)]
+    )
+    with pytest.raises(ValueError):
+        portfolio_service.remove_asset_from_portfolio(
+            user_id=1, asset_id=gold, quantity=1
+        )
+
+    # Act
+    first, cursor = portfolio_service.list_trades(user_id=1, limit=3)
+    second, last_cursor = portfolio_service.list_trades(
+        user_id=1, limit=3, cursor=cursor
+    )
+
+    # Assert: Rejected trades leave no record
+    trades = [(row.side, row.quantity, row.price) for row in first + second]
+    assert trades == [
+        ("sell", 4, 10.0),
+        ("buy", 1, 10.0),
+        ("sell", 2, 10.0),
+        ("buy", 5, 10.0),
+    ]
+    assert last_cursor is None
+    assert portfolio_service.list_trades(user_id=2, limit=3) == ([], None)
+
+
+def test_list_trades_invalid_cursor(portfolio_service):
+    """Test that a malformed cursor is rejected."""
+    with pytest.raises(ValueError, match="Invalid cursor."):
+        portfolio_service.list_trades(user_id=1, limit=3, cursor="not-a-cursor")
+
+
+def test_portfolio_is_read_in_two_queries(
+    portfolio_service, asset_service, query_counter
+):
+    """Test that reading a portfolio and its holdings, as GET /portfolios/{id}/
+    does, takes one query for the version and one for the holdings."""
+    # Arrange
+    portfolio = portfolio_service.create_portfolio(user_id=1)
+    for name in ("Gold", "Silver", "Oil"):
+        asset_id = asset_service.create_asset(name=name, price=10.0).id
+        portfolio_service.add_asset_to_portfolio(
+            user_id=1, asset_id=asset_id, quantity=1
+        )
+    portfolio_service.db.expire_all()
+
+    # Act
+    with query_counter(max_queries=2):
+        version = portfolio_service.get_portfolio_version(user_id=1)
+        holdings = portfolio_service.list_portfolio_assets(user_id=1)
+        names = [holding.asset.name for holding in holdings]
+
+    # Assert
+    assert version.portfolio_id == portfolio.id
+    assert sorted(names) == ["Gold", "Oil", "Silver"]
+
+
+def test_missing_portfolio_is_reported_after_empty_lookup(portfolio_service):
+    """Test that a user without a portfolio is told so, not given no assets."""
+    # Act / Assert
+    with pytest.raises(ValueError, match="Portfolio not found."):
+        portfolio_service.list_portfolio_assets(user_id=1)
+    with pytest.raises(ValueError, match="Portfolio not found."):
+        portfolio_service.get_portfolio_asset(user_id=1, asset_id=1)
+
+
+def test_committed_trades_are_counted_by_side(portfolio_service, asset_service):
+    """Test that trades_total counts committed trades only, by side."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=2)
+    gold = asset_service.create_asset(name="Gold", price=10.0).id
+    buys, sells = trades_total.value(("buy",)), trades_total.value(("sell",))
+
+    # Act
+    portfolio_service.add_asset_to_portfolio(user_id=2, asset_id=gold, quantity=3)
+    portfolio_service.execute_trades(
+        2, [TradeLeg("sell", gold, 1), TradeLeg("buy", gold, 1)]
+    )
+    with pytest.raises(ValueError):
+        portfolio_service.execute_trades(
+            2, [TradeLeg("buy", gold, 1), TradeLeg("sell", gold, 99)]
+        )
+
+    # Assert: The rejected batch rolled back and counted nothing
+    assert trades_total.value(("buy",)) == buys + 2
+    assert trades_total.value(("sell",)) == sells + 1
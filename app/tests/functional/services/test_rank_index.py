@@ -0,0 +1,67 @@
+import pytest
+
+from app.services import RankingService
+from app.services.rank_index import GemRankIndex
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture
+def rank_index():
+    """Fixture providing an empty, process-independent rank index."""
+    return GemRankIndex(capacity=8)
+
+
+@pytest.fixture
+def indexed_ranking_service(sqlite_db_session, rank_index):
+    """Fixture for a RankingService whose rank index is built from SQLite."""
+    service = RankingService(sqlite_db_session, index=rank_index)
+    service.rebuild_rank_index()
+    return service
+
+
+def test_rank_index_ranks_and_ties(indexed_ranking_service):
+    """Test ranks loaded from the database, including shared ranks for ties."""
+    # Act & Assert
+    assert indexed_ranking_service.get_user_rank(3) == (200, 1)  # Charlie
+    assert indexed_ranking_service.get_user_rank(1) == (150, 2)  # Alice
+    assert indexed_ranking_service.get_user_rank(2) == (100, 3)  # Bob
+    assert indexed_ranking_service.get_user_rank(4) == (100, 3)  # Diana
+    assert indexed_ranking_service.get_user_rank(5) == (4, 6)  # Eve
+
+
+def test_rank_index_unknown_user(indexed_ranking_service):
+    """Test looking up a user that is not in the index."""
+    with pytest.raises(ValueError, match="User not found."):
+        indexed_ranking_service.get_user_rank(999)
+
+
+def test_rank_index_follows_committed_gem_changes(rank_index, indexed_ranking_service):
+    """Test that gem changes reach the index on commit and grow its capacity."""
+    # Act: Eve jumps far beyond the initial bucket capacity
+    indexed_ranking_service.update_user_gem_count(user_id=5, gem_count=5000)
+
+    # Assert
+    assert rank_index.lookup(5) == (5000, 1)
+    assert rank_index.lookup(3) == (200, 2)
+    assert len(rank_index) == 6
+
+
+def test_rank_index_ignores_rolled_back_changes(
+    sqlite_db_session, rank_index, indexed_ranking_service
+):
+    """Test that gem changes are discarded from the index on rollback."""
+    # Arrange
+    indexed_ranking_service.apply_gem_change(5, old_gem_count=4, new_gem_count=300)
+
+    # Act
+    sqlite_db_session.rollback()
+
+    # Assert
+    assert rank_index.lookup(5) == (4, 6)
+
+
+def test_rank_index_rejects_negative_gem_counts(rank_index):
+    """Test that negative gem counts cannot be indexed."""
+    with pytest.raises(ValueError, match="Gem count cannot be negative."):
+        rank_index.update(1, -1)
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.services import RankingService, UserService
+from app.services.rank_scheduler import RankScheduler
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture
+def scheduler(sqlite_engine):
+    """Fixture for a RankScheduler bound to the SQLite test database."""
+    scheduler = RankScheduler(
+        sessionmaker(bind=sqlite_engine),
+        interval_seconds=60,
+        change_threshold=2,
+        enabled=True,
+    )
+    yield scheduler
+    scheduler.stop()
+
+
+def test_run_once_persists_ranks(scheduler, user_service):
+    """Test that a run rewrites stored ranks and records its timing."""
+    # Act
+    scheduler.run_once()
+
+    # Assert
+    ranks = {user.username: user.rank for user in user_service.list_users()}
+    assert ranks == {
+        "Alice": 2,
+        "Bob": 3,
+        "Charlie": 1,
+        "Diana": 3,
+        "Eve": 6,
+        "Frank": 5,
+    }
+    status = scheduler.status()
+    assert status["runs"] == 1
+    assert status["last_run_at"] is not None
+    assert status["last_duration_ms"] >= 0
+    assert status["last_error"] is None
+
+
+def test_scheduled_mode_leaves_ranks_to_the_job(sqlite_db_session, scheduler):
+    """Test that gem changes in scheduled mode wait for the next run."""
+    # Arrange
+    ranking_service = RankingService(sqlite_db_session, mode="scheduled")
+    ranking_service.assign_ranks()
+
+    # Act: Eve jumps to the top, but stored ranks are not touched
+    ranking_service.update_user_gem_count(user_id=5, gem_count=500)
+    before = UserService(sqlite_db_session).get_user(user_id=5).rank
+    scheduler.run_once()
+    sqlite_db_session.expire_all()
+    after = UserService(sqlite_db_session).get_user(user_id=5).rank
+
+    # Assert
+    assert (before, after) == (6, 1)
+
+
+def test_change_threshold_wakes_the_job(scheduler):
+    """Test that reaching the change threshold triggers a run early."""
+    # Arrange
+    scheduler.start()
+
+    # Act
+    scheduler.record_gem_change()
+    scheduler.record_gem_change()
+    deadline = time.monotonic() + 5
+    while scheduler.runs == 0 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scheduler.stop()
+
+    # Assert: The interval is a minute, so only the threshold can explain a run
+    assert scheduler.runs == 1
+    assert scheduler.pending_changes == 0
+
+
+def test_disabled_scheduler_does_not_start(sqlite_engine):
+    """Test that a disabled scheduler never spawns its thread."""
+    # Arrange
+    scheduler = RankScheduler(sessionmaker(bind=sqlite_engine), enabled=False)
+
+    # Act
+    scheduler.start()
+
+    # Assert
+    assert not scheduler.running
@@ -2,6 +2,10 @@ import logging
 
 import pytest
 
+from app.models import GemHistogram
+from app.schemas.users import UserCreate
+from app.services import RankingService
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -53,3 +57,228 @@ def test_get_top_n_users(ranking_service):
     assert top_users[0].username == "Charlie"  # Highest gem count (200)
     assert top_users[1].username == "Alice"  # Second highest gem count (150)
     assert top_users[2].username == "Bob"  # Third highest gem count (100)
+
+
+def _expected_ranks(users):
+    """Compute competition ranks from scratch for comparison."""
+    return {
+        user.id: 1 + sum(other.gem_count > user.gem_count for other in users)
+        for user in users
+    }
+
+
+def test_update_user_gem_count_maintains_ranks(ranking_service, user_service):
+    """Test that histogram-derived ranks stay consistent after gem changes."""
+    # Arrange: Start from a consistent histogram
+    ranking_service.rebuild_gem_histogram()
+
+    # Act: Eve overtakes Bob and Diana, then Charlie falls behind Alice
+    ranking_service.update_user_gem_count(user_id=5, gem_count=120)
+    ranking_service.update_user_gem_count(user_id=3, gem_count=100)
+
+    # Assert: Every leaderboard rank matches a full recomputation
+    expected = _expected_ranks(user_service.list_users())
+    rows = ranking_service.get_leaderboard(n=6)
+    assert {row.id: row.rank for row in rows} == expected
+    assert expected[1] == 1  # Alice now leads with 150 gems
+    assert expected[5] == 2  # Eve is second with 120 gems
+
+
+def test_gem_change_leaves_stored_ranks_untouched(
+    ranking_service, user_service, query_counter
+):
+    """Test that incremental mode moves only histogram buckets on a gem change."""
+    # Arrange
+    ranking_service.rebuild_gem_histogram()
+
+    # Act: Eve's first gem change crosses every other user
+    with query_counter() as queries:
+        ranking_service.apply_gem_change(5, old_gem_count=4, new_gem_count=500)
+
+    # Assert: Two histogram upserts and no write to users
+    assert len(queries) == 2
+    assert all("gem_histogram" in statement for statement in queries)
+    assert {user.rank for user in user_service.list_users()} == {0}
+
+
+def test_new_user_rank(ranking_service, user_service):
+    """Test that a new user is ranked alongside other users with zero gems."""
+    # Arrange
+    ranking_service.assign_ranks()
+
+    # Act
+    user = user_service.create_user(UserCreate(username="Grace"))
+
+    # Assert: All six seeded users have more than zero gems
+    assert user.rank == 7
+    assert ranking_service.rank_for_gem_count(14) == 5
+
+
+@pytest.mark.parametrize("mode", ["incremental", "window"])
+def test_get_leaderboard(sqlite_db_session, mode):
+    """Test the top N leaderboard rows in both ranking modes."""
+    # Arrange
+    ranking_service = RankingService(sqlite_db_session, mode=mode)
+    ranking_service.assign_ranks()
+
+    # Act
+    rows = ranking_service.get_leaderboard(n=4)
+
+    # Assert: Bob and Diana tie on rank 3, ordered by ID
+    assert [(row.username, row.gem_count, row.rank) for row in rows] == [
+        ("Charlie", 200, 1),
+        ("Alice", 150, 2),
+        ("Bob", 100, 3),
+        ("Diana", 100, 3),
+    ]
+
+
+def test_window_mode_computes_ranks_at_query_time(sqlite_db_session, user_service):
+    """Test that window mode ranks reflect gem changes without stored ranks."""
+    # Arrange
+    ranking_service = RankingService(sqlite_db_session, mode="window")
+
+    # Act: Frank jumps to the top; stored ranks are left untouched
+    ranking_service.update_user_gem_count(user_id=6, gem_count=500)
+    rows = ranking_service.get_leaderboard(n=2)
+
+    # Assert
+    assert [(row.username, row.rank) for row in rows] == [("Frank", 1), ("Charlie", 2)]
+    assert user_service.get_user(user_id=6).rank == 0
+
+
+def test_unknown_ranking_mode(sqlite_db_session):
+    """Test that an unsupported ranking mode is rejected."""
+    with pytest.raises(ValueError, match="Unknown ranking mode 'dense'."):
+        RankingService(sqlite_db_session, mode="dense")
+
+
+@pytest.mark.parametrize("mode", ["incremental", "window"])
+def test_get_leaderboard_page_walks_all_users(sqlite_db_session, mode):
+    """Test that following cursors visits every user once with correct ranks."""
+    # Arrange
+    ranking_service = RankingService(sqlite_db_session, mode=mode)
+
+    # Act: Page size 3 splits the Bob/Diana tie across pages
+    pages = []
+    cursor = None
+    while True:
+        rows, cursor = ranking_service.get_leaderboard_page(limit=3, cursor=cursor)
+        pages.append([(row.username, row.rank) for row in rows])
+        if cursor is None:
+            break
+
+    # Assert
+    assert pages == [
+        [("Charlie", 1), ("Alice", 2), ("Bob", 3)],
+        [("Diana", 3), ("Frank", 5), ("Eve", 6)],
+    ]
+
+
+def test_get_leaderboard_page_invalid_cursor(ranking_service):
+    """Test that a tampered cursor is rejected."""
+    with pytest.raises(ValueError, match="Invalid cursor."):
+        ranking_service.get_leaderboard_page(limit=3, cursor="not-a-cursor")
+
+
+def _histogram(db):
+    """Read the gem histogram as {gem_count: user_count}, skipping empty buckets."""
+    return {
+        row.gem_count: row.user_count
+        for row in db.query(GemHistogram).all()
+        if row.user_count
+    }
+
+
+def test_gem_histogram_follows_gem_changes(
+    sqlite_db_session, ranking_service, user_service
+):
+    """Test that the histogram moves users between buckets transactionally."""
+    # Arrange
+    ranking_service.assign_ranks()
+
+    # Act
+    ranking_service.update_user_gem_count(user_id=2, gem_count=150)
+    user_service.create_user(UserCreate(username="Grace"))
+
+    # Assert: Bob moved from 100 to 150 and Grace joined on zero gems
+    assert _histogram(sqlite_db_session) == {200: 1, 150: 2, 100: 1, 14: 1, 4: 1, 0: 1}
+
+
+def test_get_user_standing(ranking_service):
+    """Test rank and top percentage answered from the histogram."""
+    # Arrange
+    ranking_service.assign_ranks()
+
+    # Act
+    charlie = ranking_service.get_user_standing(user_id=3)
+    diana = ranking_service.get_user_standing(user_id=4)
+
+    # Assert
+    assert charlie == (200, 1, 6, 16.67)
+    assert diana == (100, 3, 6, 50.0)
+
+
+def test_get_user_standing_unknown_user(ranking_service):
+    """Test the standing of a non-existent user."""
+    with pytest.raises(ValueError, match="User not found."):
+        ranking_service.get_user_standing(user_id=999)
+
+
+def test_get_users_around(ranking_service):
+    """Test the window of users around Bob, including the tie with Diana."""
+    # Arrange
+    ranking_service.rebuild_gem_histogram()
+
+    # Act
+    window = ranking_service.get_users_around(user_id=2, size=2)
+
+    # Assert
+    assert [(row.username, row.rank) for row in window] == [
+        ("Charlie", 1),
+        ("Alice", 2),
+        ("Bob", 3),
+        ("Diana", 3),
+        ("Frank", 5),
+    ]
+
+
+def test_get_users_around_starts_inside_a_tie(ranking_service):
+    """Test that a window starting mid-tie keeps the tie's rank and skips ahead."""
+    # Arrange
+    ranking_service.rebuild_gem_histogram()
+
+    # Act: The window above Frank starts at Diana, who shares rank 3 with Bob
+    window = ranking_service.get_users_around(user_id=6, size=1)
+
+    # Assert
+    assert [(row.username, row.rank) for row in window] == [
+        ("Diana", 3),
+        ("Frank", 5),
+        ("Eve", 6),
+    ]
+
+
+def test_get_users_around_follows_gem_changes(ranking_service, query_counter):
+    """Test that window ranks reflect a gem change in a fixed number of queries."""
+    # Arrange: Eve climbs level with Frank
+    ranking_service.rebuild_gem_histogram()
+    ranking_service.update_user_gem_count(user_id=5, gem_count=14)
+
+    # Act
+    with query_counter() as queries:
+        window = ranking_service.get_users_around(user_id=5, size=1)
+
+    # Assert: One lookup, two seeks per side and one histogram read
+    assert [(row.username, row.rank) for row in window] == [
+        ("Diana", 3),
+        ("Eve", 5),
+        ("Frank", 5),
+    ]
+    assert len(queries) <= 6
+
+
+def test_get_users_around_unknown_user(ranking_service):
+    """Test requesting the window around a non-existent user."""
+    with pytest.raises(ValueError, match="User not found."):
+        ranking_service.get_users_around(user_id=999)
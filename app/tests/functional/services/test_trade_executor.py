@@ -0,0 +1,258 @@
+import threading
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models import Asset, Portfolio, PortfolioAsset, User
+from app.services.achievement_worker import achievement_worker
+from app.services.trade_executor import GroupCommitExecutor, UserActorExecutor
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture
+def shared_engine():
+    """
+    Fixture for an in-memory SQLite engine whose single connection is shared
+    across threads, so the executor's worker sees the seeded data.
+    """
+    engine = create_engine(
+        "sqlite://",
+        poolclass=StaticPool,
+        connect_args={"check_same_thread": False},
+    )
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add_all(
+            [User(id=i, username=f"trader{i}", balance=1000.0) for i in range(1, 9)]
+        )
+        db.add_all([Portfolio(id=i, user_id=i) for i in range(1, 9)])
+        db.add(Asset(id=1, name="Gold", price=100.0))
+        db.commit()
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def executor(shared_engine):
+    """Fixture for a group-commit executor with a generous batching window."""
+    executor = GroupCommitExecutor(shared_engine, max_batch=8, max_delay_ms=200)
+    yield executor
+    executor.stop()
+
+
+def test_concurrent_trades_share_commits(shared_engine, executor):
+    """Test that trades submitted together are committed in fewer transactions."""
+    # Arrange
+    results = {}
+
+    def buy(user_id):
+        results[user_id] = executor.add_asset_to_portfolio(user_id, 1, 2)
+
+    threads = [threading.Thread(target=buy, args=(i,)) for i in range(1, 9)]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert executor.trades == 8
+    assert executor.batches < 8
+    assert {result.quantity for result in results.values()} == {2}
+    with Session(shared_engine) as db:
+        assert {user.balance for user in db.query(User)} == {800.0}
+        assert db.query(PortfolioAsset).count() == 8
+
+
+def test_rejected_trade_rolls_back_alone(shared_engine, executor, monkeypatch):
+    """Test that a failing trade in a batch does not affect the others."""
+    # Arrange
+    batch_outcomes = {}
+
+    def trade(name, call):
+        try:
+            batch_outcomes[name] = call()
+        except ValueError as e:
+            batch_outcomes[name] = e
+
+    notified = []
+    monkeypatch.setattr(achievement_worker, "notify", lambda: notified.append(1))
+    threads = [
+        threading.Thread(
+            target=trade, args=("buy", lambda: executor.add_asset_to_portfolio(1, 1, 3))
+        ),
+        threading.Thread(
+            target=trade,
+            args=("oversell", lambda: executor.remove_asset_from_portfolio(2, 1, 1)),
+        ),
+        threading.Thread(
+            target=trade,
+            args=("overspend", lambda: executor.add_asset_to_portfolio(3, 1, 11)),
+        ),
+    ]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert batch_outcomes["buy"].quantity == 3
+    assert str(batch_outcomes["oversell"]) == "Asset with ID 1 not found in portfolio."
+    assert str(batch_outcomes["overspend"]) == (
+        "Insufficient balance to complete the trade."
+    )
+    with Session(shared_engine) as db:
+        balances = {user.id: user.balance for user in db.query(User)}
+        assert (balances[1], balances[2], balances[3]) == (700.0, 1000.0, 1000.0)
+        assert db.get(User, 1).trade_count == 1
+        assert db.get(User, 3).trade_count == 0
+    # After-commit work ran once the shared transaction committed, for the
+    # accepted trade only
+    assert notified == [1]
+
+
+@pytest.fixture
+def actors(shared_engine):
+    """Fixture for a per-user actor executor with a few workers."""
+    actors = UserActorExecutor(shared_engine, workers=4)
+    yield actors
+    actors.stop()
+
+
+def test_actor_serializes_one_users_trades(shared_engine, actors):
+    """Test that racing buys by one user never overspend their balance."""
+    # Arrange
+    outcomes = []
+
+    def buy():
+        try:
+            outcomes.append(actors.add_asset_to_portfolio(1, 1, 3))
+        except ValueError as e:
+            outcomes.append(e)
+
+    threads = [threading.Thread(target=buy) for _ in range(6)]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    filled = [o for o in outcomes if not isinstance(o, ValueError)]
+    assert len(filled) == 3
+    # Applied in order by one worker, so holdings grow 3, 6, 9
+    assert sorted(o.quantity for o in filled) == [3, 6, 9]
+    with Session(shared_engine) as db:
+        assert db.get(User, 1).balance == 100.0
+        assert db.get(User, 1).trade_count == 3
+
+
+def test_actor_partitions_users_across_workers(shared_engine, actors):
+    """Test that different users are owned by different workers."""
+    # Act
+    for user_id in range(1, 5):
+        actors.add_asset_to_portfolio(user_id, 1, 1)
+
+    # Assert
+    assert {actors.worker_for(user_id) for user_id in range(1, 5)} == {0, 1, 2, 3}
+    assert actors.trades == 4
+    assert sum(thread.is_alive() for thread in actors._threads) == 4
+    with Session(shared_engine) as db:
+        assert db.query(PortfolioAsset).count() == 4
+
+
+def test_actor_stop_drains_queues(shared_engine, actors):
+    """Test that stopping waits for queued trades and can be restarted."""
+    # Arrange
+    actors.add_asset_to_portfolio(1, 1, 1)
+
+    # Act
+    actors.stop()
+    result = actors.remove_asset_from_portfolio(1, 1, 1)
+
+    # Assert
+    assert result.quantity == 0
+    assert actors.running
+    assert actors.trades == 2
+
+
+def test_actor_stop_before_start(shared_engine, actors):
+    """Test that stopping idle workers leaves nothing queued for the next ones."""
+    # Act
+    actors.stop()
+    result = actors.add_asset_to_portfolio(1, 1, 1)
+
+    # Assert
+    assert result.quantity == 1
+    assert all(trades.empty() for trades in actors._queues)
+
+
+def test_actor_restarts_exited_workers(shared_engine, actors):
+    """Test that start() replaces workers that exited without stop()."""
+    # Arrange
+    actors.start()
+    for trades in actors._queues:
+        trades.put(None)
+    for thread in actors._threads:
+        thread.join(5)
+
+    # Act
+    actors.start()
+    result = actors.add_asset_to_portfolio(1, 1, 1)
+
+    # Assert
+    assert result.quantity == 1
+    assert actors.running
+
+
+def test_actor_counts_concurrent_trades(actors, monkeypatch):
+    """Test that trades committed on every worker at once are all counted."""
+
+    # Arrange: trades that touch no database, so the workers truly overlap
+    class InstantTrades:
+        def __init__(self, db):
+            pass
+
+        def add_asset_to_portfolio(self, user_id, asset_id, quantity):
+            return quantity
+
+    monkeypatch.setattr("app.services.trade_executor.PortfolioService", InstantTrades)
+    threads = [
+        threading.Thread(target=actors.add_asset_to_portfolio, args=(user_id, 1, 1))
+        for user_id in range(1, 9)
+        for _ in range(250)
+    ]
+
+    # Act
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Assert
+    assert actors.trades == 2000
+
+
+def test_actor_submit_skips_start_once_started(shared_engine, actors, monkeypatch):
+    """Test that trades after the first do not go through start()."""
+    # Arrange
+    actors.add_asset_to_portfolio(1, 1, 1)
+
+    def fail():
+        raise AssertionError("start() called on the trade path")
+
+    monkeypatch.setattr(actors, "start", fail)
+
+    # Act
+    result = actors.add_asset_to_portfolio(1, 1, 1)
+
+    # Assert
+    assert result.quantity == 2
@@ -1,6 +1,11 @@
 import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
 
+from app.core.database import Base
+from app.models import User
 from app.schemas.users import UserCreate
+from app.services import UserService
 
 pytestmark = pytest.mark.functional
 
@@ -90,3 +95,33 @@ def test_withdraw_insufficient_balance(user_service):
     # Act & Assert: Expect a ValueError for insufficient funds
     with pytest.raises(ValueError, match="Insufficient funds."):
         user_service.withdraw_balance(user_id=user.id, amount=600.0)
+
+
+def test_deposit_retries_on_version_conflict(tmp_path):
+    """Test that a deposit racing another committed write is re-applied, not lost."""
+    # Arrange: A file database, so the racing writer has its own connection
+    engine = create_engine(f"sqlite:///{tmp_path / 'race.db'}")
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        db.add(User(id=1, username="Alice", balance=500.0))
+        db.commit()
+    db = Session(engine)
+    raced = []
+
+    @event.listens_for(db, "before_flush")
+    def concurrent_deposit(session, flush_context, instances):
+        if not raced:
+            raced.append(True)
+            with Session(engine) as other:
+                other.get(User, 1).balance += 50.0
+                other.commit()
+
+    # Act
+    UserService(db).deposit_balance(user_id=1, amount=200.0)
+
+    # Assert: Both deposits count
+    db.close()
+    with Session(engine) as check:
+        user = check.get(User, 1)
+        assert (user.balance, user.version) == (750.0, 3)
+    engine.dispose()
@@ -0,0 +1,121 @@
+import pytest
+
+from app.models import Portfolio, User
+from app.services import ValuationService
+
+pytestmark = pytest.mark.functional
+
+
+@pytest.fixture
+def valuation_service(sqlite_db_session):
+    """Fixture for ValuationService with valuations rebuilt from the seed data."""
+    service = ValuationService(sqlite_db_session)
+    service.rebuild_valuations()
+    sqlite_db_session.commit()
+    return service
+
+
+def _net_worth(db, user_id):
+    """Read a user's stored net worth."""
+    db.expire_all()
+    return db.get(User, user_id).net_worth
+
+
+def _market_value(db, user_id):
+    """Read the stored market value of a user's portfolio."""
+    db.expire_all()
+    return db.query(Portfolio).filter(Portfolio.user_id == user_id).one().market_value
+
+
+def test_rebuild_uses_balance_and_holdings(
+    valuation_service, sqlite_db_session, portfolio_service, asset_service
+):
+    """Test that a rebuild values every portfolio at current prices."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    asset = asset_service.create_asset(name="Stock A", price=50.0)
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=asset.id, quantity=4)
+
+    # Act
+    valuation_service.rebuild_valuations()
+    sqlite_db_session.commit()
+
+    # Assert
+    assert _market_value(sqlite_db_session, 1) == 200.0
+    assert _net_worth(sqlite_db_session, 1) == 500.0
+    assert _net_worth(sqlite_db_session, 2) == 1000.0
+
+
+def test_trades_move_cash_into_market_value(
+    valuation_service, sqlite_db_session, portfolio_service, asset_service
+):
+    """Test that buying and selling at market price keeps net worth unchanged."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    asset = asset_service.create_asset(name="Stock A", price=50.0)
+
+    # Act
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=asset.id, quantity=6)
+    portfolio_service.remove_asset_from_portfolio(
+        user_id=1, asset_id=asset.id, quantity=2
+    )
+
+    # Assert
+    assert _market_value(sqlite_db_session, 1) == 200.0
+    assert _net_worth(sqlite_db_session, 1) == 500.0
+
+
+def test_price_change_revalues_holders_only(
+    valuation_service, sqlite_db_session, portfolio_service, asset_service
+):
+    """Test that a price change moves the net worth of holders and no one else."""
+    # Arrange
+    portfolio_service.create_portfolio(user_id=1)
+    portfolio_service.create_portfolio(user_id=2)
+    held = asset_service.create_asset(name="Stock A", price=50.0)
+    other = asset_service.create_asset(name="Stock B", price=10.0)
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=held.id, quantity=4)
+    portfolio_service.add_asset_to_portfolio(user_id=2, asset_id=other.id, quantity=5)
+
+    # Act
+    asset_service.update_asset(asset_id=held.id, price=80.0)
+
+    # Assert
+    assert _market_value(sqlite_db_session, 1) == 320.0
+    assert _net_worth(sqlite_db_session, 1) == 620.0
+    assert _market_value(sqlite_db_session, 2) == 50.0
+    assert _net_worth(sqlite_db_session, 2) == 1000.0
+
+
+def test_cash_changes_update_net_worth(
+    valuation_service, sqlite_db_session, user_service
+):
+    """Test that deposits and withdrawals are reflected in net worth."""
+    # Act
+    user_service.deposit_balance(user_id=1, amount=200.0)
+    user_service.withdraw_balance(user_id=1, amount=50.0)
+
+    # Assert
+    assert _net_worth(sqlite_db_session, 1) == 650.0
+
+
+def test_net_worth_leaderboard(
+    valuation_service, ranking_service, portfolio_service, asset_service
+):
+    """Test ranking users by stored net worth, with ties sharing a rank."""
+    # Arrange: Alice's holdings double in value, taking her to 1000 like Bob
+    portfolio_service.create_portfolio(user_id=1)
+    asset = asset_service.create_asset(name="Stock A", price=50.0)
+    portfolio_service.add_asset_to_portfolio(user_id=1, asset_id=asset.id, quantity=10)
+    asset_service.update_asset(asset_id=asset.id, price=100.0)
+
+    # Act
+    leaderboard = ranking_service.get_net_worth_leaderboard(4)
+
+    # Assert
+    assert [(row.username, row.net_worth, row.rank) for row in leaderboard] == [
+        ("Eve", 2000.0, 1),
+        ("Frank", 1500.0, 2),
+        ("Alice", 1000.0, 3),
+        ("Bob", 1000.0, 3),
+    ]
@@ -4,9 +4,16 @@ import pytest
 from fastapi.testclient import TestClient
 from services.asset_service import AssetService
 
-from app.dependencies import get_asset_service
+from app.dependencies import get_asset_service, get_order_book_service
 from app.main import app
 from app.schemas.assets import AssetResponse
+from app.services.order_book import BookLevel, Fill
+from app.services.order_book_service import (
+    BookSnapshot,
+    OrderBookService,
+    OrderResult,
+    SettledFill,
+)
 
 pytestmark = pytest.mark.unit
 
@@ -166,3 +173,153 @@ def test_list_assets(mock_asset_service):
         {"id": 2, "name": "Silver", "price": 25.0},
     ]
     mock_asset_service.get_all_assets.assert_called_once()
+
+
+@pytest.fixture
+def mock_order_book_service():
+    """Fixture for Mock OrderBookService, wired into the app."""
+    service = MagicMock(spec=OrderBookService)
+    app.dependency_overrides[get_order_book_service] = lambda: service
+    return service
+
+
+def test_get_order_book(mock_order_book_service):
+    """Test retrieving the top of an asset's order book."""
+    # Arrange
+    mock_order_book_service.get_book.return_value = BookSnapshot(
+        best_bid=99.0,
+        best_ask=101.0,
+        last_price=100.0,
+        bids=[BookLevel(99.0, 5, 2)],
+        asks=[BookLevel(101.0, 3, 1)],
+    )
+
+    # Act
+    response = client.get("/assets/1/book?depth=5")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {
+        "asset_id": 1,
+        "best_bid": 99.0,
+        "best_ask": 101.0,
+        "last_price": 100.0,
+        "bids": [{"price": 99.0, "quantity": 5, "orders": 2}],
+        "asks": [{"price": 101.0, "quantity": 3, "orders": 1}],
+    }
+    mock_order_book_service.get_book.assert_called_once_with(1, 5)
+
+
+def test_get_order_book_depth(mock_order_book_service):
+    """Test retrieving cumulative order book depth."""
+    # Arrange
+    mock_order_book_service.get_depth.return_value = (
+        [(99.0, 5, 5), (98.0, 2, 7)],
+        [],
+    )
+
+    # Act
+    response = client.get("/assets/1/book/depth")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["bids"] == [
+        {"price": 99.0, "quantity": 5, "cumulative_quantity": 5},
+        {"price": 98.0, "quantity": 2, "cumulative_quantity": 7},
+    ]
+    mock_order_book_service.get_depth.assert_called_once_with(1, 10)
+
+
+def test_get_order_book_unknown_asset(mock_order_book_service):
+    """Test retrieving the book of an asset that does not exist."""
+    # Arrange
+    mock_order_book_service.get_book.side_effect = ValueError(
+        "Asset with ID 9 not found."
+    )
+
+    # Act
+    response = client.get("/assets/9/book")
+
+    # Assert
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Asset with ID 9 not found."}
+
+
+def test_place_order(mock_order_book_service):
+    """Test placing a limit order that fills in part."""
+    # Arrange
+    fill = Fill(100.0, 2, 7, 3, buyer_id=1, seller_id=2)
+    mock_order_book_service.place_order.return_value = OrderResult(
+        7, "partially_filled", 3, [SettledFill(fill, True)]
+    )
+    request_data = {"user_id": 1, "side": "buy", "quantity": 5, "price": 100.0}
+
+    # Act
+    response = client.post("/assets/1/book/orders", json=request_data)
+
+    # Assert
+    assert response.status_code == 201
+    assert response.json() == {
+        "order_id": 7,
+        "status": "partially_filled",
+        "remaining_quantity": 3,
+        "fills": [
+            {
+                "price": 100.0,
+                "quantity": 2,
+                "buyer_id": 1,
+                "seller_id": 2,
+                "settled": True,
+                "error": None,
+            }
+        ],
+        "cancelled_order_ids": [],
+    }
+    mock_order_book_service.place_order.assert_called_once_with(1, 1, "buy", 5, 100.0)
+
+
+def test_place_order_invalid_side(mock_order_book_service):
+    """Test that an unknown side is rejected before reaching the book."""
+    # Act
+    response = client.post(
+        "/assets/1/book/orders", json={"user_id": 1, "side": "hold", "quantity": 5}
+    )
+
+    # Assert
+    assert response.status_code == 422
+    mock_order_book_service.place_order.assert_not_called()
+
+
+def test_cancel_order(mock_order_book_service):
+    """Test cancelling a resting order."""
+    # Act
+    response = client.delete("/assets/1/book/orders/7?user_id=1")
+
+    # Assert
+    assert response.status_code == 204
+    mock_order_book_service.cancel_order.assert_called_once_with(1, 7, 1)
+
+
+def test_cancel_order_requires_user(mock_order_book_service):
+    """Test that an order cannot be cancelled without naming its owner."""
+    # Act
+    response = client.delete("/assets/1/book/orders/7")
+
+    # Assert
+    assert response.status_code == 422
+    mock_order_book_service.cancel_order.assert_not_called()
+
+
+def test_cancel_other_users_order(mock_order_book_service):
+    """Test that cancelling another user's order is reported as not found."""
+    # Arrange
+    mock_order_book_service.cancel_order.side_effect = ValueError(
+        "Order with ID 7 not found."
+    )
+
+    # Act
+    response = client.delete("/assets/1/book/orders/7?user_id=2")
+
+    # Assert
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Order with ID 7 not found."}
@@ -0,0 +1,122 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.pool_stats import PoolStats
+from app.dependencies import get_maintenance_scheduler, get_pool_stats
+from app.main import app
+from app.services.maintenance_scheduler import MaintenanceScheduler
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def clear_overrides():
+    yield
+    app.dependency_overrides = {}
+
+
+def test_get_db_pool_stats(client):
+    """
+    Test reporting the database connection pool's use.
+    """
+    # Arrange
+    mock_stats = MagicMock(spec=PoolStats)
+    mock_stats.status.return_value = {
+        "pid": 4242,
+        "pool_class": "InstrumentedQueuePool",
+        "size": 5,
+        "max_overflow": 10,
+        "timeout_seconds": 30.0,
+        "checked_out": 7,
+        "checked_in": 0,
+        "overflow": 2,
+        "peak_checked_out": 9,
+        "checkouts": 120,
+        "checkins": 113,
+        "connects": 9,
+        "invalidations": 0,
+        "timeouts": 1,
+        "wait_ms_total": 240.0,
+        "wait_ms_max": 30000.0,
+        "wait_ms_avg": 2.0,
+        "hold_ms_total": 1130.0,
+        "hold_ms_max": 85.0,
+        "hold_ms_avg": 10.0,
+    }
+    app.dependency_overrides[get_pool_stats] = lambda: mock_stats
+
+    # Act
+    response = client.get("/internal/db-pool")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["checked_out"] == 7
+    assert response.json()["overflow"] == 2
+    assert response.json()["timeouts"] == 1
+    assert response.json()["wait_ms_avg"] == 2.0
+    assert response.json()["hold_ms_max"] == 85.0
+
+
+def test_db_usage_header(client, monkeypatch):
+    """
+    Test reporting a request's connection use in a Server-Timing header.
+    """
+    # Arrange
+    monkeypatch.setattr("app.api.middleware.DB_USAGE_HEADER_ENABLED", True)
+
+    # Act
+    response = client.get("/health")
+
+    # Assert: No query, so no connection was checked out
+    assert response.status_code == 200
+    assert response.headers["Server-Timing"] == (
+        'db-query;dur=0.000;desc="0 queries", '
+        'db-wait;dur=0.000, db-hold;dur=0.000;desc="0 checkouts"'
+    )
+    assert response.headers["X-DB-Query-Count"] == "0"
+
+
+def test_db_usage_header_disabled_by_default(client):
+    """
+    Test that the Server-Timing header is opt-in.
+    """
+    # Act
+    response = client.get("/health")
+
+    # Assert
+    assert "Server-Timing" not in response.headers
+
+
+def test_run_maintenance(client):
+    """
+    Test running the maintenance jobs on demand.
+    """
+    # Arrange
+    mock_scheduler = MagicMock(spec=MaintenanceScheduler)
+    mock_scheduler.status.return_value = {
+        "enabled": True,
+        "running": True,
+        "interval_seconds": 3600.0,
+        "jobs": ["rebuild_valuations"],
+        "runs": 1,
+        "last_run_at": None,
+        "last_duration_ms": 12.5,
+        "last_errors": {},
+    }
+    app.dependency_overrides[get_maintenance_scheduler] = lambda: mock_scheduler
+
+    # Act
+    response = client.post("/internal/maintenance/run")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["jobs"] == ["rebuild_valuations"]
+    assert response.json()["runs"] == 1
+    mock_scheduler.run_once.assert_called_once()
@@ -1,12 +1,26 @@
-from unittest.mock import MagicMock
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi.testclient import TestClient
-from services.ranking_service import RankingService
+from services.ranking_service import (
+    NetWorthRank,
+    RankedUser,
+    RankingService,
+    UserStanding,
+)
 
-from app.dependencies import get_ranking_service
+from app.dependencies import (
+    get_leaderboard_cache,
+    get_leaderboard_stream,
+    get_rank_scheduler,
+    get_ranking_service,
+)
 from app.main import app
 from app.models.user import User
+from app.services.leaderboard_cache import LeaderboardCache
+from app.services.leaderboard_stream import LeaderboardStream
+from app.services.rank_scheduler import RankScheduler
 
 pytestmark = pytest.mark.unit
 
@@ -25,6 +39,8 @@ def override_ranking_service(mock_ranking_service):
     Override the TradeService dependency with the mock.
     """
     app.dependency_overrides[get_ranking_service] = lambda: mock_ranking_service
+    cache = LeaderboardCache()
+    app.dependency_overrides[get_leaderboard_cache] = lambda: cache
     yield
     app.dependency_overrides.clear()
 
@@ -39,7 +55,7 @@ def test_get_leaderboard(mock_ranking_service):
         User(rank=2, username="Bob", gem_count=40),
         User(rank=3, username="Charlie", gem_count=30),
     ]
-    mock_ranking_service.get_top_n_users.return_value = mock_users
+    mock_ranking_service.get_leaderboard.return_value = mock_users
 
     # Act: Call the endpoint
     response = client.get("/leaderboard/?top_n=3")
@@ -51,5 +67,282 @@ def test_get_leaderboard(mock_ranking_service):
         {"rank": 2, "username": "Bob", "gem_count": 40},
         {"rank": 3, "username": "Charlie", "gem_count": 30},
     ]
-    mock_ranking_service.assign_ranks.assert_called_once()
-    mock_ranking_service.get_top_n_users.assert_called_once_with(3)
+    mock_ranking_service.assign_ranks.assert_not_called()
+    # The cache loads the smallest snapshot bucket that covers top_n
+    mock_ranking_service.get_leaderboard.assert_called_once_with(10)
+
+
+def test_get_user_rank(mock_ranking_service):
+    """
+    Test retrieving a single user's live rank.
+    """
+    # Arrange
+    mock_ranking_service.get_user_rank.return_value = (150, 2)
+
+    # Act
+    response = client.get("/leaderboard/rank/1")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {"user_id": 1, "gem_count": 150, "rank": 2}
+    mock_ranking_service.get_user_rank.assert_called_once_with(1)
+
+
+def test_get_user_rank_not_found(mock_ranking_service):
+    """
+    Test retrieving the rank of a user missing from the rank index.
+    """
+    # Arrange
+    mock_ranking_service.get_user_rank.side_effect = ValueError("User not found.")
+
+    # Act
+    response = client.get("/leaderboard/rank/999")
+
+    # Assert
+    assert response.status_code == 404
+    assert response.json() == {"detail": "User not found."}
+
+
+def test_get_leaderboard_around_user(mock_ranking_service):
+    """
+    Test retrieving the users ranked around a given user.
+    """
+    # Arrange
+    mock_ranking_service.get_users_around.return_value = [
+        RankedUser(1, "Alice", 150, 2),
+        RankedUser(2, "Bob", 100, 3),
+        RankedUser(4, "Diana", 100, 3),
+    ]
+
+    # Act
+    response = client.get("/leaderboard/around/2?size=1")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == [
+        {"rank": 2, "username": "Alice", "gem_count": 150},
+        {"rank": 3, "username": "Bob", "gem_count": 100},
+        {"rank": 3, "username": "Diana", "gem_count": 100},
+    ]
+    mock_ranking_service.get_users_around.assert_called_once_with(2, 1)
+
+
+def test_get_leaderboard_around_user_not_found(mock_ranking_service):
+    """
+    Test retrieving the window around a non-existent user.
+    """
+    # Arrange
+    mock_ranking_service.get_users_around.side_effect = ValueError("User not found.")
+
+    # Act
+    response = client.get("/leaderboard/around/999")
+
+    # Assert
+    assert response.status_code == 404
+    assert response.json() == {"detail": "User not found."}
+
+
+def test_get_leaderboard_page(mock_ranking_service):
+    """
+    Test retrieving a leaderboard page with a link to the next page.
+    """
+    # Arrange
+    mock_ranking_service.get_leaderboard_page.return_value = (
+        [RankedUser(3, "Charlie", 200, 1), RankedUser(1, "Alice", 150, 2)],
+        "next-token",
+    )
+
+    # Act
+    response = client.get("/leaderboard/page?limit=2")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {
+        "entries": [
+            {"rank": 1, "username": "Charlie", "gem_count": 200},
+            {"rank": 2, "username": "Alice", "gem_count": 150},
+        ],
+        "next_cursor": "next-token",
+        "next": "http://testserver/leaderboard/page?limit=2&cursor=next-token",
+    }
+    mock_ranking_service.get_leaderboard_page.assert_called_once_with(2, None)
+
+
+def test_get_leaderboard_page_invalid_cursor(mock_ranking_service):
+    """
+    Test that a malformed cursor is rejected.
+    """
+    # Arrange
+    mock_ranking_service.get_leaderboard_page.side_effect = ValueError(
+        "Invalid cursor."
+    )
+
+    # Act
+    response = client.get("/leaderboard/page?cursor=garbage")
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor."}
+
+
+def test_get_leaderboard_page_size_cap(mock_ranking_service):
+    """
+    Test that page sizes above the cap are rejected.
+    """
+    # Act
+    response = client.get("/leaderboard/page?limit=100000")
+
+    # Assert
+    assert response.status_code == 422
+    mock_ranking_service.get_leaderboard_page.assert_not_called()
+
+
+@pytest.mark.parametrize("top_n", [0, -1, 100000])
+def test_get_leaderboard_top_n_bounds(mock_ranking_service, top_n):
+    """
+    Test that leaderboard sizes outside 1..the page size cap are rejected.
+    """
+    # Act
+    response = client.get(f"/leaderboard/?top_n={top_n}")
+
+    # Assert
+    assert response.status_code == 422
+    mock_ranking_service.get_leaderboard.assert_not_called()
+
+
+def test_get_user_percentile(mock_ranking_service):
+    """
+    Test retrieving a user's top percentage.
+    """
+    # Arrange
+    mock_ranking_service.get_user_standing.return_value = UserStanding(
+        gem_count=150, rank=2, total_users=6, top_percent=33.33
+    )
+
+    # Act
+    response = client.get("/leaderboard/percentile/1")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == {
+        "user_id": 1,
+        "gem_count": 150,
+        "rank": 2,
+        "total_users": 6,
+        "top_percent": 33.33,
+    }
+
+
+def test_get_user_percentile_not_found(mock_ranking_service):
+    """
+    Test retrieving the percentile of a non-existent user.
+    """
+    # Arrange
+    mock_ranking_service.get_user_standing.side_effect = ValueError("User not found.")
+
+    # Act
+    response = client.get("/leaderboard/percentile/999")
+
+    # Assert
+    assert response.status_code == 404
+    assert response.json() == {"detail": "User not found."}
+
+
+def test_get_leaderboard_served_from_cache(mock_ranking_service):
+    """
+    Test that repeated leaderboard reads reuse the cached snapshot.
+    """
+    # Arrange
+    mock_ranking_service.get_leaderboard.return_value = [
+        User(rank=1, username="Alice", gem_count=50),
+        User(rank=2, username="Bob", gem_count=40),
+    ]
+
+    # Act
+    first = client.get("/leaderboard/?top_n=2")
+    second = client.get("/leaderboard/?top_n=1")
+
+    # Assert
+    assert first.json() == [
+        {"rank": 1, "username": "Alice", "gem_count": 50},
+        {"rank": 2, "username": "Bob", "gem_count": 40},
+    ]
+    assert second.json() == [{"rank": 1, "username": "Alice", "gem_count": 50}]
+    mock_ranking_service.get_leaderboard.assert_called_once_with(10)
+
+
+def test_get_rank_scheduler_status():
+    """
+    Test reporting the background rank scheduler's last run.
+    """
+    # Arrange
+    mock_scheduler = MagicMock(spec=RankScheduler)
+    mock_scheduler.status.return_value = {
+        "enabled": True,
+        "running": True,
+        "interval_seconds": 60.0,
+        "change_threshold": 1000,
+        "pending_changes": 12,
+        "runs": 3,
+        "last_run_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "last_duration_ms": 42.5,
+        "last_error": None,
+    }
+    app.dependency_overrides[get_rank_scheduler] = lambda: mock_scheduler
+
+    # Act
+    response = client.get("/leaderboard/scheduler")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["last_run_at"] == "2026-01-01T00:00:00Z"
+    assert response.json()["last_duration_ms"] == 42.5
+    assert response.json()["pending_changes"] == 12
+
+
+def test_stream_leaderboard():
+    """
+    Test streaming the leaderboard as Server-Sent Events.
+    """
+    # Arrange
+    mock_stream = MagicMock(spec=LeaderboardStream)
+    subscriber = object()
+    mock_stream.subscribe = AsyncMock(return_value=subscriber)
+
+    async def events(_):
+        yield 'event: snapshot\nid: 0\ndata: {"entries": []}\n\n'
+
+    mock_stream.events.side_effect = events
+    app.dependency_overrides[get_leaderboard_stream] = lambda: mock_stream
+
+    # Act
+    response = client.get("/leaderboard/stream?top_n=5")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    assert response.text == 'event: snapshot\nid: 0\ndata: {"entries": []}\n\n'
+    mock_stream.subscribe.assert_awaited_once_with(5)
+    mock_stream.events.assert_called_once_with(subscriber)
+
+
+def test_get_net_worth_leaderboard(mock_ranking_service):
+    """
+    Test retrieving the top users by net worth.
+    """
+    # Arrange
+    mock_ranking_service.get_net_worth_leaderboard.return_value = [
+        NetWorthRank(id=5, username="Eve", net_worth=2000.0, rank=1),
+        NetWorthRank(id=6, username="Frank", net_worth=1500.0, rank=2),
+    ]
+
+    # Act
+    response = client.get("/leaderboard/net-worth?top_n=2")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json() == [
+        {"rank": 1, "username": "Eve", "net_worth": 2000.0},
+        {"rank": 2, "username": "Frank", "net_worth": 1500.0},
+    ]
+    mock_ranking_service.get_net_worth_leaderboard.assert_called_once_with(2)
@@ -1,3 +1,4 @@
+from datetime import datetime, timezone
 from unittest.mock import MagicMock
 
 import pytest
@@ -7,11 +8,19 @@ from schemas.portfolios import (
     AddAssetRequest,
     PortfolioRequest,
 )
-from services.portfolio_service import PortfolioService
+from services.portfolio_service import (
+    BatchTradeResult,
+    FilledLeg,
+    PortfolioService,
+    PortfolioVersion,
+    TradeLeg,
+)
 
-from app.dependencies import get_portfolio_service
+from app.dependencies import get_conditional_order_service, get_portfolio_service
 from app.main import app
-from app.models import Asset, PortfolioAsset
+from app.models import Asset, ConditionalOrder, PortfolioAsset, Trade
+from app.services.conditional_order_service import ConditionalOrderService
+from app.services.trade_executor import GroupCommitExecutor, UserActorExecutor
 
 pytestmark = pytest.mark.unit
 
@@ -183,8 +192,9 @@ def test_list_portfolio_assets(mock_portfolio_service):
     user_id = 1
 
     # Mock portfolio and assets
-    mock_portfolio = MagicMock(id=1, user_id=user_id)
-    mock_portfolio_service.get_portfolio.return_value = mock_portfolio
+    mock_portfolio_service.get_portfolio_version.return_value = PortfolioVersion(
+        portfolio_id=1, version=3
+    )
     mock_portfolio_service.list_portfolio_assets.return_value = [
         PortfolioAsset(
             asset_id=101, quantity=10, avg_cost=1500.0, asset=Asset(id=101, name="Gold")
@@ -207,10 +217,32 @@ def test_list_portfolio_assets(mock_portfolio_service):
             {"asset_id": 102, "name": "Silver", "quantity": 5, "avg_cost": 500.0},
         ],
     }
-    mock_portfolio_service.get_portfolio.assert_called_once_with(user_id)
+    mock_portfolio_service.get_portfolio.assert_not_called()
     mock_portfolio_service.list_portfolio_assets.assert_called_once_with(user_id)
 
 
+def test_get_portfolio_not_modified(mock_portfolio_service):
+    """
+    Test that a matching If-None-Match returns 304 without loading the holdings.
+    """
+    # Arrange
+    mock_portfolio_service.get_portfolio_version.return_value = PortfolioVersion(
+        portfolio_id=1, version=7
+    )
+    mock_portfolio_service.list_portfolio_assets.return_value = []
+    etag = client.get("/portfolios/1/").headers["ETag"]
+    mock_portfolio_service.list_portfolio_assets.reset_mock()
+
+    # Act
+    response = client.get("/portfolios/1/", headers={"If-None-Match": etag})
+
+    # Assert
+    assert etag == 'W/"7"'
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+    mock_portfolio_service.list_portfolio_assets.assert_not_called()
+
+
 def test_get_portfolio_asset(mock_portfolio_service):
     """
     Test retrieving a specific asset from a user's portfolio.
@@ -240,3 +272,261 @@ def test_get_portfolio_asset(mock_portfolio_service):
     mock_portfolio_service.get_portfolio_asset.assert_called_once_with(
         user_id, asset_id
     )
+
+
+def test_execute_trades(mock_portfolio_service):
+    """
+    Test executing a batch of trades.
+    """
+    # Arrange
+    mock_portfolio_service.execute_trades.return_value = BatchTradeResult(
+        legs=[
+            FilledLeg("buy", 101, 2, 50.0, 2, 50.0),
+            FilledLeg("sell", 101, 2, 50.0, 0, None),
+        ],
+        balance=500.0,
+        trade_count=2,
+        gem_count=2,
+    )
+    request_data = {
+        "legs": [
+            {"side": "buy", "asset_id": 101, "quantity": 2},
+            {"side": "sell", "asset_id": 101, "quantity": 2},
+        ]
+    }
+
+    # Act
+    response = client.post("/portfolios/1/trades:batch", json=request_data)
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["legs"][1] == {
+        "side": "sell",
+        "asset_id": 101,
+        "quantity": 2,
+        "price": 50.0,
+        "remaining_quantity": 0,
+        "avg_cost": None,
+    }
+    assert response.json()["gem_count"] == 2
+    mock_portfolio_service.execute_trades.assert_called_once_with(
+        1, [TradeLeg("buy", 101, 2), TradeLeg("sell", 101, 2)]
+    )
+
+
+def test_execute_trades_rejected(mock_portfolio_service):
+    """
+    Test that a rejected batch returns the failing leg's reason.
+    """
+    # Arrange
+    mock_portfolio_service.execute_trades.side_effect = ValueError(
+        "Leg 1: Insufficient balance to complete the trade."
+    )
+
+    # Act
+    response = client.post(
+        "/portfolios/1/trades:batch",
+        json={"legs": [{"side": "buy", "asset_id": 101, "quantity": 2}]},
+    )
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json() == {
+        "detail": "Leg 1: Insufficient balance to complete the trade."
+    }
+
+
+def test_execute_trades_requires_legs():
+    """
+    Test that an empty batch is rejected by validation.
+    """
+    # Act
+    response = client.post("/portfolios/1/trades:batch", json={"legs": []})
+
+    # Assert
+    assert response.status_code == 422
+
+
+def test_add_asset_uses_group_commit_executor(monkeypatch, mock_portfolio_service):
+    """
+    Test that buys go through the group-commit executor when it is enabled.
+    """
+    # Arrange
+    monkeypatch.setattr("app.dependencies.TRADE_EXECUTION_MODE", "group_commit")
+    mock_executor = MagicMock(spec=GroupCommitExecutor)
+    mock_executor.add_asset_to_portfolio.return_value = PortfolioAsset(
+        asset_id=101, quantity=1, avg_cost=5.0, asset=Asset(id=101, name="Gold")
+    )
+    monkeypatch.setattr("app.dependencies.group_commit_executor", mock_executor)
+
+    # Act
+    response = client.post(
+        "/portfolios/1/assets/", json={"asset_id": 101, "quantity": 1}
+    )
+
+    # Assert
+    assert response.status_code == 201
+    assert response.json()["name"] == "Gold"
+    mock_executor.add_asset_to_portfolio.assert_called_once_with(
+        user_id=1, asset_id=101, quantity=1
+    )
+    mock_portfolio_service.add_asset_to_portfolio.assert_not_called()
+
+
+def test_sell_uses_user_actor_executor(monkeypatch, mock_portfolio_service):
+    """
+    Test that sells go through the per-user actor executor when it is enabled.
+    """
+    # Arrange
+    monkeypatch.setattr("app.dependencies.TRADE_EXECUTION_MODE", "actor")
+    mock_executor = MagicMock(spec=UserActorExecutor)
+    mock_executor.remove_asset_from_portfolio.return_value = PortfolioAsset(
+        asset_id=101, quantity=2
+    )
+    monkeypatch.setattr("app.dependencies.user_actor_executor", mock_executor)
+
+    # Act
+    response = client.delete("/portfolios/1/assets/101?quantity=1")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["remaining_quantity"] == 2
+    mock_executor.remove_asset_from_portfolio.assert_called_once_with(1, 101, 1)
+    mock_portfolio_service.remove_asset_from_portfolio.assert_not_called()
+
+
+def test_list_trades(mock_portfolio_service):
+    """
+    Test paging through a user's trade history.
+    """
+    # Arrange
+    executed_at = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    mock_portfolio_service.list_trades.return_value = (
+        [
+            Trade(
+                id=7,
+                asset_id=101,
+                side="buy",
+                quantity=2,
+                price=50.0,
+                created_at=executed_at,
+            )
+        ],
+        "abc",
+    )
+
+    # Act
+    response = client.get("/portfolios/1/trades?limit=1")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.json()["trades"] == [
+        {
+            "id": 7,
+            "asset_id": 101,
+            "side": "buy",
+            "quantity": 2,
+            "price": 50.0,
+            "created_at": "2026-01-01T00:00:00Z",
+        }
+    ]
+    assert response.json()["next_cursor"] == "abc"
+    assert response.json()["next"].endswith("/portfolios/1/trades?limit=1&cursor=abc")
+    mock_portfolio_service.list_trades.assert_called_once_with(1, 1, None)
+
+
+def test_list_trades_invalid_cursor(mock_portfolio_service):
+    """
+    Test that a malformed cursor returns 400.
+    """
+    # Arrange
+    mock_portfolio_service.list_trades.side_effect = ValueError("Invalid cursor.")
+
+    # Act
+    response = client.get("/portfolios/1/trades?cursor=bogus")
+
+    # Assert
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Invalid cursor."}
+
+
+@pytest.fixture
+def mock_order_service():
+    """Fixture for Mock ConditionalOrderService, wired into the app."""
+    service = MagicMock(spec=ConditionalOrderService)
+    app.dependency_overrides[get_conditional_order_service] = lambda: service
+    return service
+
+
+def test_create_conditional_order(mock_order_service):
+    """
+    Test placing a limit buy that waits for the price to fall.
+    """
+    # Arrange
+    mock_order_service.create_order.return_value = ConditionalOrder(
+        id=3,
+        user_id=1,
+        asset_id=101,
+        side="buy",
+        order_type="limit",
+        quantity=2,
+        trigger_price=1800.0,
+        status="pending",
+        created_at=datetime(2026, 1, 1, tzinfo=timezone.utc),
+    )
+    request_data = {
+        "asset_id": 101,
+        "side": "buy",
+        "order_type": "limit",
+        "quantity": 2,
+        "trigger_price": 1800.0,
+    }
+
+    # Act
+    response = client.post("/portfolios/1/orders", json=request_data)
+
+    # Assert
+    assert response.status_code == 201
+    assert response.json()["status"] == "pending"
+    assert response.json()["trigger_price"] == 1800.0
+    mock_order_service.create_order.assert_called_once_with(
+        1, 101, "buy", "limit", 2, 1800.0
+    )
+
+
+def test_create_conditional_order_invalid_type(mock_order_service):
+    """
+    Test that an unknown order type is rejected before reaching the service.
+    """
+    # Arrange
+    request_data = {
+        "asset_id": 101,
+        "side": "buy",
+        "order_type": "trailing",
+        "quantity": 2,
+        "trigger_price": 1800.0,
+    }
+
+    # Act
+    response = client.post("/portfolios/1/orders", json=request_data)
+
+    # Assert
+    assert response.status_code == 422
+    mock_order_service.create_order.assert_not_called()
+
+
+def test_cancel_conditional_order_not_found(mock_order_service):
+    """
+    Test cancelling an order that is not pending returns 404.
+    """
+    # Arrange
+    mock_order_service.cancel_order.side_effect = ValueError(
+        "Pending order with ID 3 not found."
+    )
+
+    # Act
+    response = client.delete("/portfolios/1/orders/3")
+
+    # Assert
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Pending order with ID 3 not found."}
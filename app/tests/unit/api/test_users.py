@@ -3,6 +3,7 @@ from unittest.mock import MagicMock
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.database import ConcurrentUpdateError
 from app.dependencies import get_user_service
 from app.main import app
 from app.models.user import User
@@ -168,6 +169,49 @@ def test_get_user(client, mock_user_service):
     mock_user_service.get_user.assert_called_once_with(user_id)
 
 
+def test_get_user_etag(client, mock_user_service):
+    """
+    Test that a user carries an ETag and a matching If-None-Match returns 304.
+    """
+    # Arrange
+    mock_user_service.get_user.return_value = User(
+        id=1,
+        username="Alice",
+        gem_count=10,
+        rank=2,
+        balance=500.0,
+        trade_count=0,
+        version=4,
+    )
+
+    # Act
+    first = client.get("/users/1")
+    cached = client.get("/users/1", headers={"If-None-Match": first.headers["ETag"]})
+    stale = client.get("/users/1", headers={"If-None-Match": 'W/"3.2"'})
+
+    # Assert
+    assert first.headers["ETag"] == 'W/"4.2"'
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert stale.status_code == 200
+
+
+def test_deposit_version_conflict(client, mock_user_service):
+    """
+    Test that a deposit that keeps losing version races returns 409.
+    """
+    # Arrange
+    mock_user_service.deposit_balance.side_effect = ConcurrentUpdateError(
+        "The record was modified concurrently. Please try again."
+    )
+
+    # Act
+    response = client.post("/users/deposit", json={"user_id": 1, "amount": 10.0})
+
+    # Assert
+    assert response.status_code == 409
+
+
 def test_get_user_not_found(client, mock_user_service):
     """
     Test retrieving a non-existent user.
@@ -0,0 +1,74 @@
+import json
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+from loguru import logger
+
+from app.core import logging as app_logging
+from app.core.logging import configure_logging, sample_request
+from app.dependencies import get_ranking_service
+from app.main import app
+from app.services.ranking_service import RankingService
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def records():
+    """Collect what the logging thread writes, then restore the default handler."""
+    lines = []
+    yield lines
+    logger.remove()
+    logger.add(sys.stderr)
+    app_logging._request_sample_rate = 0.0
+
+
+@pytest.fixture
+def client():
+    mock_ranking_service = MagicMock(spec=RankingService)
+    mock_ranking_service.get_user_rank.return_value = (150, 2)
+    app.dependency_overrides[get_ranking_service] = lambda: mock_ranking_service
+    yield TestClient(app)
+    app.dependency_overrides = {}
+
+
+def test_sampled_request_is_logged_as_json(records, client):
+    """
+    Test that a sampled request is logged with its route, user and duration.
+    """
+    # Arrange
+    configure_logging(
+        level="DEBUG", json=True, request_sample_rate=1, sink=records.append
+    )
+
+    # Act
+    response = client.get("/leaderboard/rank/7")
+    logger.complete()
+
+    # Assert
+    assert response.status_code == 200
+    extra = json.loads(records[-1])["record"]["extra"]
+    assert extra["route"] == "/leaderboard/rank/{user_id}"
+    assert extra["user_id"] == "7"
+    assert extra["status"] == 200
+    assert extra["duration_ms"] > 0
+
+
+def test_request_logging_is_off_above_debug(records, client):
+    """
+    Test that requests are neither sampled nor logged when DEBUG is disabled.
+    """
+    # Arrange
+    configure_logging(
+        level="INFO", json=True, request_sample_rate=1, sink=records.append
+    )
+
+    # Act
+    client.get("/leaderboard/rank/7")
+    logger.complete()
+
+    # Assert
+    assert sample_request() is False
+    assert records == []
@@ -0,0 +1,124 @@
+from unittest.mock import MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core import metrics
+from app.core.metrics import (
+    CallbackGauge,
+    Counter,
+    Gauge,
+    Histogram,
+    http_requests_in_flight,
+    http_requests_total,
+)
+from app.dependencies import get_asset_service
+from app.main import app
+from app.services.asset_service import AssetService
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """An empty registry for metrics created by one test."""
+    monkeypatch.setattr(metrics, "_registry", [])
+
+
+def test_histogram_renders_cumulative_buckets(registry):
+    """
+    Test that observations land in the first bucket whose bound covers them
+    and that buckets are rendered cumulatively.
+    """
+    # Arrange
+    histogram = Histogram("latency_seconds", "Latency.", ("route",), (0.1, 1.0))
+
+    # Act
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, ("/a",))
+
+    # Assert
+    assert metrics.render_metrics().splitlines() == [
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 2',
+        'latency_seconds_bucket{route="/a",le="1.0"} 3',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 4',
+        'latency_seconds_sum{route="/a"} 3.65',
+        'latency_seconds_count{route="/a"} 4',
+    ]
+
+
+def test_counters_gauges_and_callbacks(registry):
+    """
+    Test rendering labelled counters, unlabelled gauges and callback gauges,
+    escaping label values.
+    """
+    # Arrange
+    counter = Counter("events_total", "Events.", ("name",))
+    gauge = Gauge("in_flight", "In flight.")
+    CallbackGauge("ratio", "Ratio.", lambda: 0.5)
+    CallbackGauge("unknown", "Not known yet.", lambda: None)
+
+    # Act
+    counter.inc(('say "hi"',), 2)
+    gauge.inc()
+    gauge.inc()
+    gauge.dec()
+
+    # Assert
+    lines = metrics.render_metrics().splitlines()
+    assert 'events_total{name="say \\"hi\\""} 2' in lines
+    assert "in_flight 1" in lines
+    assert "ratio 0.5" in lines
+    assert "# TYPE unknown gauge" in lines
+    assert not any(line.startswith("unknown ") for line in lines)
+
+
+def test_metrics_endpoint():
+    """
+    Test that /metrics reports requests by route template, not raw path.
+    """
+    # Arrange
+    client = TestClient(app)
+    client.get("/health")
+    client.get("/no-such-path/123")
+
+    # Act
+    response = client.get("/metrics")
+
+    # Assert
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in (
+        response.text
+    )
+    assert 'route="unmatched",status="404"' in response.text
+    assert "/no-such-path" not in response.text
+    assert "# TYPE http_request_duration_seconds histogram" in response.text
+    assert "# TYPE leaderboard_cache_hit_ratio gauge" in response.text
+
+
+def test_unhandled_error_is_recorded_as_500():
+    """
+    Test that a request whose handler raises is counted as a 500.
+    """
+    # Arrange
+    service = MagicMock(spec=AssetService)
+    service.get_asset.side_effect = RuntimeError("boom")
+    app.dependency_overrides[get_asset_service] = lambda: service
+    client = TestClient(app, raise_server_exceptions=False)
+    labels = ("GET", "/assets/{asset_id}", 500)
+    before = http_requests_total.value(labels)
+    in_flight = http_requests_in_flight.value()
+
+    # Act
+    try:
+        response = client.get("/assets/1")
+    finally:
+        app.dependency_overrides.clear()
+
+    # Assert
+    assert response.status_code == 500
+    assert http_requests_total.value(labels) == before + 1
+    assert http_requests_in_flight.value() == in_flight
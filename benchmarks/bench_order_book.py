@@ -0,0 +1,78 @@
+"""
+Benchmark the in-memory order book matching engine.
+
+Replays a random stream of limit and market orders around a drifting mid
+price through a single asset's OrderBook on one core and reports the match
+throughput. Exits non-zero if it falls below --min-rate orders/sec.
+
+Usage:
+    python -m benchmarks.bench_order_book
+    python -m benchmarks.bench_order_book --orders 1000000 --market-ratio 0.2
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from app.services.order_book import OrderBook
+
+DEFAULT_ORDERS = 500_000
+DEFAULT_MIN_RATE = 100_000
+
+
+def generate_orders(n: int, market_ratio: float, seed: int = 42) -> list[tuple]:
+    """
+    Build (user_id, side, quantity, price) orders: limit prices on a 0.01 tick
+    within 1% of a random-walk mid price, with a share of market orders.
+    """
+    rng = random.Random(seed)
+    mid = 100.0
+    orders = []
+    for _ in range(n):
+        mid = max(1.0, mid + rng.choice((-0.01, 0.0, 0.01)))
+        side = "buy" if rng.random() < 0.5 else "sell"
+        quantity = rng.randint(1, 100)
+        if rng.random() < market_ratio:
+            price = None
+        else:
+            offset = rng.randint(-100, 100) / 100
+            price = round(mid + offset, 2)
+        orders.append((rng.randint(1, 10_000), side, quantity, price))
+    return orders
+
+
+def run(orders: list[tuple]) -> tuple[float, int]:
+    """
+    Submit every order to a fresh book. Returns (seconds, fills).
+    """
+    book = OrderBook(asset_id=1)
+    submit = book.submit
+    fills = 0
+    started = time.perf_counter()
+    for user_id, side, quantity, price in orders:
+        fills += len(submit(user_id, side, quantity, price)[1])
+    return time.perf_counter() - started, fills
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=DEFAULT_ORDERS)
+    parser.add_argument("--market-ratio", type=float, default=0.1)
+    parser.add_argument("--min-rate", type=float, default=DEFAULT_MIN_RATE)
+    args = parser.parse_args()
+
+    orders = generate_orders(args.orders, args.market_ratio)
+    elapsed, fills = run(orders)
+    rate = args.orders / elapsed
+    print(
+        f"{args.orders:,} orders, {fills:,} fills in {elapsed:.2f}s: "
+        f"{rate:,.0f} orders/sec"
+    )
+    if rate < args.min_rate:
+        print(f"Below the target of {args.min_rate:,.0f} orders/sec")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
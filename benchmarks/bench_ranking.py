@@ -0,0 +1,150 @@
+"""
+Benchmark leaderboard ranking strategies.
+
+Compares the legacy Python loop (load every user, assign ranks, commit, then
+query the top N) with the "window" ranking mode, which computes competition
+ranks at query time with RANK() OVER (ORDER BY gem_count DESC).
+
+Usage:
+    python -m benchmarks.bench_ranking
+    python -m benchmarks.bench_ranking --sizes 10000 100000 --backends sqlite
+
+The Postgres backend uses BENCH_DATABASE_URL, falling back to TEST_DATABASE_URL.
+Its tables are dropped and recreated, so never point it at a real database.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from dotenv import load_dotenv
+from sqlalchemy import asc, create_engine, desc, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import User
+from app.services.ranking_service import RankingService
+
+load_dotenv()
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+TOP_N = 10
+INSERT_CHUNK = 50_000
+
+
+def legacy_loop(db, n: int):
+    """
+    The original leaderboard read: a Python re-rank of every user, then top N.
+    """
+    users = db.query(User).order_by(desc(User.gem_count)).all()
+    rank = 1
+    previous_gem_count = None
+    for i, user in enumerate(users):
+        if user.gem_count != previous_gem_count:
+            rank = i + 1
+        user.rank = rank
+        previous_gem_count = user.gem_count
+    db.commit()
+    return db.query(User).order_by(desc(User.gem_count), asc(User.id)).limit(n).all()
+
+
+def window_query(db, n: int):
+    """
+    The window ranking mode: ranks are computed by the top-N query itself.
+    """
+    return RankingService(db, mode="window").get_leaderboard(n)
+
+
+def populate(engine, size: int, seed: int = 42):
+    """
+    Recreate the schema and insert `size` users with random gem counts.
+    """
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    rng = random.Random(seed)
+    with engine.begin() as conn:
+        for start in range(0, size, INSERT_CHUNK):
+            conn.execute(
+                insert(User),
+                [
+                    {
+                        "username": f"user_{i}",
+                        "gem_count": rng.randint(0, 5_000),
+                        "rank": 0,
+                        "trade_count": 0,
+                        "balance": 0.0,
+                    }
+                    for i in range(start, min(start + INSERT_CHUNK, size))
+                ],
+            )
+
+
+def measure(session_factory, strategy, repeats: int) -> list[float]:
+    """
+    Run a strategy `repeats` times, each with a fresh session, in milliseconds.
+    """
+    timings = []
+    for _ in range(repeats):
+        db = session_factory()
+        try:
+            started = time.perf_counter()
+            strategy(db, TOP_N)
+            timings.append((time.perf_counter() - started) * 1000)
+        finally:
+            db.close()
+    return timings
+
+
+def engine_for(backend: str, workdir: str):
+    """
+    Create an engine for the requested backend, or None if it is unavailable.
+    """
+    if backend == "sqlite":
+        return create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    url = os.getenv("BENCH_DATABASE_URL") or os.getenv("TEST_DATABASE_URL")
+    return create_engine(url) if url else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        choices=["sqlite", "postgres"],
+        default=["sqlite", "postgres"],
+    )
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+
+    strategies = {"loop": legacy_loop, "window": window_query}
+    print(
+        f"{'backend':<10}{'users':>10}{'strategy':>10}{'median ms':>12}{'best ms':>10}"
+    )
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for backend in args.backends:
+            engine = engine_for(backend, workdir)
+            if engine is None:
+                print(f"{backend:<10} skipped: no database URL configured")
+                continue
+            session_factory = sessionmaker(bind=engine)
+            try:
+                for size in args.sizes:
+                    populate(engine, size)
+                    for name, strategy in strategies.items():
+                        timings = measure(session_factory, strategy, args.repeats)
+                        print(
+                            f"{backend:<10}{size:>10}{name:>10}"
+                            f"{statistics.median(timings):>12.1f}{min(timings):>10.1f}"
+                        )
+            finally:
+                Base.metadata.drop_all(bind=engine)
+                engine.dispose()
+
+
+if __name__ == "__main__":
+    main()